@@ -0,0 +1,94 @@
+"""
+Checks the import time of the headless execution path against a budget.
+
+Each module is imported in a fresh interpreter, the way a sweep worker process would
+import it. The headless modules must not load numpy, pandas or matplotlib and must
+import within the budget. Exits with 1 if a module is over budget or loads a heavy
+dependency, so it can be used as a CI check.
+
+Run from the root of the repo:
+    python -m benchmarks.bench_import_time --budget-ms 150
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+# Modules a worker needs to write the input files and run the driver
+HEADLESS_MODULES = [
+    "lib.Driver_Classes.Mod_Driver_Model",
+    "lib.Driver_Classes.Mod_Driver_Setup",
+    "lib.Driver_Classes.Mod_Driver_Sweep",
+    "lib.general_functions.executing_runs",
+    "lib.general_functions.run_cache",
+]
+
+# Timed for reference, these are expected to be slow
+REFERENCE_MODULES = [
+    "lib.Driver_Classes.Mod_Driver_Results",
+    "matplotlib.pyplot",
+]
+
+HEAVY_MODULES = ["numpy", "pandas", "matplotlib"]
+
+IMPORT_SCRIPT = """
+import sys, time, json
+start_time = time.perf_counter()
+import {module}
+wall_time = time.perf_counter() - start_time
+print(json.dumps({{"wall_time_s": wall_time, "loaded": [name for name in {heavy} if name in sys.modules]}}))
+"""
+
+def time_import(module, repeats = 3):
+    """
+    Return (best wall time, heavy modules loaded) of importing module in a fresh interpreter
+    """
+    best, loaded = float("inf"), []
+
+    for _ in range(repeats):
+        script = IMPORT_SCRIPT.format(module = module, heavy = HEAVY_MODULES)
+        output = subprocess.run([sys.executable, "-c", script], capture_output = True, text = True, check = True)
+        result = json.loads(output.stdout)
+
+        best, loaded = min(best, result["wall_time_s"]), result["loaded"]
+
+    return best, loaded
+
+def check_import_budget(budget_s, repeats = 3, report = None):
+    """
+    Time the headless and reference imports and return the list of failures
+    """
+    failures = []
+
+    for module in HEADLESS_MODULES + REFERENCE_MODULES:
+        wall_time, loaded = time_import(module, repeats)
+        headless = module in HEADLESS_MODULES
+
+        if report is not None:
+            report.add("imports", module, 1, wall_time, unit = "imports")
+        else:
+            print(f"{module:<45} {wall_time * 1000:8.1f} ms  loaded: {', '.join(loaded) or '-'}")
+
+        if headless and wall_time > budget_s:
+            failures.append(f"{module} took {wall_time * 1000:.1f} ms, the budget is {budget_s * 1000:.0f} ms")
+
+        if headless and loaded:
+            failures.append(f"{module} loaded {', '.join(loaded)}")
+
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type = float, default = 150.0, help = "Import time budget of each headless module")
+    parser.add_argument("--repeats", type = int, default = 3, help = "Number of times each import is timed")
+    args = parser.parse_args()
+
+    failures = check_import_budget(args.budget_ms / 1000, args.repeats)
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Compares the dedicated output reader against the pd.read_csv(sep='\\s+') reader.
+
+Run from the root of the repo:
+    python -m benchmarks.bench_output_reader --size-mb 300
+"""
+import os
+import argparse
+import tempfile
+import pandas as pd
+
+from lib.general_functions.output_reader import read_output_file
+from benchmarks.synthetic_output import write_synthetic_output, get_num_rows_for_size
+from benchmarks.bench_utils import time_call
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument("--size-mb", type = float, default = 300.0, help = "Size of the synthetic output file")
+    parser.add_argument("--num-statev", type = int, default = 19, help = "Number of state variables")
+    parser.add_argument("--repeats", type = int, default = 3, help = "Number of times each reader is run")
+    args = parser.parse_args()
+
+    num_rows = get_num_rows_for_size(args.size_mb, args.num_statev)
+
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = os.path.join(folder, "output.txt")
+
+        print(f"Writing {num_rows} rows to a synthetic output file...")
+        write_synthetic_output(file_path, num_rows, args.num_statev)
+        size_mb = os.path.getsize(file_path) / 1024**2
+
+        readers = {
+            "pd.read_csv(sep='\\s+')"              : lambda: pd.read_csv(file_path, sep = "\\s+"),
+            "read_output_file"                      : lambda: read_output_file(file_path),
+            "read_output_file(usecols=stran,stress)": lambda: read_output_file(file_path, usecols = ["stran", "stress"]),
+        }
+
+        print(f"File size: {size_mb:.1f} MB, rows: {num_rows}")
+        for name, reader in readers.items():
+            wall_time = time_call(reader, args.repeats)
+            print(f"{name:<42} {wall_time:8.3f} s {size_mb / wall_time:8.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
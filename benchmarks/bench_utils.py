@@ -0,0 +1,100 @@
+"""
+Helpers shared by the benchmarks
+"""
+import csv
+import json
+import time
+
+def time_call(func, repeats = 3):
+    """
+    Return the best wall time of repeats calls to func
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+class BenchmarkReport:
+    """
+    Collects the throughput numbers of the benchmarks and prints/exports them
+    """
+    def __init__(self):
+        self.records = []
+
+    def add(self, section, name, size, wall_time, unit = "rows"):
+        """
+        Add a benchmark result, size is the number of units processed in wall_time seconds
+        """
+        record = {
+            "section": section,
+            "name": name,
+            "size": size,
+            "unit": unit,
+            "wall_time_s": wall_time,
+            "throughput_per_s": size / wall_time if wall_time > 0 else float("inf"),
+        }
+        self.records.append(record)
+
+        print(f"{section:<14} {name:<40} {size:>10} {unit:<9} {wall_time:10.4f} s "
+              f"{record['throughput_per_s']:14.1f} {unit}/s")
+
+    def to_json(self, file_path):
+        with open(file_path, "w") as file:
+            json.dump(self.records, file, indent = 4)
+
+    def to_csv(self, file_path):
+        with open(file_path, "w", newline = "") as file:
+            writer = csv.DictWriter(file, fieldnames = list(self.records[0].keys()))
+            writer.writeheader()
+            writer.writerows(self.records)
+
+    def compare(self, baseline_records, threshold = 0.5, min_slow_down = 0.005):
+        """
+        Compare the wall times against a baseline exported with to_json
+
+        The records are matched on their section, name and size, records without a
+        baseline are skipped.
+
+        Inputs:
+            baseline_records (list): Records loaded with load_baseline
+            threshold (float): Allowed slow down, 0.5 fails a benchmark that takes 50 % longer than its baseline
+            min_slow_down (float): Seconds, smaller slow downs are timing noise and never fail
+
+        Returns:
+            List with a message for each benchmark that regressed
+        """
+        baseline = {get_record_key(record): record for record in baseline_records}
+
+        regressions = []
+        for record in self.records:
+            baseline_record = baseline.get(get_record_key(record))
+
+            if baseline_record is None:
+                continue
+
+            ratio = record["wall_time_s"] / max(baseline_record["wall_time_s"], 1e-12)
+
+            slow_down = record["wall_time_s"] - baseline_record["wall_time_s"]
+
+            if ratio > 1 + threshold and slow_down > min_slow_down:
+                regressions.append(f"{record['section']} {record['name']} ({record['size']} {record['unit']}): "
+                                   f"{record['wall_time_s']:.4f} s vs {baseline_record['wall_time_s']:.4f} s "
+                                   f"in the baseline ({ratio:.2f}x)")
+
+        return regressions
+
+def get_record_key(record):
+    """
+    Return the key that a benchmark record is matched on between runs
+    """
+    return record["section"], record["name"], record["size"]
+
+def load_baseline(file_path):
+    """
+    Load the records of a baseline exported with BenchmarkReport.to_json
+    """
+    with open(file_path, "r") as file:
+        return json.load(file)
@@ -0,0 +1,197 @@
+"""
+Benchmark suite for the pumat hot paths.
+
+Covers output parsing, invariant computation, input deck writing, PopularPath
+construction, end-to-end run orchestration with a stand-in driver and the import time
+of the headless modules, and prints the throughput of each. Run from the root of the repo:
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000 1000000 --json bench.json
+
+The wall times are compared against a baseline recorded on the same machine and the script
+exits with a non-zero code when a benchmark is more than --threshold slower than its baseline
+or an import is over its budget. The timings depend on the hardware, so the baseline isn't
+committed. The first run records it in benchmarks/baseline.json (see --baseline), record a
+new one after an intended change with
+    python -m benchmarks.run_benchmarks --update-baseline
+"""
+import os
+import sys
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from lib.Driver_Classes.Mod_Driver_Results import DriverModelResults
+from lib.Driver_Classes.Mod_Driver_Setup import DriverModelSetup
+from lib.Driver_Classes.Mod_Driver_Sweep import DriverModelSweep
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+from benchmarks.bench_utils import time_call, BenchmarkReport, load_baseline
+from benchmarks.bench_import_time import check_import_budget
+from benchmarks.synthetic_output import write_synthetic_output, get_output_columns
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def make_load(ninc = 100):
+    load_params = {
+        "ninc": ninc,
+        "maxiter": 999,
+        "dtime": 0.1,
+        "every": 1,
+        "ddstran_1": 0.1,
+    }
+
+    return PopularPath("TriaxialE1", load_params)
+
+def bench_output_parsing(report, sizes, folder, repeats):
+    for size in sizes:
+        write_synthetic_output(os.path.join(folder, "output.txt"), size)
+        results = DriverModelResults(folder)
+
+        wall_time = time_call(results.get_output_file_as_df, repeats)
+        report.add("parsing", "get_output_file_as_df", size, wall_time)
+
+        wall_time = time_call(lambda: results.get_output_file_as_df(usecols = ["stran", "stress"]), repeats)
+        report.add("parsing", "get_output_file_as_df(usecols)", size, wall_time)
+
+def bench_invariants(report, sizes, repeats):
+    columns = get_output_columns(0)
+    rng = np.random.default_rng(0)
+
+    for size in sizes:
+        # Fill the results directly so only the invariants are timed
+        results = DriverModelResults(tempfile.gettempdir())
+        results.stress_df = pd.DataFrame(rng.normal(size = (size, 6)), columns = columns[8:14])
+        results.strain_df = pd.DataFrame(rng.normal(size = (size, 6)), columns = columns[2:8])
+
+        for name in ["get_mean_stress", "get_q_invariant", "get_volumetric_strain", "get_deviatoric_strain"]:
+            method = getattr(results, name)
+
+            # Clear the cache so every call computes the invariant
+            wall_time = time_call(lambda: (results.clear_derived_cache(), method()), repeats)
+            report.add("invariants", name, size, wall_time)
+
+def bench_deck_writing(report, folder, repeats, num_variants = 1000):
+    setup = DriverModelSetup(folder, "NAMCVMAT", "output.txt")
+    setup.store_loads([make_load() for _ in range(100)])
+
+    properties = {f"param_{i}": float(i) for i in range(20)}
+
+    wall_time = time_call(setup.write_loads, repeats)
+    report.add("decks", "write_loads (100 loads)", 1, wall_time, unit = "files")
+
+    wall_time = time_call(lambda: setup.write_parameters_file(properties), repeats)
+    report.add("decks", "write_parameters_file (20 props)", 1, wall_time, unit = "files")
+
+    variants = [({**properties, "param_0": float(i)}, ([0.0] * 6, {}), [make_load()]) for i in range(num_variants)]
+
+    def get_folder_paths(name):
+        return [os.path.join(folder, name, f"run_{i:05d}") for i in range(num_variants)]
+
+    # Every repeat writes the new files into its own folder
+    new_folders = iter(range(repeats))
+    wall_time = time_call(lambda: setup.compile_decks(variants, get_folder_paths(f"decks_{next(new_folders)}")), repeats)
+    report.add("decks", "compile_decks (new files)", 3 * num_variants, wall_time, unit = "files")
+
+    # The second pass over the same folders finds all of the files unchanged
+    folder_paths = get_folder_paths("decks_0")
+
+    wall_time = time_call(lambda: setup.compile_decks(variants, folder_paths), repeats)
+    report.add("decks", "compile_decks (unchanged files)", 3 * num_variants, wall_time, unit = "files")
+
+def bench_popular_path(report, repeats, num_paths = 10_000):
+    wall_time = time_call(lambda: [make_load() for _ in range(num_paths)], repeats)
+    report.add("loads", "PopularPath construction", num_paths, wall_time, unit = "paths")
+
+    loads = [make_load() for _ in range(num_paths)]
+    wall_time = time_call(lambda: [load.render() for load in loads], repeats)
+    report.add("loads", "PopularPath.render", num_paths, wall_time, unit = "paths")
+
+def bench_orchestration(report, folder, num_runs, rows_per_run):
+    sweep = DriverModelSweep(os.path.join(folder, "sweep"), "NAMCVMAT", STAND_IN_DRIVER_PATH)
+    variants = [({"E": 1000.0 + i, "nu": 0.3}, ([0.0] * 6, {}), [make_load()]) for i in range(num_runs)]
+
+    # The driver is started without arguments, so the number of rows is passed in the environment
+    old_rows = os.environ.get("PUMAT_STAND_IN_ROWS")
+    os.environ["PUMAT_STAND_IN_ROWS"] = str(rows_per_run)
+
+    try:
+        wall_time = time_call(lambda: sweep.run(variants), 1)
+    finally:
+        if old_rows is None:
+            del os.environ["PUMAT_STAND_IN_ROWS"]
+        else:
+            os.environ["PUMAT_STAND_IN_ROWS"] = old_rows
+
+    report.add("orchestration", f"DriverModelSweep.run ({sweep.max_workers} workers)", num_runs, wall_time, unit = "runs")
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [1_000, 10_000, 100_000, 1_000_000],
+                        help = "Number of rows of the synthetic outputs, up to 10_000_000")
+    parser.add_argument("--repeats", type = int, default = 3, help = "Number of times each benchmark is run")
+    parser.add_argument("--num-runs", type = int, default = 50, help = "Number of runs in the orchestration benchmark")
+    parser.add_argument("--rows-per-run", type = int, default = 1000, help = "Rows written by each stand-in driver run")
+    parser.add_argument("--skip", nargs = "*", default = [],
+                        choices = ["parsing", "invariants", "decks", "loads", "orchestration", "imports"],
+                        help = "Sections to skip")
+    parser.add_argument("--import-budget-ms", type = float, default = 150.0,
+                        help = "Import time budget of the headless modules")
+    parser.add_argument("--baseline", default = BASELINE_PATH, help = "Baseline json file the wall times are compared against, recorded on the first run")
+    parser.add_argument("--threshold", type = float, default = 0.5,
+                        help = "Allowed slow down against the baseline, 0.5 fails a benchmark that takes 50 %% longer")
+    parser.add_argument("--min-slow-down-ms", type = float, default = 5.0,
+                        help = "Slow downs smaller than this are timing noise and never fail")
+    parser.add_argument("--update-baseline", action = "store_true",
+                        help = "Write the results to the baseline file instead of comparing against it")
+    parser.add_argument("--json", help = "Export the results to a json file")
+    parser.add_argument("--csv", help = "Export the results to a csv file")
+    args = parser.parse_args()
+
+    report = BenchmarkReport()
+
+    with tempfile.TemporaryDirectory() as folder:
+        if "parsing" not in args.skip:
+            bench_output_parsing(report, args.sizes, folder, args.repeats)
+
+        if "invariants" not in args.skip:
+            bench_invariants(report, args.sizes, args.repeats)
+
+        if "decks" not in args.skip:
+            bench_deck_writing(report, folder, args.repeats)
+
+        if "loads" not in args.skip:
+            bench_popular_path(report, args.repeats)
+
+        if "orchestration" not in args.skip:
+            if os.name == "nt":
+                print("Skipping the orchestration benchmark, the stand-in driver needs to be run directly.")
+            else:
+                bench_orchestration(report, folder, args.num_runs, args.rows_per_run)
+
+    failures = []
+
+    if "imports" not in args.skip:
+        for failure in check_import_budget(args.import_budget_ms / 1000, args.repeats, report):
+            print(f"Import budget exceeded: {failure}")
+            failures.append(failure)
+
+    if args.json:
+        report.to_json(args.json)
+
+    if args.csv:
+        report.to_csv(args.csv)
+
+    if args.update_baseline or not os.path.isfile(args.baseline):
+        report.to_json(args.baseline)
+        print(f"Recorded the baseline of this machine in '{args.baseline}'.")
+    else:
+        for regression in report.compare(load_baseline(args.baseline), args.threshold, args.min_slow_down_ms / 1000):
+            print(f"Regression: {regression}")
+            failures.append(regression)
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Writes synthetic incremental driver output files for the benchmarks
+"""
+import numpy as np
+
+def get_output_columns(num_statev = 19):
+    """
+    Return the column names of an output file with num_statev state variables
+    """
+    columns = (["time(1)", "time(2)"] +
+               [f"stran({i})" for i in range(1, 7)] +
+               [f"stress({i})" for i in range(1, 7)] +
+               [f"statev({i})" for i in range(1, num_statev + 1)])
+
+    return columns
+
+def write_synthetic_output(file_path, num_rows, num_statev = 19, seed = 0, block_rows = 100_000):
+    """
+    Write an output file with random values in the same layout as incremental driver
+    """
+    columns = get_output_columns(num_statev)
+    rng = np.random.default_rng(seed)
+
+    with open(file_path, "w") as file:
+        file.write(" ".join(f"{name:>16}" for name in columns) + "\n")
+
+        # Write in blocks so large files don't need all of the rows in memory
+        for start in range(0, num_rows, block_rows):
+            block = rng.normal(size = (min(block_rows, num_rows - start), len(columns)))
+            np.savetxt(file, block, fmt = "%16.8E", delimiter = " ")
+
+def get_num_rows_for_size(size_mb, num_statev = 19):
+    """
+    Return the approximate number of rows needed for an output file of size_mb megabytes
+    """
+    # Every value is 16 characters wide plus the delimiter
+    row_bytes = 17 * len(get_output_columns(num_statev))
+
+    return int(size_mb * 1024**2 / row_bytes)
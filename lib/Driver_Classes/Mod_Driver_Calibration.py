@@ -0,0 +1,316 @@
+import numpy as np
+import pandas as pd
+from lib.Driver_Classes.Mod_Driver_Setup import DriverModelSetup
+
+
+class DriverModelCalibration:
+    """
+    Calibrates material properties against laboratory test curves.
+
+    Candidate property sets are run in batches through a DriverModelSweep, so every
+    batch uses all of the sweep workers. Every evaluated point is remembered and is
+    never run twice.
+
+    The misfit of a run is the weighted sum of the normalized RMS error of the q vs. axial
+    strain curve and of the volumetric strain vs. axial strain curve, both compared at the
+    axial strains of the laboratory data.
+    """
+    def __init__(self, sweep, properties, calibrated_params, initial_conditions, load_list,
+                 lab_data, axial_strain_id = "stran(1)", compression_pos = True,
+                 weights = None):
+        """
+        Inputs:
+            sweep (DriverModelSweep): Runs the candidate property sets
+            properties (dict): Base properties in the format of write_parameters_file
+            calibrated_params (dict): {name: (low, high)} properties to calibrate and their bounds
+            initial_conditions (tuple): (init_stress, init_state_vars) of the test
+            load_list: Load or list of loads of the test
+            lab_data (DataFrame): Lab curves with "axial_strain" and "q" columns and optionally
+                                  a "vol_strain" column
+            axial_strain_id (str): Output column used as the axial strain
+            compression_pos (bool): Lab data is given with compression positive
+            weights (dict): Weight of the "q" and "vol_strain" misfits, both default to 1
+        """
+        if weights is None:
+            weights = {"q": 1.0, "vol_strain": 1.0}
+
+        self.sweep              = sweep
+        self.properties         = properties
+        self.calibrated_params  = calibrated_params
+        self.initial_conditions = initial_conditions
+        self.load_list          = load_list
+        self.lab_data           = lab_data
+        self.axial_strain_id    = axial_strain_id
+        self.weights            = weights
+
+        self.sign = -1.0 if compression_pos else 1.0
+
+        self.param_names = list(calibrated_params.keys())
+        self.lower = np.array([calibrated_params[name][0] for name in self.param_names], dtype = float)
+        self.upper = np.array([calibrated_params[name][1] for name in self.param_names], dtype = float)
+
+        # Used to build the samples of each batch
+        self.setup = DriverModelSetup(sweep.base_folder_path, sweep.constitutive_model_name,
+                                      sweep.output_file_name)
+
+        # Misfit of every evaluated point, keyed on the parameter values
+        self.evaluations = {}
+
+    def __str__(self):
+        return_string = (f"Calibrated parameters: {self.calibrated_params}\n"
+                         f"Number of evaluations: {len(self.evaluations)}\n"
+                         )
+
+        return return_string
+
+    # --- Objective ---
+
+    def _get_curve_misfit(self, model_x, model_y, lab_x, lab_y):
+        """
+        Normalized RMS error of a model curve at the lab x values
+        """
+        # np.interp needs increasing x values
+        order = np.argsort(model_x)
+        model_at_lab = np.interp(lab_x, model_x[order], model_y[order])
+
+        lab_range = np.ptp(lab_y)
+        if lab_range == 0:
+            lab_range = 1.0
+
+        return np.sqrt(np.mean((model_at_lab - lab_y)**2)) / lab_range
+
+    def get_misfit(self, results):
+        """
+        Return the misfit of the results of a run, failed runs return inf
+        """
+        if results is None or results.stress_df is None or len(results.stress_df) == 0:
+            return np.inf
+
+        lab_axial_strain = self.lab_data["axial_strain"].to_numpy(dtype = float)
+        model_axial_strain = self.sign * results.strain_df[self.axial_strain_id].to_numpy()
+
+        misfit = self.weights.get("q", 1.0) * self._get_curve_misfit(
+            model_axial_strain, results.get_q_invariant().to_numpy(),
+            lab_axial_strain, self.lab_data["q"].to_numpy(dtype = float))
+
+        if "vol_strain" in self.lab_data:
+            misfit += self.weights.get("vol_strain", 1.0) * self._get_curve_misfit(
+                model_axial_strain, results.get_volumetric_strain(sign = self.sign).to_numpy(),
+                lab_axial_strain, self.lab_data["vol_strain"].to_numpy(dtype = float))
+
+        if not np.isfinite(misfit):
+            return np.inf
+
+        return misfit
+
+    def _get_key(self, params):
+        return tuple(np.round(np.asarray(params, dtype = float), 12))
+
+    def evaluate_batch(self, param_sets):
+        """
+        Return the misfit of each parameter set, running the new ones in parallel
+
+        Inputs:
+            param_sets (list): Arrays with one value per calibrated parameter, in the order of calibrated_params
+        """
+        param_sets = [np.clip(np.asarray(params, dtype = float), self.lower, self.upper) for params in param_sets]
+
+        # Only run the points that haven't been evaluated before
+        new_keys = []
+        for params in param_sets:
+            key = self._get_key(params)
+            if key not in self.evaluations and key not in new_keys:
+                new_keys.append(key)
+
+        if new_keys:
+            samples = {name: [key[i] for key in new_keys] for i, name in enumerate(self.param_names)}
+            sweep_df = self.setup.build_sweep(self.properties, samples = samples,
+                                              initial_conditions = self.initial_conditions,
+                                              load_list = self.load_list)
+
+            results_df = self.sweep.run_sweep(self.properties, sweep_df, self.initial_conditions, self.load_list)
+
+            for key, results in zip(new_keys, results_df["results"]):
+                self.evaluations[key] = self.get_misfit(results)
+
+        return np.array([self.evaluations[self._get_key(params)] for params in param_sets])
+
+    def get_history(self):
+        """
+        Return a df with every evaluated point and its misfit
+        """
+        history = pd.DataFrame(list(self.evaluations.keys()), columns = self.param_names)
+        history["misfit"] = list(self.evaluations.values())
+
+        return history
+
+    def _get_best(self):
+        history = self.get_history()
+        best = history.loc[history["misfit"].idxmin()]
+
+        return {
+            "params": {name: best[name] for name in self.param_names},
+            "misfit": best["misfit"],
+            "num_evaluations": len(history),
+            "history": history,
+        }
+
+    # --- Optimizers ---
+    # Both optimizers work on parameters scaled to [0, 1] inside of the bounds
+
+    def _to_params(self, x):
+        return self.lower + np.clip(x, 0.0, 1.0) * (self.upper - self.lower)
+
+    def _evaluate_scaled(self, xs):
+        return self.evaluate_batch([self._to_params(x) for x in xs])
+
+    def nelder_mead(self, x0 = None, max_iter = 100, initial_step = 0.1, tol = 1e-6):
+        """
+        Nelder-Mead simplex search
+
+        The steps are the standard ones (reflection, expansion, outside and inside contraction
+        and shrink, with coefficients 1, 2, 0.5 and 0.5). The only difference is that the
+        reflection, expansion and both contraction points of each iteration are evaluated
+        together as one parallel batch, before it is known which of them is needed. The
+        extra points cost no wall time when there are enough workers and are remembered,
+        but they count towards num_evaluations. The points are clipped to the bounds.
+
+        Inputs:
+            x0 (dict): Optional starting values, defaults to the middle of the bounds
+            max_iter (int): Max number of iterations
+            initial_step (float): Size of the initial simplex as a fraction of the bounds
+            tol (float): Stop when the spread of the misfits in the simplex is below tol
+
+        Returns:
+            dict with the best "params", its "misfit", the "num_evaluations" and the "history" df
+        """
+        num_params = len(self.param_names)
+
+        if x0 is None:
+            start = np.full(num_params, 0.5)
+        else:
+            start = (np.array([x0[name] for name in self.param_names], dtype = float) - self.lower) / (self.upper - self.lower)
+
+        # Initial simplex, step away from the bounds if needed
+        simplex = [start]
+        for i in range(num_params):
+            point = start.copy()
+            point[i] = point[i] + initial_step if point[i] + initial_step <= 1.0 else point[i] - initial_step
+            simplex.append(point)
+
+        simplex = np.array(simplex)
+        misfits = self._evaluate_scaled(simplex)
+
+        for _ in range(max_iter):
+            order = np.argsort(misfits)
+            simplex, misfits = simplex[order], misfits[order]
+
+            if np.isfinite(misfits[-1]) and misfits[-1] - misfits[0] < tol:
+                break
+
+            centroid = simplex[:-1].mean(axis = 0)
+            worst = simplex[-1]
+
+            candidates = np.array([
+                centroid + 1.0 * (centroid - worst),   # Reflection
+                centroid + 2.0 * (centroid - worst),   # Expansion
+                centroid + 0.5 * (centroid - worst),   # Outside contraction
+                centroid - 0.5 * (centroid - worst),   # Inside contraction
+            ]).clip(0.0, 1.0)
+
+            f_reflect, f_expand, f_outside, f_inside = self._evaluate_scaled(candidates)
+
+            shrink = False
+
+            if f_reflect < misfits[0]:
+                if f_expand < f_reflect:
+                    simplex[-1], misfits[-1] = candidates[1], f_expand
+                else:
+                    simplex[-1], misfits[-1] = candidates[0], f_reflect
+            elif f_reflect < misfits[-2]:
+                simplex[-1], misfits[-1] = candidates[0], f_reflect
+            elif f_reflect < misfits[-1]:
+                # The reflection is better than the worst point, contract outside of the simplex
+                if f_outside <= f_reflect:
+                    simplex[-1], misfits[-1] = candidates[2], f_outside
+                else:
+                    shrink = True
+            else:
+                # The reflection is no better than the worst point, contract inside of the simplex
+                if f_inside < misfits[-1]:
+                    simplex[-1], misfits[-1] = candidates[3], f_inside
+                else:
+                    shrink = True
+
+            if shrink:
+                # Shrink towards the best point, the new points are one batch
+                simplex[1:] = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+                misfits[1:] = self._evaluate_scaled(simplex[1:])
+
+        return self._get_best()
+
+    def evolution_strategy(self, x0 = None, population_size = None, max_iter = 50,
+                           initial_sigma = 0.3, seed = None):
+        """
+        (mu, lambda) evolution strategy with a diagonal covariance (a simplified CMA-ES)
+
+        Every generation is evaluated as one parallel batch, so the population size
+        should be a multiple of the number of sweep workers.
+
+        Inputs:
+            x0 (dict): Optional starting mean, defaults to the middle of the bounds
+            population_size (int): Number of candidates per generation, defaults to the number of sweep workers (at least 4)
+            max_iter (int): Number of generations
+            initial_sigma (float): Initial step size as a fraction of the bounds
+            seed (int): Seed of the random number generator
+
+        Returns:
+            dict with the best "params", its "misfit", the "num_evaluations" and the "history" df
+        """
+        num_params = len(self.param_names)
+        rng = np.random.default_rng(seed)
+
+        if population_size is None:
+            population_size = max(self.sweep.max_workers, 4)
+
+        num_parents = max(population_size // 2, 1)
+
+        # Log weights of the parents, best parent has the largest weight
+        weights = np.log(num_parents + 0.5) - np.log(np.arange(1, num_parents + 1))
+        weights = weights / weights.sum()
+        mu_eff = 1.0 / np.sum(weights**2)
+
+        # Learning rates of the step size and the diagonal variances
+        c_sigma = (mu_eff + 2.0) / (num_params + mu_eff + 5.0)
+        c_var   = min(1.0, mu_eff / (num_params + 2.0)**2)
+
+        if x0 is None:
+            mean = np.full(num_params, 0.5)
+        else:
+            mean = (np.array([x0[name] for name in self.param_names], dtype = float) - self.lower) / (self.upper - self.lower)
+
+        sigma = initial_sigma
+        variances = np.ones(num_params)
+
+        for _ in range(max_iter):
+            steps = rng.standard_normal((population_size, num_params)) * np.sqrt(variances)
+            candidates = np.clip(mean + sigma * steps, 0.0, 1.0)
+
+            misfits = self._evaluate_scaled(candidates)
+
+            parents = np.argsort(misfits)[:num_parents]
+            parent_steps = (candidates[parents] - mean) / sigma
+
+            new_mean = weights @ candidates[parents]
+
+            # Update the variances from the successful steps and the step size from the mean shift
+            variances = (1.0 - c_var) * variances + c_var * (weights @ parent_steps**2)
+            shift = np.linalg.norm((new_mean - mean) / (sigma * np.sqrt(variances))) * np.sqrt(mu_eff)
+            sigma = sigma * np.exp(c_sigma * (shift / np.sqrt(num_params) - 1.0) / 2.0)
+
+            mean = new_mean
+
+            if sigma < 1e-8:
+                break
+
+        return self._get_best()
@@ -0,0 +1,309 @@
+from concurrent.futures import ThreadPoolExecutor
+from lib.Driver_Classes.Mod_Driver_Sweep import DriverModelSweep
+
+
+class LoadTreeNode:
+    """
+    A segment of loads in a load tree, the loads are run together in one driver run
+
+    The node starts from the final state of its parent, or from the initial conditions
+    of the tree when it has no parent.
+    """
+    def __init__(self, parent = None):
+        self.parent = parent
+
+        self.loads    = []      # Loads run by this node
+        self.children = {}      # Child nodes keyed on the rendered text of their first load
+
+        # Names of the load paths that end at this node
+        self.leaf_names = []
+
+        # Set when the tree is scheduled
+        self.node_id = None
+        self.results = None
+
+    def __str__(self):
+        return_string = (f"Node ID: {self.node_id}\n"
+                         f"Number of loads: {len(self.loads)}\n"
+                         f"Number of children: {len(self.children)}\n"
+                         f"Leaf names: {self.leaf_names}\n"
+                         )
+
+        return return_string
+
+    def get_path(self):
+        """
+        Return the nodes from the root down to this node
+        """
+        path = []
+        node = self
+        while node is not None:
+            path.append(node)
+            node = node.parent
+
+        return path[::-1]
+
+class DriverModelLoadTree:
+    """
+    Runs load paths that share their first loads as a tree, each shared prefix is only run once
+
+    The load paths are merged into a prefix tree on the rendered text of their loads, so equal
+    loads are shared even when they are different PopularPath objects. Every node of the tree
+    is one driver run in its own folder. A node starts from the final stress and state variables
+    of its parent (written with write_initial_conditions_file), the nodes of each level run in
+    parallel on a DriverModelSweep worker pool, and the outputs along the path of each load path
+    are stitched back together.
+
+    The driver always starts a run from zero strain and zero time, so the stitched strain and
+    total time (time(2)) are offset by the final values of the previous node. The state passed
+    between the nodes is the last row of the output file, so the last load of a shared prefix
+    must write its last increment and the state is rounded to the precision of the output file.
+    Models that depend on anything other than the stress and state variables (e.g. the total
+    strain) don't restart exactly.
+    """
+    def __init__(self, base_folder_path, constitutive_model_name,
+                 inc_driver_exe_path, output_file_name = "output.txt",
+                 max_workers = None, run_folder_prefix = "node_",
+                 run_cache = None, instrument = False):
+
+        # Sweep that makes the folder and runs the driver of each node
+        self.sweep = DriverModelSweep(base_folder_path, constitutive_model_name, inc_driver_exe_path,
+                                      output_file_name = output_file_name, max_workers = max_workers,
+                                      run_folder_prefix = run_folder_prefix, run_cache = run_cache,
+                                      instrument = instrument)
+
+        self.constitutive_model_name = constitutive_model_name
+
+        # Root of the tree built by build_tree
+        self.root = None
+
+    def __str__(self):
+        return_string = (f"Constitutive model name: {self.constitutive_model_name}\n"
+                         f"Base folder path: {self.sweep.base_folder_path}\n"
+                         f"Number of nodes: {len(self.get_nodes())}\n"
+                         )
+
+        return return_string
+
+    @property
+    def metrics(self):
+        return self.sweep.metrics
+
+    @staticmethod
+    def get_load_key(load):
+        """
+        Return the key used to tell if two loads are the same
+        """
+        return load.render()
+
+    @staticmethod
+    def get_num_increments(load_list):
+        """
+        Return the total number of increments of a list of loads
+        """
+        return sum(int(load.input_params_dict["ninc"]) for load in load_list)
+
+    def build_tree(self, load_paths):
+        """
+        Merge the load paths into a prefix tree
+
+        Inputs:
+            load_paths (dict): {name: list of loads} of each load path
+
+        Returns:
+            The root LoadTreeNode. The root has no loads when the load paths don't share their first load
+        """
+        root = LoadTreeNode()
+
+        # Build a tree with one load per node
+        for name, load_list in load_paths.items():
+            if not isinstance(load_list, list):
+                load_list = [load_list]
+
+            if len(load_list) == 0:
+                raise ValueError(f"The load path {name} has no loads")
+
+            node = root
+            for load in load_list:
+                key = self.get_load_key(load)
+
+                if key not in node.children:
+                    child = LoadTreeNode(parent = node)
+                    child.loads = [load]
+                    node.children[key] = child
+
+                node = node.children[key]
+
+            node.leaf_names.append(name)
+
+        # Merge the chains of nodes that don't branch into a single run
+        self._merge_chains(root)
+
+        self.root = root
+
+        return root
+
+    def _merge_chains(self, node):
+        while len(node.children) == 1 and not node.leaf_names:
+            child = next(iter(node.children.values()))
+
+            node.loads      = node.loads + child.loads
+            node.children   = child.children
+            node.leaf_names = child.leaf_names
+
+            for grandchild in node.children.values():
+                grandchild.parent = node
+
+        for child in node.children.values():
+            self._merge_chains(child)
+
+    def get_levels(self):
+        """
+        Return the nodes that have loads, grouped by their depth in the tree
+        """
+        levels = []
+        level = [self.root] if self.root.loads else list(self.root.children.values())
+
+        while level:
+            levels.append(level)
+            level = [child for node in level for child in node.children.values()]
+
+        return levels
+
+    def get_nodes(self):
+        """
+        Return the nodes that have loads, parents first
+        """
+        if self.root is None:
+            return []
+
+        return [node for level in self.get_levels() for node in level]
+
+    def count_increments(self):
+        """
+        Return (increments run by the tree, increments of running every load path on its own)
+        """
+        nodes = self.get_nodes()
+
+        num_tree = sum(self.get_num_increments(node.loads) for node in nodes)
+        num_flat = sum(self.get_num_increments([load for path_node in node.get_path() for load in path_node.loads])
+                       * len(node.leaf_names) for node in nodes)
+
+        return num_tree, num_flat
+
+    @staticmethod
+    def get_final_state(results, num_state_vars):
+        """
+        Return the (init_stress, init_state_vars) of the last row of a run, see write_initial_conditions_file
+
+        The driver writes at least one statev column even when the model has no state variables,
+        so only the first num_state_vars columns (as many as the tree started with) are kept
+        """
+        final_stress = results.stress_df.iloc[-1].tolist()
+        final_state_vars = results.state_vars_df.iloc[-1, :num_state_vars].to_dict()
+
+        return final_stress, final_state_vars
+
+    def _check_prefix(self, node):
+        """
+        The children of a node start from its last row, so its last increment must be written
+        """
+        params = node.loads[-1].input_params_dict
+
+        if int(params["ninc"]) % int(params["every"]) != 0:
+            raise ValueError(f"The last load of a shared prefix must write its last increment, "
+                             f"ninc ({params['ninc']}) must be a multiple of every ({params['every']})")
+
+    def _run_node(self, node, properties, initial_conditions):
+        """
+        Run a node, a failed run (or a failed parent) leaves node.results as None
+        """
+        if node.parent is not None and node.parent.loads:
+            if node.parent.results is None:
+                return None
+
+            initial_conditions = self.get_final_state(node.parent.results, len(initial_conditions[1]))
+
+        try:
+            return self.sweep.run_variant(node.node_id, properties, initial_conditions, node.loads)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Run '{self.sweep.get_run_folder(node.node_id)}' failed: {e}")
+            return None
+
+    def stitch(self, node):
+        """
+        Stitch the outputs of the nodes from the root down to node into the results of one load path
+
+        The first row of each node repeats the last row of its parent and is dropped.
+
+        Returns:
+            DriverModelResults, None if any of the nodes failed
+        """
+        import numpy as np
+        from lib.Driver_Classes.Mod_Driver_Results import DriverModelResults
+
+        path = [path_node for path_node in node.get_path() if path_node.loads]
+        if any(path_node.results is None for path_node in path):
+            return None
+
+        columns = list(path[0].results.output_df.columns)
+
+        # Columns that restart from zero in every run
+        offset_columns = [columns.index(name) for name in columns if name == "time(2)" or name.startswith("stran(")]
+
+        blocks = []
+        offsets = np.zeros(len(offset_columns))
+        for i, path_node in enumerate(path):
+            block = path_node.results.output_df.to_numpy()
+
+            if i > 0:
+                block = block[1:].copy()
+                block[:, offset_columns] += offsets
+
+            offsets = block[-1, offset_columns]
+            blocks.append(block)
+
+        return DriverModelResults.from_array(columns, np.concatenate(blocks),
+                                             constitutive_model_name = self.constitutive_model_name)
+
+    def run(self, properties, initial_conditions, load_paths):
+        """
+        Run every load path, sharing the runs of their common prefixes
+
+        Inputs:
+            properties (dict): Material properties, see DriverModelSetup.write_parameters_file
+            initial_conditions (tuple): (init_stress, init_state_vars) at the start of every load path
+            load_paths (dict): {name: list of loads} of each load path
+
+        Returns:
+            Dict of {name: DriverModelResults} of the stitched load paths, None for the ones that failed
+        """
+        self.build_tree(load_paths)
+
+        levels = self.get_levels()
+
+        for node_id, node in enumerate(node for level in levels for node in level):
+            node.node_id = node_id
+
+            if node.children:
+                self._check_prefix(node)
+
+        # A level can only start once the level above it is done
+        with ThreadPoolExecutor(max_workers = self.sweep.max_workers) as executor:
+            for level in levels:
+                results = list(executor.map(lambda node: self._run_node(node, properties, initial_conditions), level))
+
+                for node, node_results in zip(level, results):
+                    node.results = node_results
+
+        # Leaves are only found in the nodes with loads, load paths can't be empty
+        stitched = {}
+        for node in self.get_nodes():
+            if node.leaf_names:
+                node_stitched = self.stitch(node)
+
+                for name in node.leaf_names:
+                    stitched[name] = node_stitched
+
+        # Same order as the input
+        return {name: stitched[name] for name in load_paths}
@@ -1,24 +1,34 @@
 import os
-import pandas as pd
-import numpy as np
-from typing import List, Dict, AnyStr
+import time
+import subprocess
 from lib.Driver_Classes.Mod_Driver_Setup import DriverModelSetup
-from lib.Driver_Classes.Mod_Driver_Results import DriverModelResults
-from lib.general_functions.executing_runs import run_batch_script, generate_batch_script
+from lib.general_functions.executing_runs import (
+    generate_batch_script, start_batch_script, launch_driver, start_driver,
+    kill_process_tree, DriverRunResult
+)
+from lib.general_functions.instrumentation import RunMetrics, timed_phase
 
 
 class DriverModel:
     """
     Model wraps the setup and results classes 
+
+    Importing this module and running the driver doesn't load numpy, pandas or matplotlib.
+    The results object, and with it pandas, is only created when self.results is first used,
+    so worker processes that only run the driver start quickly.
     """
     def __init__(self, folder_path, constitutive_model_name, 
-                 inc_driver_exe_path, output_file_name = "output.txt"):
+                 inc_driver_exe_path, output_file_name = "output.txt",
+                 run_cache = None, use_batch_file = None, instrument = False):
         
         # Init setup object
         self.setup = DriverModelSetup(folder_path, constitutive_model_name, output_file_name)
 
-        # init results object
-        self.results = DriverModelResults(folder_path, output_file_name)
+        # The results object is made on first use, see the results property
+        self._results = None
+
+        # Store the name of the output file
+        self.output_file_name = output_file_name
 
         # Store the path to the incremental driver exe
         self.inc_driver_exe_path = inc_driver_exe_path
@@ -26,6 +36,37 @@ class DriverModel:
         # Store the path to the folder containing all of the incremental driver files
         self.folder_path = folder_path
 
+        # Optional RunCache used to skip runs that have already been done
+        self.run_cache = run_cache
+
+        # Run the driver through a batch file on Windows and start it directly everywhere else
+        if use_batch_file is None:
+            use_batch_file = os.name == "nt"
+
+        self.use_batch_file = use_batch_file
+
+        # Opt-in timing of each phase of the run, shared with the setup and results objects
+        self.metrics = None
+        if instrument:
+            self.metrics = RunMetrics(run_name = folder_path)
+            self.setup.metrics   = self.metrics
+
+    @property
+    def results(self):
+        # Importing the results module loads pandas, only do it when the results are needed
+        if self._results is None:
+            from lib.Driver_Classes.Mod_Driver_Results import DriverModelResults
+
+            self._results = DriverModelResults(self.folder_path, self.output_file_name,
+                                               constitutive_model_name = self.setup.constitutive_model_name)
+            self._results.metrics = self.metrics
+
+        return self._results
+
+    @results.setter
+    def results(self, results):
+        self._results = results
+
     def __str__(self):
         """
         Prints information object the object when the object is called
@@ -38,20 +79,307 @@ class DriverModel:
         # and the setup
         return return_string
 
-    def run_model(self, batch_file_name = "run_model.bat"):
+    def run_model(self, batch_file_name = "run_model.bat", use_cache = True, timeout = None):
         """
         Runs the incremental driver test
+
+        If the model has a run_cache and an identical run (same input files and
+        executable) has already finished, the cached output file is copied into
+        the folder instead of running the driver.
+
+        Inputs:
+            timeout (float): Optional timeout in seconds, the driver is killed when it is exceeded
+
+        Returns:
+            DriverRunResult with the exit code and wall time of the run, use its succeeded
+            property to check the run. from_cache is set when the output came from the cache
         """
+        output_file_path = os.path.join(self.folder_path, self.output_file_name)
 
-        # Generate the batch script
-        generate_batch_script(self.folder_path, self.inc_driver_exe_path, batch_file_name=batch_file_name)
+        cache_key = None
+        if use_cache and self.run_cache is not None:
+            start_time = time.perf_counter()
+            cache_key = self.run_cache.get_key(self.folder_path, self.inc_driver_exe_path)
 
-        # Get the path to the batch file
-        batch_file_path = os.path.join(self.folder_path, batch_file_name)
+            if self.run_cache.fetch(cache_key, output_file_path):
+                print(f"Loaded cached output for '{self.folder_path}'.")
+                return DriverRunResult(self.inc_driver_exe_path, self.folder_path, 0, time.perf_counter() - start_time,
+                                       None, None, from_cache = True)
+
+        # A failed run must not leave the output of a previous run behind
+        self._remove_old_output()
+
+        if self.use_batch_file:
+            # Generate the batch script
+            generate_batch_script(self.folder_path, self.inc_driver_exe_path, batch_file_name=batch_file_name)
+
+            # Get the path to the batch file
+            batch_file_path = os.path.join(self.folder_path, batch_file_name)
+
+            # Start the batch file and wait for it, so the spawn is timed apart from the run
+            start_time = time.perf_counter()
+            with timed_phase(self.metrics, "process_spawn"):
+                process = start_batch_script(batch_file_path)
+            spawn_time = time.perf_counter() - start_time
+
+            timed_out = False
+            with timed_phase(self.metrics, "driver_execution") as record:
+                try:
+                    process.wait(timeout = timeout)
+                except subprocess.TimeoutExpired:
+                    self._stop_process(process)
+                    timed_out = True
+
+                if os.path.isfile(output_file_path):
+                    record["bytes"] = os.path.getsize(output_file_path)
+
+            # stdout and stderr of the batch file both go to its log file, see start_batch_script
+            log_file_path = os.path.splitext(batch_file_path)[0] + ".log"
+
+            run_result = DriverRunResult(batch_file_path, self.folder_path, process.returncode,
+                                         time.perf_counter() - start_time, log_file_path, log_file_path,
+                                         timed_out = timed_out, spawn_time = spawn_time)
+
+            if not run_result.succeeded:
+                print(f"The batch file '{batch_file_path}' failed with exit code {process.returncode}, "
+                      f"see the log file next to it.")
+        else:
+            run_result = launch_driver(self.folder_path, self.inc_driver_exe_path, timeout = timeout)
+
+            self._add_run_metrics(run_result, output_file_path)
+
+            if not run_result.succeeded:
+                print(f"The incremental driver in '{self.folder_path}' failed:\n{run_result}")
+
+        # Only store a run that finished cleanly, the old output was removed so the file is fresh
+        if run_result.succeeded and cache_key is not None and os.path.isfile(output_file_path):
+            self.run_cache.store(cache_key, output_file_path)
+
+        return run_result
+
+    async def run_model_async(self, batch_file_name = "run_model.bat", timeout = None,
+                              semaphore = None, use_cache = True):
+        """
+        Async counterpart of run_model that also loads the results
+
+        Inputs:
+            batch_file_name (str): Name of the batch file that runs the driver
+            timeout (float): Optional timeout in seconds, the driver is killed when it is exceeded
+            semaphore (asyncio.Semaphore): Optional semaphore that limits the number of concurrent runs
+            use_cache (bool): Use the run_cache of the model if there is one
+
+        Returns:
+            self.results with all of the outputs stored
+        """
+        # asyncio is only imported by the code paths that use it
+        import asyncio
+        from lib.general_functions.async_runs import (
+            generate_batch_script_async, run_batch_script_async, launch_driver_async
+        )
+
+        output_file_path = os.path.join(self.folder_path, self.output_file_name)
+
+        cache_key = None
+        if use_cache and self.run_cache is not None:
+            cache_key = await asyncio.to_thread(self.run_cache.get_key, self.folder_path, self.inc_driver_exe_path)
+
+        if cache_key is not None and await asyncio.to_thread(self.run_cache.fetch, cache_key, output_file_path):
+            print(f"Loaded cached output for '{self.folder_path}'.")
+        else:
+            # A failed run must not leave the output of a previous run behind
+            self._remove_old_output()
+
+            if self.use_batch_file:
+                await generate_batch_script_async(self.folder_path, self.inc_driver_exe_path, batch_file_name=batch_file_name)
+
+                batch_file_path = os.path.join(self.folder_path, batch_file_name)
+
+                await run_batch_script_async(batch_file_path, timeout = timeout, semaphore = semaphore,
+                                             metrics = self.metrics)
+            else:
+                run_result = await launch_driver_async(self.folder_path, self.inc_driver_exe_path,
+                                                       timeout = timeout, semaphore = semaphore)
+
+                self._add_run_metrics(run_result, output_file_path)
+
+                if run_result.timed_out:
+                    raise asyncio.TimeoutError(f"The incremental driver in '{self.folder_path}' timed out.")
+
+                if run_result.returncode != 0:
+                    raise subprocess.CalledProcessError(run_result.returncode, self.inc_driver_exe_path)
+
+            if cache_key is not None:
+                await asyncio.to_thread(self.run_cache.store, cache_key, output_file_path)
+
+        # Parsing the output is blocking work, keep it off the event loop
+        await asyncio.to_thread(self.results.store_all)
+
+        return self.results
+
+    def _add_run_metrics(self, run_result, output_file_path):
+        """
+        Record the spawn and execution time of a driver that was started directly
+        """
+        if self.metrics is None:
+            return
+
+        self.metrics.add("process_spawn", run_result.spawn_time)
+        self.metrics.add("driver_execution", run_result.wall_time - run_result.spawn_time,
+                         os.path.getsize(output_file_path) if os.path.isfile(output_file_path) else 0)
+
+    def _start_process(self, batch_file_name = "run_model.bat"):
+        """
+        Start the driver without waiting for it and return the process
+        """
+        if self.use_batch_file:
+            generate_batch_script(self.folder_path, self.inc_driver_exe_path, batch_file_name=batch_file_name)
+            batch_file_path = os.path.join(self.folder_path, batch_file_name)
+
+            return start_batch_script(batch_file_path)
+
+        return start_driver(self.folder_path, self.inc_driver_exe_path)
+
+    def _stop_process(self, process):
+        """
+        Kill a running driver process
+        """
+        if process.poll() is not None:
+            return
+
+        if self.use_batch_file:
+            # Killing the shell doesn't stop the driver it started, kill the whole tree
+            kill_process_tree(process)
+        else:
+            process.kill()
+
+        process.wait()
+
+    def _remove_old_output(self):
+        """
+        Remove the output of a previous run so its rows aren't read as new ones
+        """
+        output_file_path = os.path.join(self.folder_path, self.output_file_name)
+
+        if os.path.isfile(output_file_path):
+            os.remove(output_file_path)
+
+        return output_file_path
+
+    def run_model_watched(self, criteria, batch_file_name = "run_model.bat", poll_interval = 0.2):
+        """
+        Runs the incremental driver test and stops it early if a criterion fires
+
+        The output file is checked every poll_interval seconds. As soon as one of the
+        criteria (see run_watchdog.py) fires the driver is killed, the rows written up to
+        that point are kept and loaded into self.results.
+
+        Inputs:
+            criteria (list): StopCriterion objects, e.g. [PeakQDrop(0.2), NonFiniteValues(), WallClockBudget(60)],
+                             they are reset before the run starts
+            batch_file_name (str): Name of the batch file, only used when use_batch_file is True
+            poll_interval (float): Seconds between checks of the output file
+
+        Returns:
+            The reason the run was stopped, None if the driver finished on its own
+
+        Raises:
+            subprocess.CalledProcessError if the driver failed and none of the criteria fired,
+            the rows it wrote are still loaded into self.results first
+        """
+        from lib.general_functions.output_tailer import OutputTailer
+        from lib.general_functions.run_watchdog import check_criteria
+
+        output_file_path = self._remove_old_output()
+
+        tailer = OutputTailer(output_file_path, self.setup.load_list)
+
+        # The criteria can be reused between runs, don't carry over their state
+        for criterion in criteria:
+            criterion.reset()
+
+        start_time = time.perf_counter()
+        process = self._start_process(batch_file_name)
+
+        stop_reason = None
+        try:
+            finished = False
+            while not finished and stop_reason is None:
+                finished = process.poll() is not None
+
+                block = tailer.read_new_rows()
+                elapsed_time = time.perf_counter() - start_time
+
+                stop_reason = check_criteria(criteria, tailer.columns, block, elapsed_time)
+
+                if not finished and stop_reason is None:
+                    time.sleep(poll_interval)
+        finally:
+            self._stop_process(process)
+
+        if stop_reason is not None:
+            print(f"Stopped the incremental driver in '{self.folder_path}': {stop_reason}.")
+
+        # Keep the (possibly truncated) results
+        if os.path.isfile(output_file_path):
+            self.results.store_all()
+
+        # A driver that was killed by a criterion always has a non-zero exit code
+        if stop_reason is None and process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, self.inc_driver_exe_path)
+
+        return stop_reason
+
+    def run_model_live(self, batch_file_name = "run_model.bat", poll_interval = 0.5, callback = None):
+        """
+        Runs the incremental driver test without blocking and tails the output file
+
+        This is a generator, every poll_interval seconds it yields the rows that the driver
+        appended to the output file since the last poll together with the progress of the run.
+        The run cache is not used because the rows are read while the driver writes them.
+
+        Inputs:
+            batch_file_name (str): Name of the batch file that runs the driver
+            poll_interval (float): Seconds between checks of the output file
+            callback: Optional function called as callback(new_rows_df, progress) on each poll
+
+        Yields:
+            (new_rows_df, progress) where progress is the dict from OutputTailer.get_progress
+        """
+        import pandas as pd
+        from lib.general_functions.output_tailer import OutputTailer
+
+        output_file_path = self._remove_old_output()
+
+        tailer = OutputTailer(output_file_path, self.setup.load_list)
+
+        process = self._start_process(batch_file_name)
+
+        try:
+            finished = False
+            while not finished:
+                # Check if the process is done before reading so the last rows are always read
+                finished = process.poll() is not None
+
+                block = tailer.read_new_rows()
+
+                if len(block) > 0:
+                    new_rows_df = pd.DataFrame(block, columns = tailer.columns)
+                    progress    = tailer.get_progress()
+
+                    if callback is not None:
+                        callback(new_rows_df, progress)
+
+                    yield new_rows_df, progress
+
+                if not finished:
+                    time.sleep(poll_interval)
+        finally:
+            # Stop the driver if the generator is closed before the run finishes
+            self._stop_process(process)
+
+        if process.returncode != 0:
+            print(f"The incremental driver in '{self.folder_path}' exited with code {process.returncode}.")
 
-        # Run the model
-        run_batch_script(batch_file_path)
-        
 
 
 if __name__ == "__main__":
@@ -1,11 +1,23 @@
 # Standard imports
 import os
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # Lib imports
+from lib.general_functions.output_reader import (
+     read_output_file, read_output_header, get_column_indices, iter_output_chunks
+)
+from lib.general_functions.stream_reducers import (
+     reduce_output_file, StressInvariantExtrema, FinalState, DecimatedTrace
+)
+from lib.general_functions.result_store import save_result_store, load_store_group
+from lib.general_functions.instrumentation import timed_phase, timed_method
+from lib.general_functions.downsampling import downsample, get_auto_max_points
+from lib.general_functions.statev_registry import get_state_variables, get_statev_columns
 from lib.general_functions.invariant_functions import (
-     calc_mean_stress, calc_q_invariant, calc_dev_strain_invariant, calc_volumetric_strain_invariant
+     calc_mean_stress_array, calc_q_invariant_array, calc_dev_strain_invariant_array,
+     calc_volumetric_strain_invariant_array, calc_j2_array, calc_j3_array, calc_lode_angle_array,
+     calc_principal_stresses_array, calc_principal_strains_array
 )
 
 class DriverModelResults:
@@ -13,7 +25,8 @@ class DriverModelResults:
     Class to represent the results of the driver model
     """
 
-    def __init__(self, results_folder_path, output_file_name = "output.txt"):
+    def __init__(self, results_folder_path, output_file_name = "output.txt", dtype = np.float64,
+                 constitutive_model_name = None):
         # Store the folder that the results are in
         self.results_folder_path = results_folder_path
 
@@ -26,12 +39,177 @@ class DriverModelResults:
         # variable to store the output file df
         self.output_df = None
 
+        # Type of the values read from the output file, np.float32 halves the memory of a run
+        self.dtype = dtype
+
+        # Used to look up the names of the state variables, see statev_registry.py
+        self.constitutive_model_name = constitutive_model_name
+
+        # Optional RunMetrics, records the time spent parsing, post-processing and plotting
+        self.metrics = None
+
+        # Folder of a binary result store, see save_store and from_store
+        self.store_folder_path = None
+
+        # Derived quantities (invariants etc.) keyed on (name, sign), cleared when the data changes
+        self._derived_cache = {}
+
         # Variables to hold the results from the incremental driver run
         self.time          = None
+        self.time_df       = None
         self.stress_df     = None
         self.strain_df     = None
         self.state_vars_df = None
 
+    # The result dfs are loaded from the binary store the first time they are accessed
+    def _get_lazy_df(self, attr_name, group):
+        df = getattr(self, attr_name)
+
+        if df is None and self.store_folder_path is not None:
+            columns, data = load_store_group(self.store_folder_path, group)
+            df = pd.DataFrame(data, columns = columns, copy = False)
+            setattr(self, attr_name, df)
+
+        return df
+
+    @property
+    def time_df(self):
+        return self._get_lazy_df("_time_df", "time")
+
+    @time_df.setter
+    def time_df(self, df):
+        self._time_df = df
+        self.clear_derived_cache()
+
+    @property
+    def stress_df(self):
+        return self._get_lazy_df("_stress_df", "stress")
+
+    @stress_df.setter
+    def stress_df(self, df):
+        self._stress_df = df
+        self.clear_derived_cache()
+
+    @property
+    def strain_df(self):
+        return self._get_lazy_df("_strain_df", "stran")
+
+    @strain_df.setter
+    def strain_df(self, df):
+        self._strain_df = df
+        self.clear_derived_cache()
+
+    @property
+    def state_vars_df(self):
+        return self._get_lazy_df("_state_vars_df", "statev")
+
+    @state_vars_df.setter
+    def state_vars_df(self, df):
+        self._state_vars_df = df
+        self.clear_derived_cache()
+
+    def clear_derived_cache(self):
+        """
+        Forget the cached invariants, done automatically when the stored dfs are replaced
+        """
+        self._derived_cache = {}
+
+    def _get_derived(self, name, sign, compute):
+        """
+        Return a derived quantity from the cache, computing it on the first call
+
+        The quantity is cached for every sign it is asked for, the unsigned value is computed
+        once and flipped for the other sign. The cached objects are shared, copy them before
+        changing them in place.
+
+        Inputs:
+            name (str): Name of the quantity
+            sign (float): 1.0 or -1.0, e.g. -1.0 for compression positive
+            compute: Function that returns the quantity with sign 1.0
+        """
+        key = (name, sign)
+
+        if key not in self._derived_cache:
+            if sign == 1.0:
+                with timed_phase(self.metrics, "invariants") as record:
+                    value = compute()
+                    record["bytes"] = value.to_numpy().nbytes
+            else:
+                value = sign * self._get_derived(name, 1.0, compute)
+
+            self._derived_cache[key] = value
+
+        return self._derived_cache[key]
+
+    @classmethod
+    def from_store(cls, store_folder_path, output_file_name = "output.txt"):
+        """
+        Open the results saved with save_store
+
+        Nothing is read until the results are used, stress_df, strain_df, state_vars_df
+        and time_df are each loaded from their own memory mapped file on first access
+        """
+        results = cls(os.path.dirname(os.path.abspath(store_folder_path)), output_file_name)
+
+        results.store_folder_path = store_folder_path
+
+        return results
+
+    @classmethod
+    def from_array(cls, columns, data, results_folder_path = "", output_file_name = "output.txt",
+                   constitutive_model_name = None):
+        """
+        Make results from rows that are already in memory, e.g. from the UmatEngine
+
+        Inputs:
+            columns (list): Column names in the output file layout
+            data (array): (num_rows, num_columns) array
+        """
+        data = np.asarray(data)
+
+        results = cls(results_folder_path, output_file_name, dtype = data.dtype,
+                      constitutive_model_name = constitutive_model_name)
+
+        results.output_df = pd.DataFrame(data, columns = columns, copy = False)
+
+        results.store_times()
+        results.store_output_stress()
+        results.store_output_strains()
+        results.store_output_state_vars()
+
+        return results
+
+    def get_default_store_folder_path(self):
+        """
+        Return the default folder of the binary store, next to the output file
+        """
+        output_name = os.path.splitext(self.output_file_name)[0]
+
+        return os.path.join(self.results_folder_path, f"{output_name}_store")
+
+    def save_store(self, store_folder_path = None):
+        """
+        Save the results as a binary store that can be reopened with from_store
+
+        Inputs:
+            store_folder_path (str): Folder to save the store in. Defaults to "{output name}_store"
+                                     inside of the results folder
+        """
+        if store_folder_path is None:
+            store_folder_path = self.get_default_store_folder_path()
+
+        if self.output_df is None:
+            # Skip the df, the store only needs the array
+            columns, data = read_output_file(self.output_file_path)
+        else:
+            columns, data = list(self.output_df.columns), self.output_df.to_numpy()
+
+        save_result_store(store_folder_path, columns, data)
+
+        self.store_folder_path = store_folder_path
+
+        return store_folder_path
+
     def __str__(self) -> str:
         return_string = (f"Output file name: {self.output_file_name}\n"
                          f"Results folder path: {self.results_folder_path}\n"
@@ -39,25 +217,113 @@ class DriverModelResults:
 
         return return_string
 
-    def get_output_file_as_df(self):
+    def get_output_file_as_df(self, usecols = None):
         """
         Return the output file as a df
+
+        The df wraps the array of the values without copying it.
+
+        Inputs:
+            usecols (list): Optional list of column names, indices or groups ("time", "stran",
+                            "stress", "statev") to read. The other columns are not parsed
         """
 
-        # Read the file as a df, delim using white space
-        df = pd.read_csv(self.output_file_path, sep = '\\s+')
+        with timed_phase(self.metrics, "output_parsing") as record:
+            # Read the numeric body straight into a single array of self.dtype
+            columns, data = read_output_file(self.output_file_path, usecols = usecols, dtype = self.dtype)
+
+            df = pd.DataFrame(data, columns = columns, copy = False)
+
+            record["bytes"] = os.path.getsize(self.output_file_path)
 
         return df
 
-    def store_output_file_as_df(self):
+    def iter_output_chunks(self, chunk_size = 100_000, usecols = None):
+        """
+        Read the output file as a sequence of dfs with at most chunk_size rows
+
+        Only one chunk is held in memory at a time, use this for output files
+        that are too large for store_all
+        """
+        columns = read_output_header(self.output_file_path)
+
+        if usecols is not None:
+            columns = [columns[i] for i in get_column_indices(columns, usecols)]
+
+        for block in iter_output_chunks(self.output_file_path, chunk_size = chunk_size, usecols = usecols):
+            yield pd.DataFrame(block, columns = columns, copy = False)
+
+    def summarize_output(self, chunk_size = 100_000, decimate_every = 100, reducers = None):
+        """
+        Summarize the output file in bounded memory
+
+        By default returns the min/max mean stress and q with the peak q, the final
+        state (last row) and a trace with every decimate_every-th row. The trace is made
+        coarser for long runs so it never holds more than DecimatedTrace.max_rows rows.
+
+        Inputs:
+            chunk_size (int): Number of rows read at a time
+            decimate_every (int): Spacing of the rows kept in the trace
+            reducers (list): Optional list of StreamReducer objects to use instead of the defaults
+
+        Returns:
+            dict with the result of each reducer keyed on its name
+        """
+        if reducers is None:
+            reducers = [StressInvariantExtrema(), FinalState(), DecimatedTrace(decimate_every)]
+
+        summary = reduce_output_file(self.output_file_path, reducers, chunk_size = chunk_size)
+
+        # Return the trace as a df like the other results
+        if "trace" in summary:
+            trace, columns = summary["trace"]
+            summary["trace"] = pd.DataFrame(trace, columns = columns)
+
+        return summary
+
+    def store_output_file_as_df(self, usecols = None):
         """
         Read the output file
+
+        Inputs:
+            usecols (list): Optional selection of the columns to read, see get_output_file_as_df
         """
-        df = self.get_output_file_as_df()
+        df = self.get_output_file_as_df(usecols = usecols)
 
         # Store the df
         self.output_df = df
 
+    def _get_column_view(self, col_names, names = None):
+        """
+        Return a df with some of the columns of output_df that shares its memory
+
+        The output file is read first if it hasn't been. Columns that are next to each other
+        in the output file (e.g. the stress or the statev columns) are returned as a view of the
+        output_df array, any other selection is copied.
+
+        Inputs:
+            col_names (list): Columns of output_df to return
+            names (list): Optional new names of the columns
+        """
+        if self.output_df is None:
+            self.store_output_file_as_df()
+
+        columns = list(self.output_df.columns)
+        indices = [columns.index(name) for name in col_names]
+
+        # The whole run is a single block, so to_numpy returns the array itself
+        data = self.output_df.to_numpy()
+
+        if indices and indices == list(range(indices[0], indices[0] + len(indices))):
+            block = data[:, indices[0]:indices[0] + len(indices)]
+        else:
+            block = data[:, indices]
+
+        if names is None:
+            names = col_names
+
+        return pd.DataFrame(block, columns = list(names), index = self.output_df.index, copy = False)
+
     def store_times(self,
                     col_names = ["time(1)", "time(2)"]):
         """
@@ -65,12 +331,7 @@ class DriverModelResults:
         TODO: Don't know the difference between time1 and 2
         """
 
-        if self.output_df is None:
-            df = self.get_output_file_as_df()
-        else:
-            df = self.output_df
-
-        self.time_df = df[col_names]
+        self.time_df = self._get_column_view(col_names)
  
     def store_output_stress(self, 
                            col_names = ["stress(1)", "stress(2)", "stress(3)", 
@@ -79,47 +340,58 @@ class DriverModelResults:
         Store the stress terms
         """
 
-        if self.output_df is None:
-            df = self.get_output_file_as_df()
-        else:
-            # df already stored
-            df = self.output_df
-
-        self.stress_df = df[col_names]
+        self.stress_df = self._get_column_view(col_names)
 
     def store_output_strains(self,
                              col_names = ["stran(1)", "stran(2)", "stran(3)",
                                           "stran(4)", "stran(5)", "stran(6)"]):
-        if self.output_df is None:
-            df = self.get_output_file_as_df()
-        else:
-            df = self.output_df
+        self.strain_df = self._get_column_view(col_names)
 
-        self.strain_df = df[col_names]
-
-    def store_output_state_vars(self, substring = "statev"):
+    def store_output_state_vars(self, substring = "statev", state_vars = None):
         """
         Gets the state variables from the output.txt file
+
+        Inputs:
+            state_vars (list): Optional names of the state variables to keep, looked up in the
+                               statev schema of constitutive_model_name. The columns of
+                               state_vars_df are then named after them
         """
 
         if self.output_df is None:
-            df = self.get_output_file_as_df()
-        else:
-            df = self.output_df
+            self.store_output_file_as_df()
+
+        if state_vars is not None:
+            col_names = get_statev_columns(self.constitutive_model_name, state_vars)
+            self.state_vars_df = self._get_column_view(col_names, names = state_vars)
+            return
         
         # Get the column names that have statv in them
         # The number of them depends on the model
         # Incremental driver always outputs at least one even if zero are passed
         # TODO: look into this
-        col_names = [name for name in df.columns if "statev" in name]
+        col_names = [name for name in self.output_df.columns if substring in name]
 
-        self.state_vars_df = df[col_names]
+        self.state_vars_df = self._get_column_view(col_names)
 
-    def store_all(self):
+    def store_all(self, state_vars = None):
         """
         Store the df and each of the variables
+
+        The whole run is kept in one array, time_df, stress_df, strain_df and state_vars_df
+        are views of output_df and don't hold copies of the data
+
+        Inputs:
+            state_vars (list): Optional names of the state variables to load (see statev_registry.py),
+                               the other statev columns are never parsed
         """
-        self.store_output_file_as_df()
+        usecols = None
+        if state_vars is not None:
+            usecols = ["time", "stran", "stress"] + get_statev_columns(self.constitutive_model_name, state_vars)
+
+        self.store_output_file_as_df(usecols = usecols)
+
+        # Store the times
+        self.store_times()
 
         # Store the stress variables
         self.store_output_stress()
@@ -128,50 +400,140 @@ class DriverModelResults:
         self.store_output_strains()
 
         # Store the state variables
-        self.store_output_state_vars()
+        self.store_output_state_vars(state_vars = state_vars)
 
-    def get_mean_stress(self):
+    def get_mean_stress(self, sign = 1.0):
         """
         Returns the mean stress applied to a df
+
+        Inputs:
+            sign (float): -1.0 flips the sign, e.g. for compression positive
         """
+        def compute():
+            return pd.Series(calc_mean_stress_array(self.stress_df), index = self.stress_df.index)
 
-        mean_stress = self.stress_df.apply(calc_mean_stress, axis = 1)
+        return self._get_derived("mean_stress", sign, compute)
 
-        return mean_stress
-    
     def get_q_invariant(self):
         """
         Returns the deviatoric stress invariant
         """
+        def compute():
+            return pd.Series(calc_q_invariant_array(self.stress_df), index = self.stress_df.index)
 
-        q = self.stress_df.apply(calc_q_invariant, axis = 1)
-
-        return q
+        return self._get_derived("q", 1.0, compute)
 
-    def get_volumetric_strain(self):
+    def get_volumetric_strain(self, sign = 1.0):
         """
         Returns the volumetric strain using the strain df
+
+        Inputs:
+            sign (float): -1.0 flips the sign, e.g. for compression positive
         """
-        eps_p = self.strain_df.apply(calc_volumetric_strain_invariant, axis = 1)
+        def compute():
+            return pd.Series(calc_volumetric_strain_invariant_array(self.strain_df), index = self.strain_df.index)
+
+        return self._get_derived("vol_strain", sign, compute)
 
-        return eps_p
-    
     def get_deviatoric_strain(self):
         """
         Returns the deviatoric strain
         """
-        eps_q = self.strain_df.apply(lambda row: calc_dev_strain_invariant(row), axis = 1)
+        def compute():
+            return pd.Series(calc_dev_strain_invariant_array(self.strain_df), index = self.strain_df.index)
+
+        return self._get_derived("dev_strain", 1.0, compute)
+
+    def get_j2(self):
+        """
+        Returns the second invariant of the deviatoric stress
+        """
+        def compute():
+            return pd.Series(calc_j2_array(self.stress_df), index = self.stress_df.index)
+
+        return self._get_derived("J2", 1.0, compute)
+
+    def get_j3(self):
+        """
+        Returns the third invariant of the deviatoric stress
+        """
+        def compute():
+            return pd.Series(calc_j3_array(self.stress_df), index = self.stress_df.index)
+
+        return self._get_derived("J3", 1.0, compute)
+
+    def get_lode_angle(self):
+        """
+        Returns the Lode angle of the stress in radians, see calc_lode_angle_array
+        """
+        def compute():
+            return pd.Series(calc_lode_angle_array(self.stress_df), index = self.stress_df.index)
+
+        return self._get_derived("lode_angle", 1.0, compute)
+
+    def get_principal_stresses(self):
+        """
+        Returns a df with the principal stresses, largest first
+        """
+        def compute():
+            return pd.DataFrame(calc_principal_stresses_array(self.stress_df),
+                                columns = ["sigma_1", "sigma_2", "sigma_3"], index = self.stress_df.index)
 
-        return eps_q
-    
-    def quick_plot_stress(self, figsize = (8, 4), compression_pos = True, axs = None, **kwargs):
+        return self._get_derived("principal_stresses", 1.0, compute)
+
+    def get_principal_strains(self):
+        """
+        Returns a df with the principal strains, largest first
+        """
+        def compute():
+            return pd.DataFrame(calc_principal_strains_array(self.strain_df),
+                                columns = ["eps_1", "eps_2", "eps_3"], index = self.strain_df.index)
+
+        return self._get_derived("principal_strains", 1.0, compute)
+
+    def get_state_var(self, name):
+        """
+        Returns a state variable by its name in the statev schema, cast to the dtype of the schema
+        """
+        state_var = get_state_variables(self.constitutive_model_name, [name])[0]
+
+        # The state vars are named after the schema when they were loaded by name
+        column = name if name in self.state_vars_df.columns else state_var.column
+
+        return self.state_vars_df[column].astype(state_var.dtype, copy = False)
+
+    @staticmethod
+    def _plot_curve(axs, x, y, max_points = "auto", downsample_method = "lttb", **kwargs):
+        """
+        Plot a curve with at most max_points points
+
+        Inputs:
+            max_points: "auto" to use two points per pixel of the axes width, an int, or
+                        None to plot every row
+            downsample_method (str): "lttb" or "minmax", see downsampling.py
+        """
+        if max_points == "auto":
+            max_points = get_auto_max_points(axs)
+
+        x, y = downsample(x, y, max_points, method = downsample_method)
+
+        return axs.plot(x, y, **kwargs)
+
+    @timed_method("plotting")
+    def quick_plot_stress(self, figsize = (8, 4), compression_pos = True, axs = None,
+                          max_points = "auto", downsample_method = "lttb", **kwargs):
         """
         Make the q vs. p plot
+
+        Long curves are downsampled to max_points, see _plot_curve
         """
 
         # Assumes that the stress variables are already loaded
         # Make the figure if no axs object is passed
         if axs is None:
+            # pyplot is slow to import, only load it when a figure is made
+            import matplotlib.pyplot as plt
+
             fig, axs = plt.subplots(nrows = 1, ncols = 1, figsize = figsize)
         
         # Check if compression should be positive
@@ -181,19 +543,23 @@ class DriverModelResults:
             sign = 1.0
 
         # Calc the q invariant
-        mean_stress = sign * self.get_mean_stress()
+        mean_stress = self.get_mean_stress(sign = sign)
         q           = self.get_q_invariant()
 
-        axs.plot(mean_stress, q, **kwargs)
+        self._plot_curve(axs, mean_stress, q, max_points, downsample_method, **kwargs)
 
         # Format the plot
         axs.set_title("Deviatoric Stress vs. Mean Stress")
         axs.set_xlabel("Mean Stress")
         axs.set_ylabel("Deviatoric Stress")
 
-    def quick_plot_strain(self, figsize = (8, 4), compression_pos = True, axs = None, **kwargs):
+    @timed_method("plotting")
+    def quick_plot_strain(self, figsize = (8, 4), compression_pos = True, axs = None,
+                          max_points = "auto", downsample_method = "lttb", **kwargs):
         """
         Make the $eps_q$ vs. $eps_v$ plot
+
+        Long curves are downsampled to max_points, see _plot_curve
         """
 
         # Check if compression should be positive
@@ -203,24 +569,32 @@ class DriverModelResults:
             sign = 1.0
 
         if axs is None:
+            # pyplot is slow to import, only load it when a figure is made
+            import matplotlib.pyplot as plt
+
             fig, axs = plt.subplots(nrows = 1, ncols = 1, figsize = figsize)
         
-        eps_p = sign * self.get_volumetric_strain()
+        eps_p = self.get_volumetric_strain(sign = sign)
         eps_q = self.get_deviatoric_strain()
 
-        axs.plot(eps_p, eps_q, **kwargs)
+        self._plot_curve(axs, eps_p, eps_q, max_points, downsample_method, **kwargs)
 
         axs.set_title(r"$\epsilon_{q}$ vs. $\epsilon_{p}$ invariants")
         axs.set_xlabel(r"Volumetric strain invariant, $\epsilon_{p}$")
         axs.set_ylabel(r"Deviatoric strain invar, $\epsilon_{q}$")
 
+    @timed_method("plotting")
     def quick_quad_plot(self, figsize = (10,10), axial_strain_id = "stran(1)",
                         stress_units = "kPa", strain_units = "-",
-                        compression_pos = True):
+                        compression_pos = True, max_points = "auto", downsample_method = "lttb"):
         """
         Make the quad plot that is really helpful for visualizing soil
+
+        Long curves are downsampled to max_points, see _plot_curve
         """
 
+        import matplotlib.pyplot as plt
+
         # Make the figure and axs
         fig, axs = plt.subplots(nrows = 2, ncols = 2, figsize = figsize)
 
@@ -232,13 +606,13 @@ class DriverModelResults:
 
         # Get the data
         axial_strain = sign * self.strain_df[axial_strain_id]
-        mean_stress  = sign * self.get_mean_stress()
+        mean_stress  = self.get_mean_stress(sign = sign)
         q            = self.get_q_invariant()
-        vol_strain   = sign * self.get_volumetric_strain()
+        vol_strain   = self.get_volumetric_strain(sign = sign)
 
 
         # Make the q vs. axial strain \epsilon_{a}
-        axs[0, 0].plot(axial_strain, q)
+        self._plot_curve(axs[0, 0], axial_strain, q, max_points, downsample_method)
 
         # Format plot
         axs[0,0].set_title(r"q vs. $\epsilon_{a}$")
@@ -246,7 +620,7 @@ class DriverModelResults:
         axs[0,0].set_ylabel(f"q [{stress_units}]")
 
         # Make the q vs. p plot
-        axs[0, 1].plot(mean_stress, q)
+        self._plot_curve(axs[0, 1], mean_stress, q, max_points, downsample_method)
 
         # Format the plot
         axs[0, 1].set_title(r"q vs. p")
@@ -254,7 +628,7 @@ class DriverModelResults:
         axs[0, 1].set_ylabel(f"q [{stress_units}]")
 
         # Make the \epislon_{v} vs \epsilon_{a} plot
-        axs[1, 0].plot(axial_strain, vol_strain)
+        self._plot_curve(axs[1, 0], axial_strain, vol_strain, max_points, downsample_method)
         
         # Format the plot
         axs[1, 0].set_title(r"$\epsilon_{v}$ vs. $\epsilon_{a}$")
@@ -262,7 +636,7 @@ class DriverModelResults:
         axs[1, 0].set_ylabel(r"$\epsilon_{v}$" +  f"[{strain_units}]")
 
         # Make the \episilon_{v} vs. p plot
-        axs[1, 1].plot(mean_stress, vol_strain)
+        self._plot_curve(axs[1, 1], mean_stress, vol_strain, max_points, downsample_method)
 
         # Format the plots
         axs[1, 1].set_title(r"$\epsilon_{v}$ vs. p")
@@ -273,3 +647,70 @@ class DriverModelResults:
         plt.tight_layout()
 
 
+
+    @staticmethod
+    def quick_plot_overlay(results_list, kind = "stress", figsize = (8, 4), axial_strain_id = "stran(1)",
+                           compression_pos = True, axs = None, max_points = "auto",
+                           downsample_method = "lttb", colors = None, **kwargs):
+        """
+        Overlay the curves of many runs in a single LineCollection
+
+        All of the curves are drawn in one call, so hundreds of runs plot about as fast as one.
+        Every curve is downsampled to max_points, see _plot_curve.
+
+        Inputs:
+            results_list (list): DriverModelResults objects with their results stored
+            kind (str): "stress" (q vs. p), "strain" (eps_q vs. eps_v), "q_axial" (q vs. eps_a)
+                        or "vol_axial" (eps_v vs. eps_a)
+            colors: Optional color or list of colors, one per run. Defaults to the color cycle
+            kwargs: Passed to LineCollection, e.g. linewidths or alpha
+
+        Returns:
+            The LineCollection
+        """
+        from matplotlib.collections import LineCollection
+
+        sign = -1.0 if compression_pos else 1.0
+
+        curves = {
+            "stress"   : (lambda r: r.get_mean_stress(sign = sign), lambda r: r.get_q_invariant(),
+                          "Deviatoric Stress vs. Mean Stress", "Mean Stress", "Deviatoric Stress"),
+            "strain"   : (lambda r: r.get_volumetric_strain(sign = sign), lambda r: r.get_deviatoric_strain(),
+                          r"$\epsilon_{q}$ vs. $\epsilon_{p}$ invariants",
+                          r"Volumetric strain invariant, $\epsilon_{p}$", r"Deviatoric strain invar, $\epsilon_{q}$"),
+            "q_axial"  : (lambda r: sign * r.strain_df[axial_strain_id], lambda r: r.get_q_invariant(),
+                          r"q vs. $\epsilon_{a}$", r"$\epsilon_{a}$", "q"),
+            "vol_axial": (lambda r: sign * r.strain_df[axial_strain_id], lambda r: r.get_volumetric_strain(sign = sign),
+                          r"$\epsilon_{v}$ vs. $\epsilon_{a}$", r"$\epsilon_{a}$", r"$\epsilon_{v}$"),
+        }
+
+        if kind not in curves:
+            raise ValueError(f"{kind} is not one of the overlay plots. The plots are: {list(curves.keys())}")
+
+        get_x, get_y, title, x_label, y_label = curves[kind]
+
+        if axs is None:
+            import matplotlib.pyplot as plt
+
+            fig, axs = plt.subplots(nrows = 1, ncols = 1, figsize = figsize)
+
+        if max_points == "auto":
+            max_points = get_auto_max_points(axs)
+
+        segments = []
+        for results in results_list:
+            x, y = downsample(get_x(results), get_y(results), max_points, method = downsample_method)
+            segments.append(np.column_stack([x, y]))
+
+        if colors is None:
+            colors = [f"C{i % 10}" for i in range(len(segments))]
+
+        lines = LineCollection(segments, colors = colors, **kwargs)
+        axs.add_collection(lines)
+        axs.autoscale_view()
+
+        axs.set_title(title)
+        axs.set_xlabel(x_label)
+        axs.set_ylabel(y_label)
+
+        return lines
@@ -0,0 +1,294 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+from lib.general_functions.invariant_functions import (
+     calc_mean_stress_array, calc_q_invariant_array, calc_dev_strain_invariant_array,
+     calc_volumetric_strain_invariant_array, calc_j2_array, calc_j3_array, calc_lode_angle_array,
+     calc_principal_stresses_array, calc_principal_strains_array
+)
+
+class DriverModelResultsCollection:
+    """
+    Holds the results of many runs as stacked arrays for ensemble analysis
+
+    The time, stress, strain and state variables of every run are stacked into arrays of
+    shape (num_runs, num_steps, num_components). Runs with fewer steps are padded with NaN,
+    self.lengths holds the number of steps of each run and self.offsets the start of each
+    run in the flat (unpadded) layout returned by get_flat.
+
+    The invariants, selections and statistics work on the whole ensemble at once.
+    """
+
+    # Quantities that can be asked for by name, see get_quantity
+    QUANTITIES = {
+        "mean_stress": ("stress", calc_mean_stress_array),
+        "q"          : ("stress", calc_q_invariant_array),
+        "vol_strain" : ("strain", calc_volumetric_strain_invariant_array),
+        "dev_strain" : ("strain", calc_dev_strain_invariant_array),
+        "J2"         : ("stress", calc_j2_array),
+        "J3"         : ("stress", calc_j3_array),
+        "lode_angle" : ("stress", calc_lode_angle_array),
+    }
+
+    def __init__(self, results_list, run_ids = None, run_info = None):
+        """
+        Inputs:
+            results_list (list): DriverModelResults objects with their results stored
+            run_ids (list): Optional ID of each run, defaults to the position in results_list
+            run_info (DataFrame): Optional info of each run (e.g. the swept properties), one row per run
+        """
+        if run_ids is None:
+            run_ids = list(range(len(results_list)))
+
+        # Store the IDs and info of the runs
+        self.run_ids  = list(run_ids)
+        self.run_info = run_info
+
+        self.lengths = np.array([len(results.stress_df) for results in results_list], dtype = np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)])
+
+        num_steps = int(self.lengths.max()) if len(self.lengths) > 0 else 0
+
+        def stack(dfs):
+            num_columns = max((df.shape[1] for df in dfs), default = 0)
+            stacked = np.full((len(dfs), num_steps, num_columns), np.nan)
+
+            for i, df in enumerate(dfs):
+                stacked[i, :len(df), :df.shape[1]] = df.to_numpy(dtype = np.float64)
+
+            return stacked
+
+        self.time   = stack([results.time_df for results in results_list])
+        self.stress = stack([results.stress_df for results in results_list])
+        self.strain = stack([results.strain_df for results in results_list])
+        self.statev = stack([results.state_vars_df for results in results_list])
+
+        # Column names of the widest statev df
+        self.statev_columns = max((list(results.state_vars_df.columns) for results in results_list),
+                                  key = len, default = [])
+
+    @classmethod
+    def from_sweep(cls, results_df):
+        """
+        Make a collection from the output of DriverModelSweep.run_sweep, failed runs are left out
+
+        The swept property values of each run are kept in run_info
+        """
+        succeeded = results_df[results_df["results"].notna()]
+
+        run_info = succeeded.index.to_frame(index = False)
+        run_info.index = pd.Index(succeeded["run_id"], name = "run_id")
+
+        return cls(list(succeeded["results"]), run_ids = list(succeeded["run_id"]), run_info = run_info)
+
+    @classmethod
+    def _from_arrays(cls, time, stress, strain, statev, lengths, run_ids, run_info, statev_columns):
+        collection = cls.__new__(cls)
+
+        collection.time    = time
+        collection.stress  = stress
+        collection.strain  = strain
+        collection.statev  = statev
+        collection.lengths = lengths
+        collection.offsets = np.concatenate([[0], np.cumsum(lengths)])
+        collection.run_ids = run_ids
+        collection.run_info = run_info
+        collection.statev_columns = statev_columns
+
+        return collection
+
+    def __len__(self):
+        return len(self.run_ids)
+
+    def __str__(self):
+        return_string = (f"Number of runs: {len(self)}\n"
+                         f"Max number of steps: {self.stress.shape[1]}\n"
+                         f"Number of state variables: {len(self.statev_columns)}\n"
+                         )
+
+        return return_string
+
+    def get_mask(self):
+        """
+        Return a (num_runs, num_steps) bool array that is True for the steps each run has
+        """
+        return np.arange(self.stress.shape[1])[np.newaxis, :] < self.lengths[:, np.newaxis]
+
+    def get_quantity(self, name):
+        """
+        Return a (num_runs, num_steps) array of a quantity, padded steps are NaN
+
+        Inputs:
+            name (str): "mean_stress", "q", "vol_strain", "dev_strain", "J2", "J3" or "lode_angle", or an output column
+                        such as "stran(1)", "stress(2)" or "statev(3)"
+        """
+        if name in self.QUANTITIES:
+            group, calc_function = self.QUANTITIES[name]
+            block = getattr(self, group)
+
+            # The invariant functions work on (N, 6) blocks, flatten the runs and steps
+            num_runs, num_steps, _ = block.shape
+            return calc_function(block.reshape(-1, 6)).reshape(num_runs, num_steps)
+
+        # Single output columns, e.g. stress(1)
+        for group, prefix in [("time", "time"), ("strain", "stran"), ("stress", "stress")]:
+            if name.startswith(prefix + "("):
+                return getattr(self, group)[:, :, int(name[len(prefix) + 1:-1]) - 1]
+
+        if name in self.statev_columns:
+            return self.statev[:, :, self.statev_columns.index(name)]
+
+        raise ValueError(f"{name} is not a known quantity. The quantities are: "
+                         f"{list(self.QUANTITIES.keys())} or an output column name")
+
+    def get_mean_stress(self):
+        return self.get_quantity("mean_stress")
+
+    def get_q_invariant(self):
+        return self.get_quantity("q")
+
+    def get_volumetric_strain(self):
+        return self.get_quantity("vol_strain")
+
+    def get_deviatoric_strain(self):
+        return self.get_quantity("dev_strain")
+
+    def get_principal_stresses(self):
+        """
+        Return a (num_runs, num_steps, 3) array of the principal stresses, largest first
+        """
+        return calc_principal_stresses_array(self.stress)
+
+    def get_principal_strains(self):
+        """
+        Return a (num_runs, num_steps, 3) array of the principal strains, largest first
+        """
+        return calc_principal_strains_array(self.strain)
+
+    def get_flat(self, name):
+        """
+        Return the values of a quantity of every run one after the other, without the padding
+
+        The values of run i are flat[offsets[i]:offsets[i + 1]]
+        """
+        return self.get_quantity(name)[self.get_mask()]
+
+    def get_final(self, name):
+        """
+        Return the value of a quantity at the last step of each run, NaN for runs without steps
+        """
+        return self._get_final_values(self.get_quantity(name))
+
+    def _get_final_values(self, values):
+        final = np.full(len(self), np.nan)
+
+        # A run without steps would index -1 into its padding
+        has_steps = self.lengths > 0
+        final[has_steps] = values[np.flatnonzero(has_steps), self.lengths[has_steps] - 1]
+
+        return final
+
+    def get_peak(self, name):
+        """
+        Return (peak value, step of the peak) of a quantity for each run
+
+        Runs without a finite value (e.g. empty runs) return NaN for both, so the steps are floats
+        """
+        values = self.get_quantity(name)
+
+        peaks = np.full(len(self), np.nan)
+        steps = np.full(len(self), np.nan)
+
+        # Padded steps are NaN, fill them so argmax never picks them
+        has_values = np.any(~np.isnan(values), axis = 1)
+        if np.any(has_values):
+            filled = np.where(np.isnan(values[has_values]), -np.inf, values[has_values])
+            peak_steps = np.argmax(filled, axis = 1)
+
+            peaks[has_values] = values[np.flatnonzero(has_values), peak_steps]
+            steps[has_values] = peak_steps
+
+        return peaks, steps
+
+    def select_ids(self, run_ids):
+        """
+        Return a new collection with only the runs with the given run IDs, in that order
+        """
+        positions = []
+        for run_id in run_ids:
+            if run_id not in self.run_ids:
+                raise KeyError(f"{run_id} is not a run ID of the collection")
+
+            positions.append(self.run_ids.index(run_id))
+
+        return self.select_positions(positions)
+
+    def select_positions(self, positions):
+        """
+        Return a new collection with only some of the runs
+
+        Inputs:
+            positions: A bool mask or a list of the positions of the runs in the collection,
+                       use select_ids to select runs by their ID
+        """
+        positions = np.asarray(positions)
+
+        if positions.dtype == bool:
+            positions = np.flatnonzero(positions)
+        else:
+            positions = positions.astype(np.int64)
+
+        run_info = None if self.run_info is None else self.run_info.iloc[positions]
+
+        # Drop the padding that none of the selected runs need
+        num_steps = int(self.lengths[positions].max()) if len(positions) > 0 else 0
+
+        return self._from_arrays(self.time[positions, :num_steps], self.stress[positions, :num_steps],
+                                 self.strain[positions, :num_steps], self.statev[positions, :num_steps],
+                                 self.lengths[positions], [self.run_ids[i] for i in positions],
+                                 run_info, self.statev_columns)
+
+    def get_step_stats(self, name, percentiles = (5, 50, 95)):
+        """
+        Return a df with the statistics of a quantity over the runs at every step
+
+        Only the runs that have a step count towards its statistics.
+        """
+        values = self.get_quantity(name)
+
+        # Steps without a value in any run get NaN statistics, don't warn about their empty slices
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            stats = {
+                "count": np.sum(~np.isnan(values), axis = 0),
+                "mean" : np.nanmean(values, axis = 0),
+                "std"  : np.nanstd(values, axis = 0),
+                "min"  : np.nanmin(values, axis = 0),
+                "max"  : np.nanmax(values, axis = 0),
+            }
+
+            for percentile in percentiles:
+                stats[f"p{percentile:g}"] = np.nanpercentile(values, percentile, axis = 0)
+
+        return pd.DataFrame(stats, index = pd.RangeIndex(values.shape[1], name = "step"))
+
+    def get_run_stats(self, name):
+        """
+        Return a df with the statistics of a quantity over the steps of each run
+        """
+        values = self.get_quantity(name)
+
+        # Runs without steps get NaN statistics, don't warn about their empty slices
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            stats = pd.DataFrame({
+                "final": self._get_final_values(values),
+                "mean" : np.nanmean(values, axis = 1),
+                "min"  : np.nanmin(values, axis = 1),
+                "max"  : np.nanmax(values, axis = 1),
+            }, index = pd.Index(self.run_ids, name = "run_id"))
+
+        return stats
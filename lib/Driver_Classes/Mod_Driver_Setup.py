@@ -1,6 +1,27 @@
-from lib.general_functions.general_functions import write_line_with_inline_comment
+from lib.general_functions.general_functions import format_line_with_inline_comment, write_file_if_changed
+from lib.general_functions.instrumentation import timed_phase
 import os
 import glob
+import json
+import hashlib
+import itertools
+
+def make_run_id(*deck_texts, num_chars = 12):
+    """
+    Return a stable ID for a run from the text of its input files
+
+    The ID only depends on the rendered parameters, initial conditions and test files, so
+    the same run always gets the same ID no matter where it is in a sweep, and runs that
+    differ in any of the files get different IDs (and folders)
+    """
+    hasher = hashlib.sha1()
+
+    for text in deck_texts:
+        # Include the length so the end of one file can't shift into the next
+        hasher.update(f"{len(text)}:".encode())
+        hasher.update(text.encode())
+
+    return hasher.hexdigest()[:num_chars]
 
 class DriverModelSetup:
 
@@ -12,6 +33,8 @@ class DriverModelSetup:
         self.num_state_params = None
         self.load_list = []             # Allow for multiple loads to be stored
         self.num_loads = 0              # counter to keep track of the number of loads
+
+        self.metrics = None             # Optional RunMetrics, records the time spent writing the decks
     def __str__(self):
         """
         prints information about the object when the object is inserted
@@ -65,6 +88,120 @@ class DriverModelSetup:
         """
         self.load_list = []
     
+    @staticmethod
+    def get_swept_properties(properties, sweep_row):
+        """
+        Return a copy of properties with the swept values from one row of a sweep table
+
+        The order of the properties is kept so the parameters file is written the same way
+        """
+        swept_properties = dict(properties)
+
+        for key, val in sweep_row.items():
+            swept_properties[key] = val
+
+        return swept_properties
+
+    def get_run_id(self, properties, initial_conditions = None, load_list = None):
+        """
+        Return the run ID of a variant from its rendered input files, see make_run_id
+
+        Inputs:
+            properties (dict): Material properties
+            initial_conditions (tuple): Optional (init_stress, init_state_vars)
+            load_list: Optional load or list of loads
+        """
+        deck_texts = [self.render_parameters_file(properties)]
+
+        if initial_conditions is not None:
+            init_stress, init_state_vars = initial_conditions
+            deck_texts.append(self.render_initial_conditions_file(init_stress, init_state_vars))
+
+        if load_list is not None:
+            if not isinstance(load_list, list):
+                load_list = [load_list]
+
+            deck_texts.append(self.render_loads(load_list))
+
+        return make_run_id(*deck_texts)
+
+    def build_sweep(self, properties, grid = None, lhs = None, samples = None,
+                    num_samples = None, seed = None, initial_conditions = None, load_list = None):
+        """
+        Expand a properties dict over a set of samples
+
+        Only one of grid, lhs or samples should be given.
+
+        Inputs:
+            properties (dict): Base properties in the format of write_parameters_file
+            grid (dict): {name: list of values}, every combination of the values is sampled
+            lhs (dict): {name: (low, high)}, num_samples Latin-hypercube samples inside of the bounds
+            samples (dict): {name: array of values}, the arrays are zipped together and must have the same length
+            num_samples (int): Number of Latin-hypercube samples
+            seed (int): Seed of the random number generator used for the Latin-hypercube samples
+            initial_conditions (tuple): (init_stress, init_state_vars) of the runs, part of the run IDs
+            load_list: Loads of the runs, part of the run IDs
+
+        Returns:
+            DataFrame with one row per sample, a column per swept property and the
+            run ID of each sample as the index (see get_run_id). Samples that render
+            the same input files as an earlier sample are dropped
+        """
+        # Only needed to build sweeps, keep them out of the import of the module
+        import numpy as np
+        import pandas as pd
+
+        given = [option for option in (grid, lhs, samples) if option is not None]
+        if len(given) != 1:
+            raise ValueError("Exactly one of grid, lhs or samples should be given")
+
+        swept_names = list(given[0].keys())
+
+        # Sweeping a property that isn't in the properties would change the order of the parameters file
+        missing = [name for name in swept_names if name not in properties]
+        if missing:
+            raise ValueError(f"The swept properties {missing} are not in the properties.\n"
+                             f"The properties are: {list(properties.keys())}")
+
+        if grid is not None:
+            rows = list(itertools.product(*grid.values()))
+            sweep_df = pd.DataFrame(rows, columns = swept_names)
+
+        elif lhs is not None:
+            if num_samples is None:
+                raise ValueError("num_samples is required for a Latin-hypercube sweep")
+
+            rng = np.random.default_rng(seed)
+            columns = {}
+            for name, (low, high) in lhs.items():
+                # One sample in each of the num_samples strata, in a random order
+                strata = (rng.permutation(num_samples) + rng.random(num_samples)) / num_samples
+                columns[name] = low + strata * (high - low)
+
+            sweep_df = pd.DataFrame(columns, columns = swept_names)
+
+        else:
+            lengths = {len(values) for values in samples.values()}
+            if len(lengths) != 1:
+                raise ValueError("All of the sample arrays must have the same length")
+
+            sweep_df = pd.DataFrame({name: list(values) for name, values in samples.items()},
+                                    columns = swept_names)
+
+        # Give each sample an ID from its rendered input files
+        run_ids = [self.get_run_id(self.get_swept_properties(properties, row), initial_conditions, load_list)
+                   for row in sweep_df.to_dict(orient = "records")]
+
+        sweep_df.index = pd.Index(run_ids, name = "run_id")
+
+        # Duplicate samples would run the driver in the same folder at the same time
+        duplicated = sweep_df.index.duplicated()
+        if duplicated.any():
+            print(f"Dropped {duplicated.sum()} duplicate samples from the sweep.")
+            sweep_df = sweep_df[~duplicated]
+
+        return sweep_df
+
     def write_parameters_file(self, properties, num_spaces = 10,
                                params_file_name = "parameters.inp"):
         """
@@ -78,22 +215,33 @@ class DriverModelSetup:
         """
         
         file_path = os.path.join(self.folder_path, params_file_name)
+
+        # Render the whole file in memory and write it at once
+        with timed_phase(self.metrics, "deck_writing") as record, open(file_path, "w+") as file:
+            text = self.render_parameters_file(properties, num_spaces = num_spaces)
+            file.write(text)
+            record["bytes"] = len(text)
+
+    def render_parameters_file(self, properties, num_spaces = 10):
+        """
+        Return the text of the parameters.inp file, see write_parameters_file
+        """
         
         num_props = len(properties)
 
-        # Get the load name from the load object
-        with open(file_path, "w+") as file:
-            # Write the model name
-            write_line_with_inline_comment(file, self.constitutive_model_name,
-                                           "Model name", num_spaces=num_spaces)
-            # Write the number of props
-            write_line_with_inline_comment(file, num_props, "Number of properties", 
-                                           num_spaces = num_spaces)
+        # Model name and the number of props
+        lines = [
+            format_line_with_inline_comment(self.constitutive_model_name, "Model name",
+                                            num_spaces = num_spaces),
+            format_line_with_inline_comment(num_props, "Number of properties",
+                                            num_spaces = num_spaces),
+        ]
+
+        # Add the parameters in the order that they were entered in the dict
+        for key, val in properties.items():
+            lines.append(format_line_with_inline_comment(val, key, num_spaces = num_spaces))
 
-            # Write the parameters in the order that they were entered in the dict
-            for key, val in properties.items():
-                write_line_with_inline_comment(file, val, key, 
-                                               num_spaces = num_spaces)
+        return "".join(lines)
 
     
     def write_initial_conditions_file(self, init_stress, init_state_vars, file_name = "initialconditions.inp",
@@ -105,6 +253,20 @@ class DriverModelSetup:
 
         """        
 
+        file_path = os.path.join(self.folder_path, file_name)
+
+        with timed_phase(self.metrics, "deck_writing") as record, open(file_path, "w+") as file:
+            text = self.render_initial_conditions_file(init_stress, init_state_vars, num_spaces = num_spaces,
+                                                       stress_names = stress_names)
+            file.write(text)
+            record["bytes"] = len(text)
+
+    def render_initial_conditions_file(self, init_stress, init_state_vars, num_spaces = 15,
+                                       stress_names = ["s11", "s22", "s33", "s12", "s13", "s23"]):
+        """
+        Return the text of the initialconditions.inp file, see write_initial_conditions_file
+        """
+
         # Get the number of stress values
         num_stress_vals = len(init_stress)
 
@@ -113,24 +275,23 @@ class DriverModelSetup:
         # automatically initialized to zero
         num_state_vars = len(init_state_vars)
 
-        file_path = os.path.join(self.folder_path, file_name)
+        # Number of stress components
+        lines = [format_line_with_inline_comment(num_stress_vals, "ntens, tension is positive", num_spaces = num_spaces)]
 
-        with open(file_path, "w+") as file:
-            # Write the number of stress components
-            write_line_with_inline_comment(file, num_stress_vals, "ntens, tension is positive", num_spaces = num_spaces)
+        # Add the stress components
+        for i, stress in enumerate(init_stress):
+            # Add the stress values and the comment
+            lines.append(format_line_with_inline_comment(stress, stress_names[i], num_spaces = num_spaces))
 
-            # Write the stress components
-            for i, stress in enumerate(init_stress):
-                # Write the stress values and the comment
-                write_line_with_inline_comment(file, stress, stress_names[i], num_spaces = num_spaces)
+        # If state variables are pased, right the info
+        lines.append(format_line_with_inline_comment(num_state_vars, "Number of state variables", num_spaces = num_spaces))
 
-            # If state variables are pased, right the info
-            write_line_with_inline_comment(file, num_state_vars, "Number of state variables", num_spaces = num_spaces)
+        # Add the state variables
+        for key, val in init_state_vars.items():
+            # Add the state parameter values
+            lines.append(format_line_with_inline_comment(val, f"{key} - init value", num_spaces = num_spaces))
 
-            # Write the state variables
-            for key, val in init_state_vars.items():
-                # Write the state parameter values
-                write_line_with_inline_comment(file, val, f"{key} - init value", num_spaces = num_spaces)
+        return "".join(lines)
 
 
     def write_loads(self, file_name = "test.inp", num_spaces = 10):
@@ -145,15 +306,110 @@ class DriverModelSetup:
         file_path = os.path.join(self.folder_path, file_name)
 
         # Open the file and write the data to the file
-        with open(file_path, "w+") as file:
+        with timed_phase(self.metrics, "deck_writing") as record, open(file_path, "w+") as file:
+            text = self.render_loads(num_spaces = num_spaces)
+            file.write(text)
+            record["bytes"] = len(text)
+
+    def render_loads(self, load_list = None, num_spaces = 10):
+        """
+        Return the text of the test.inp file, see write_loads
+
+        Inputs:
+            load_list (list): Loads to render, defaults to the stored loads
+        """
+        if load_list is None:
+            load_list = self.load_list
+
+        # The name of the output file, each of the loads and *End at the end of the file
+        text = self.output_file_name + "\n" + \
+               "".join(load.render(num_spaces) for load in load_list) + \
+               "*End"
+
+        return text
+
+    def compile_decks(self, variants, folder_paths, params_file_name = "parameters.inp",
+                      init_conds_file_name = "initialconditions.inp", loads_file_name = "test.inp",
+                      failed = None):
+        """
+        Write the parameters, initial conditions and test files of many variants
+
+        Every file is rendered in memory and written with a single write. Files that already
+        hold the same text are left alone, and load lists shared between variants are only
+        rendered once.
+
+        Inputs:
+            variants (list): List of (properties, (init_stress, init_state_vars), load_list) tuples
+            folder_paths (list): Folder to write the files of each variant to, created if needed
+            failed (list): Optional list, when given a variant whose files can't be rendered or
+                           written is skipped and its position is appended to the list instead
+                           of the error stopping the other variants
+
+        Returns:
+            (num_written, num_unchanged) number of files written and skipped
+        """
+        with timed_phase(self.metrics, "deck_writing") as record:
+            num_written, num_unchanged, num_bytes = self._compile_decks(
+                variants, folder_paths, params_file_name, init_conds_file_name, loads_file_name, failed)
+
+            record["bytes"] = num_bytes
+
+        return num_written, num_unchanged
+
+    def _compile_decks(self, variants, folder_paths, params_file_name,
+                       init_conds_file_name, loads_file_name, failed = None):
+        num_written   = 0
+        num_unchanged = 0
+        num_bytes     = 0
+
+        # Rendered test files keyed on the loads that make them up
+        rendered_loads = {}
+
+        for i, (variant, folder_path) in enumerate(zip(variants, folder_paths)):
+            try:
+                decks = self._render_variant_decks(variant, folder_path, rendered_loads, params_file_name,
+                                                   init_conds_file_name, loads_file_name)
+
+                os.makedirs(folder_path, exist_ok = True)
+
+                for file_name, text in decks.items():
+                    if write_file_if_changed(os.path.join(folder_path, file_name), text):
+                        num_written += 1
+                        num_bytes   += len(text)
+                    else:
+                        num_unchanged += 1
+            except (OSError, ValueError, KeyError, TypeError, Warning) as e:
+                if failed is None:
+                    raise
+
+                print(f"Writing the input files in '{folder_path}' failed: {e}")
+                failed.append(i)
+
+        return num_written, num_unchanged, num_bytes
+
+    def _render_variant_decks(self, variant, folder_path, rendered_loads, params_file_name,
+                              init_conds_file_name, loads_file_name):
+        """
+        Return {file name: text} of the input files of one variant, see compile_decks
+        """
+        properties, initial_conditions, load_list = variant
+
+        init_stress, init_state_vars = initial_conditions
+
+        if not isinstance(load_list, list):
+            load_list = [load_list]
 
-            # Write the name of the output file
-            file.write(self.output_file_name + "\n")
+        if len(load_list) == 0:
+            raise Warning(f"No loads given for the variant in {folder_path}")
 
-            # Loop over the loads and write the data for each load
-            for load in self.load_list:
-                load.write(file, num_spaces)
+        loads_key = tuple(id(load) for load in load_list)
+        if loads_key not in rendered_loads:
+            rendered_loads[loads_key] = self.render_loads(load_list)
 
-            # Write *End at the end of the file
-            file.write("*End")
+        decks = {
+            params_file_name    : self.render_parameters_file(properties),
+            init_conds_file_name: self.render_initial_conditions_file(init_stress, init_state_vars),
+            loads_file_name     : rendered_loads[loads_key],
+        }
 
+        return decks
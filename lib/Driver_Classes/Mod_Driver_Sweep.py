@@ -0,0 +1,218 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from lib.Driver_Classes.Mod_Driver_Model import DriverModel
+from lib.Driver_Classes.Mod_Driver_Setup import DriverModelSetup
+from lib.general_functions.instrumentation import RunMetrics, MetricsCollection
+
+
+class DriverModelSweep:
+    """
+    Runs many variants of a driver model on a bounded pool of workers.
+
+    Every variant gets its own working directory inside of base_folder_path so that
+    the incremental driver runs don't overwrite each others input and output files.
+    """
+    def __init__(self, base_folder_path, constitutive_model_name,
+                 inc_driver_exe_path, output_file_name = "output.txt",
+                 max_workers = None, run_folder_prefix = "run_",
+                 run_cache = None, instrument = False, state_vars = None):
+
+        # Folder that holds one sub folder per variant
+        self.base_folder_path = base_folder_path
+
+        self.constitutive_model_name = constitutive_model_name
+        self.inc_driver_exe_path     = inc_driver_exe_path
+        self.output_file_name        = output_file_name
+        self.run_folder_prefix       = run_folder_prefix
+
+        # Optional names of the only state variables loaded from each run, see statev_registry.py
+        self.state_vars = state_vars
+
+        # Optional RunCache shared by all of the variants
+        self.run_cache = run_cache
+
+        # Default to one worker per core, each worker only waits on its driver process
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+
+        self.max_workers = max_workers
+
+        # Opt-in timing, the metrics of every run (and of the bulk deck writing) are collected here
+        self.instrument = instrument
+        self.metrics = MetricsCollection() if instrument else None
+
+    def __str__(self):
+        return_string = (f"Constitutive model name: {self.constitutive_model_name}\n"
+                         f"Base folder path: {self.base_folder_path}\n"
+                         f"Max workers: {self.max_workers}\n"
+                         )
+
+        return return_string
+
+    def get_run_folder(self, run_id):
+        """
+        Return the working directory used by a single variant
+        """
+        if isinstance(run_id, int):
+            run_id = f"{run_id:05d}"
+
+        return os.path.join(self.base_folder_path, f"{self.run_folder_prefix}{run_id}")
+
+    def make_model(self, run_id):
+        """
+        Make the DriverModel for a single variant, creating its working directory
+        """
+        run_folder = self.get_run_folder(run_id)
+
+        os.makedirs(run_folder, exist_ok = True)
+
+        model = DriverModel(run_folder, self.constitutive_model_name,
+                            self.inc_driver_exe_path, self.output_file_name,
+                            run_cache = self.run_cache, instrument = self.instrument)
+
+        if self.metrics is not None:
+            self.metrics.add(model.metrics)
+
+        return model
+
+    def run_variant(self, run_id, properties, initial_conditions, load_list):
+        """
+        Write the input files for one variant, run it and load the results
+
+        Inputs:
+            run_id: Index or name of the variant, used to name the working directory
+            properties (dict): Material properties, see DriverModelSetup.write_parameters_file
+            initial_conditions (tuple): (init_stress, init_state_vars), see DriverModelSetup.write_initial_conditions_file
+            load_list: Load or list of loads that make up the test
+        """
+        model = self.make_model(run_id)
+
+        init_stress, init_state_vars = initial_conditions
+
+        # Write the input decks
+        model.setup.write_parameters_file(properties)
+        model.setup.write_initial_conditions_file(init_stress, init_state_vars)
+        model.setup.store_loads(load_list)
+        model.setup.write_loads()
+
+        return self.run_written_variant(run_id, model)
+
+    def run_written_variant(self, run_id, model = None):
+        """
+        Run a variant whose input files are already in its working directory and load the results
+        """
+        if model is None:
+            model = self.make_model(run_id)
+
+        # Run the driver and read the output
+        model.run_model()
+        model.results.store_all(state_vars = self.state_vars)
+
+        return model.results
+
+    def write_decks(self, variants, run_ids = None, failed = None):
+        """
+        Write the input files of all of the variants, see DriverModelSetup.compile_decks
+
+        Inputs:
+            failed (list): Optional list that the positions of the variants that couldn't be
+                           written are appended to, see DriverModelSetup.compile_decks
+
+        Returns:
+            (num_written, num_unchanged) number of files written and skipped because they were unchanged
+        """
+        if run_ids is None:
+            run_ids = range(len(variants))
+
+        folder_paths = [self.get_run_folder(run_id) for run_id in run_ids]
+
+        setup = DriverModelSetup(self.base_folder_path, self.constitutive_model_name, self.output_file_name)
+
+        if self.metrics is not None:
+            setup.metrics = RunMetrics(run_name = "bulk deck writing")
+            self.metrics.add(setup.metrics)
+
+        return setup.compile_decks(variants, folder_paths, failed = failed)
+
+    def _run_written_variant_safe(self, run_id):
+        """
+        Run a variant, a failed run returns None instead of stopping the whole sweep
+        """
+        try:
+            return self.run_written_variant(run_id)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Run '{self.get_run_folder(run_id)}' failed: {e}")
+            return None
+
+    def _write_and_run(self, variants, run_ids):
+        """
+        Write the input files of the variants in bulk and run them on the worker pool
+
+        A variant whose input files can't be written isn't run and returns None like a failed run
+        """
+        # Write all of the input files up front in bulk
+        failed = []
+        self.write_decks(variants, run_ids, failed = failed)
+
+        failed = set(failed)
+
+        with ThreadPoolExecutor(max_workers = self.max_workers) as executor:
+            futures = [None if i in failed else executor.submit(self._run_written_variant_safe, run_id)
+                       for i, run_id in enumerate(run_ids)]
+
+            results = [None if future is None else future.result() for future in futures]
+
+        return results
+
+    def run_sweep(self, properties, sweep_df, initial_conditions, load_list):
+        """
+        Run every sample of a sweep built with DriverModelSetup.build_sweep
+
+        Each sample runs in a folder named after the run ID of its rendered input files
+        (see DriverModelSetup.get_run_id), so rerunning a sweep reuses the same folders (and
+        the run cache if there is one) and sweeps with different loads or initial conditions
+        never share a folder.
+
+        Inputs:
+            properties (dict): Base properties, the swept values replace the ones in here
+            sweep_df (DataFrame): Samples from build_sweep
+            initial_conditions (tuple): (init_stress, init_state_vars) used by every sample
+            load_list: Load or list of loads used by every sample
+
+        Returns:
+            DataFrame indexed by the swept property values with a "run_id" column and a
+            "results" column holding the DriverModelResults (None for failed runs)
+        """
+        import pandas as pd
+
+        variants = [(DriverModelSetup.get_swept_properties(properties, row), initial_conditions, load_list)
+                    for row in sweep_df.to_dict(orient = "records")]
+
+        setup = DriverModelSetup(self.base_folder_path, self.constitutive_model_name, self.output_file_name)
+        run_ids = [setup.get_run_id(*variant) for variant in variants]
+
+        # Two workers must never run the driver in the same folder
+        if len(set(run_ids)) != len(run_ids):
+            raise ValueError("The sweep has duplicate samples, build it with DriverModelSetup.build_sweep to drop them")
+
+        results = self._write_and_run(variants, run_ids)
+
+        results_df = pd.DataFrame({"run_id": run_ids, "results": results},
+                                  index = pd.MultiIndex.from_frame(sweep_df.reset_index(drop = True)))
+
+        return results_df
+
+    def run(self, variants):
+        """
+        Run all of the variants on the worker pool
+
+        Inputs:
+            variants (list): List of (properties, initial_conditions, load_list) tuples
+
+        Returns:
+            List with one DriverModelResults per variant in the same order as the input.
+            Variants that failed are returned as None
+        """
+        variants = list(variants)
+
+        return self._write_and_run(variants, list(range(len(variants))))
@@ -1,4 +1,4 @@
-from lib.general_functions.general_functions import write_line_with_inline_comment, is_list_in_dict_keys
+from lib.general_functions.general_functions import format_line_with_inline_comment, is_list_in_dict_keys
 
 #TODO: Generate an abstract class that can serve as the base class for all the load types and use that to generate all of the load types
 
@@ -106,14 +106,9 @@ class PopularPath:
         self.predifined_cond = condition_str
 
 
-    def write(self, file, num_spaces = 10):
+    def render(self, num_spaces = 10):
         """
-        Write the load to a file. This module assumes that the data should be written in 
-        append mode
-        
-        Inputs:
-            file: File object that the data should be written in
-            write_mode (str): Mode that writing should be done in the file. "a" means that the data should be appended to the file
+        Return the text of the load as it is written in the test.inp file
         """
 
         # if None there is no predifined condition to set
@@ -131,8 +126,8 @@ class PopularPath:
             if "ddstress_" in key or "ddstran_" in key:
                 load_key = key
 
-        # Write the header of the load
-        file.write(header)
+        # Start with the header of the load
+        lines = [header]
         
         
         ninc = self.input_params_dict["ninc"]
@@ -143,12 +138,26 @@ class PopularPath:
         comment = "ninc maxiter dtime : every"
         general_info = f"{ninc} {maxiter} {dtime} : {every}"
 
-        # Write the general information 
-        write_line_with_inline_comment(file, general_info, comment,
-                                        comment_char= "#", num_spaces =num_spaces)
+        # Add the general information 
+        lines.append(format_line_with_inline_comment(general_info, comment,
+                                                     comment_char= "#", num_spaces =num_spaces))
         
-        # Write the stress or strain increment information
+        # Add the stress or strain increment information
         if not load_key is None:
-            # Write the stress condtion
-            write_line_with_inline_comment(file, self.input_params_dict[load_key], load_key,
-                                           comment_char="#", num_spaces = num_spaces)
+            # Add the stress condtion
+            lines.append(format_line_with_inline_comment(self.input_params_dict[load_key], load_key,
+                                                         comment_char="#", num_spaces = num_spaces))
+
+        return "".join(lines)
+
+    def write(self, file, num_spaces = 10):
+        """
+        Write the load to a file. This module assumes that the data should be written in 
+        append mode
+        
+        Inputs:
+            file: File object that the data should be written in
+            write_mode (str): Mode that writing should be done in the file. "a" means that the data should be appended to the file
+        """
+
+        file.write(self.render(num_spaces))
@@ -0,0 +1,177 @@
+"""
+asyncio versions of the functions in executing_runs.py.
+
+The driver processes are started with asyncio.create_subprocess_exec so a single event
+loop can wait on many runs at once without a thread per run.
+"""
+import os
+import time
+import asyncio
+import contextlib
+import subprocess
+
+from lib.general_functions.executing_runs import (
+    generate_batch_script, get_batch_script_command, kill_process_tree, DriverRunResult
+)
+from lib.general_functions.instrumentation import timed_phase
+
+async def generate_batch_script_async(model_folder, exe_path, batch_file_name = "run_model.bat", **kwargs):
+    """
+    Async counterpart of generate_batch_script, the file is written in a worker thread
+    """
+    await asyncio.to_thread(generate_batch_script, model_folder, exe_path,
+                            batch_file_name = batch_file_name, **kwargs)
+
+async def run_batch_script_async(batch_script_path, timeout = None, semaphore = None, flag_print_Blog = False,
+                                 metrics = None):
+    """
+    Run a batch script and wait for it without blocking the event loop
+
+    Parameters
+    ----------
+    batch_script_path : string
+        The path to the batch script that should be run
+
+    timeout : float (Optional)
+        Seconds to wait for the run. The script and the driver it started are killed and
+        asyncio.TimeoutError is raised when exceeded
+
+    semaphore : asyncio.Semaphore (Optional)
+        Limits the number of runs executing at the same time
+
+    metrics : RunMetrics (Optional)
+        Records the process_spawn and driver_execution phases, the wait on the semaphore isn't timed
+
+    Returns
+    -------
+    result : subprocess.CompletedProcess
+        Holds the return code and the captured stdout and stderr
+
+    Raises
+    ------
+    subprocess.CalledProcessError if the script exits with a non-zero code.
+    If the task is cancelled the process is killed before the cancellation is passed on.
+
+    """
+    # Set the working directory to where the batch file is located
+    working_directory = os.path.dirname(batch_script_path)
+
+    if semaphore is None:
+        semaphore = contextlib.nullcontext()
+
+    async with semaphore:
+        # A .bat file can't be executed directly, run it through cmd /c (see get_batch_script_command).
+        # The new session puts the script and the driver in their own process group on POSIX
+        with timed_phase(metrics, "process_spawn"):
+            process = await asyncio.create_subprocess_exec(*get_batch_script_command(batch_script_path),
+                                                           cwd = working_directory,
+                                                           stdout = asyncio.subprocess.PIPE,
+                                                           stderr = asyncio.subprocess.PIPE,
+                                                           start_new_session = os.name != "nt")
+
+        with timed_phase(metrics, "driver_execution"):
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                # Don't leave the driver running after a timeout or cancellation, killing
+                # only the shell would leave the driver it started running
+                if process.returncode is None:
+                    await asyncio.to_thread(kill_process_tree, process)
+                    await process.wait()
+                raise
+
+    result = subprocess.CompletedProcess(batch_script_path, process.returncode,
+                                         stdout.decode(errors = "replace"), stderr.decode(errors = "replace"))
+
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, batch_script_path,
+                                            output = result.stdout, stderr = result.stderr)
+
+    print(f"Batch file '{batch_script_path}' executed successfully.")
+
+    if flag_print_Blog:
+        print("Output:")
+        print(result.stdout)
+
+    return result
+
+async def launch_driver_async(model_folder, exe_path, timeout = None, semaphore = None,
+                              stdout_file_name = "driver_stdout.log", stderr_file_name = "driver_stderr.log"):
+    """
+    Async counterpart of launch_driver, the driver is started directly without a batch file
+
+    Parameters
+    ----------
+    model_folder : string
+        Folder with the input files, used as the working directory of the driver
+
+    exe_path : string
+        Path to the incremental driver executable
+
+    timeout : float (Optional)
+        Seconds to wait before the driver is killed, the result then has timed_out set
+
+    semaphore : asyncio.Semaphore (Optional)
+        Limits the number of runs executing at the same time
+
+    Returns
+    -------
+    result : DriverRunResult
+
+    """
+    stdout_path = os.path.join(model_folder, stdout_file_name)
+    stderr_path = os.path.join(model_folder, stderr_file_name)
+
+    if semaphore is None:
+        semaphore = contextlib.nullcontext()
+
+    async with semaphore:
+        start_time = time.perf_counter()
+
+        with open(stdout_path, "w") as stdout_file, open(stderr_path, "w") as stderr_file:
+            process = await asyncio.create_subprocess_exec(exe_path, cwd = model_folder,
+                                                           stdout = stdout_file, stderr = stderr_file)
+
+        spawn_time = time.perf_counter() - start_time
+
+        timed_out = False
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            timed_out = True
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+
+        wall_time = time.perf_counter() - start_time
+
+    result = DriverRunResult(exe_path, model_folder, process.returncode, wall_time,
+                             stdout_path, stderr_path, timed_out = timed_out, spawn_time = spawn_time)
+
+    return result
+
+async def run_models_async(models, max_concurrent = None, timeout = None):
+    """
+    Run many DriverModel objects concurrently
+
+    Inputs:
+        models (list): DriverModel objects with their input files already written
+        max_concurrent (int): Max number of driver processes at once, defaults to the number of cores
+        timeout (float): Optional timeout in seconds for each run
+
+    Returns:
+        List with the DriverModelResults of each model in the same order as the input.
+        A run that failed returns its exception instead
+    """
+    if max_concurrent is None:
+        max_concurrent = os.cpu_count() or 1
+
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    tasks = [model.run_model_async(timeout = timeout, semaphore = semaphore) for model in models]
+
+    return await asyncio.gather(*tasks, return_exceptions = True)
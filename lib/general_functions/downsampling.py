@@ -0,0 +1,150 @@
+"""
+Shape preserving downsampling of curves for plotting.
+
+The results are plotted as curves in the order of the output rows (e.g. q vs. p), so the
+curves are downsampled along the row index and x doesn't have to be increasing. Both
+methods return the indices of the rows to keep, so the same rows can be used for every
+series of a plot.
+
+    lttb            Largest-Triangle-Three-Buckets, keeps the visually important points
+    minmax          Keeps the first, last and extreme x and y rows of each bucket, so peaks are never lost
+"""
+import numpy as np
+
+# Points per pixel of the axes width when max_points is "auto"
+POINTS_PER_PIXEL = 2
+
+def _normalize(values):
+    """
+    Scale values to [0, 1] so x and y count the same in the triangle areas
+    """
+    values = np.asarray(values, dtype = np.float64)
+    value_range = np.ptp(values) if len(values) > 0 else 0.0
+
+    if not np.isfinite(value_range) or value_range == 0:
+        return np.zeros_like(values)
+
+    return (values - np.min(values)) / value_range
+
+def _get_bucket_edges(num_rows, num_buckets):
+    """
+    Edges of num_buckets buckets of rows between the first and the last row
+    """
+    return np.linspace(1, num_rows - 1, num_buckets + 1).astype(np.int64)
+
+def lttb_indices(x, y, max_points):
+    """
+    Return the indices of the rows kept by Largest-Triangle-Three-Buckets
+
+    The first and last rows are always kept. In each bucket the row that forms the largest
+    triangle with the row kept in the previous bucket and the mean of the next bucket is kept.
+
+    Classic LTTB walks the buckets one at a time. Here all of the buckets are done at once in
+    two passes, the first uses the mean of the previous bucket in place of its kept row and
+    the second uses the rows kept by the first pass. This gives nearly the same rows without
+    a Python loop over the buckets.
+    """
+    num_rows = len(x)
+    if max_points is None or num_rows <= max_points or max_points < 3:
+        return np.arange(num_rows)
+
+    x = _normalize(x)
+    y = _normalize(y)
+
+    num_buckets = max_points - 2
+    edges = _get_bucket_edges(num_rows, num_buckets)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Rows of each bucket, short buckets repeat their last row
+    bucket_rows = np.minimum(starts[:, None] + np.arange(np.max(ends - starts)), ends[:, None] - 1)
+    bucket_x, bucket_y = x[bucket_rows], y[bucket_rows]
+
+    sizes = ends - starts
+    mean_x = np.add.reduceat(x[:edges[-1]], starts) / sizes
+    mean_y = np.add.reduceat(y[:edges[-1]], starts) / sizes
+
+    # Each bucket looks ahead to the mean of the next one, the last bucket to the last row
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    def get_kept(anchor_x, anchor_y):
+        areas = np.abs((anchor_x - next_x)[:, None] * (bucket_y - anchor_y[:, None]) -
+                       (anchor_x[:, None] - bucket_x) * (next_y - anchor_y)[:, None])
+
+        return bucket_rows[np.arange(num_buckets), np.argmax(areas, axis = 1)]
+
+    kept = get_kept(np.append(x[0], mean_x[:-1]), np.append(y[0], mean_y[:-1]))
+    kept = get_kept(np.append(x[0], x[kept[:-1]]), np.append(y[0], y[kept[:-1]]))
+
+    return np.concatenate([[0], kept, [num_rows - 1]])
+
+def minmax_indices(x, y, max_points):
+    """
+    Return the indices of the rows kept by min/max bucketing
+
+    Up to 6 rows are kept per bucket (the first, last, min and max x and y rows), so the
+    rows are split into max_points // 6 buckets and at most max_points rows are kept, in their
+    original order. Fewer than 6 points can't hold a bucket, lttb_indices is used instead.
+    """
+    num_rows = len(x)
+    if max_points is None or num_rows <= max_points:
+        return np.arange(num_rows)
+
+    if max_points < 6:
+        return lttb_indices(x, y, max_points)
+
+    x = np.asarray(x, dtype = np.float64)
+    y = np.asarray(y, dtype = np.float64)
+
+    num_buckets = max_points // 6
+
+    # Pad the rows to a multiple of the bucket size so the buckets can be reshaped
+    bucket_size = -(-num_rows // num_buckets)
+    num_padded  = bucket_size * num_buckets
+
+    starts = np.arange(num_buckets) * bucket_size
+    ends   = np.minimum(starts + bucket_size, num_rows) - 1
+    valid  = starts < num_rows
+
+    kept = [starts[valid], ends[valid]]
+    for values in (x, y):
+        # Pad with the last value, argmin/argmax return the first match so the padding is never picked
+        padded = np.concatenate([values, np.full(num_padded - num_rows, values[-1])]).reshape(num_buckets, bucket_size)
+
+        kept.append((starts + np.argmin(padded, axis = 1))[valid])
+        kept.append((starts + np.argmax(padded, axis = 1))[valid])
+
+    return np.unique(np.concatenate(kept))
+
+DOWNSAMPLING_METHODS = {
+    "lttb"  : lttb_indices,
+    "minmax": minmax_indices,
+}
+
+def downsample(x, y, max_points, method = "lttb"):
+    """
+    Return x and y downsampled to at most max_points rows
+
+    Inputs:
+        x, y (array-like): Values of the curve in the row order
+        max_points (int): Max number of points to keep, None keeps every row
+        method (str): "lttb" or "minmax"
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"{method} is not one of the downsampling methods. "
+                         f"The methods are: {list(DOWNSAMPLING_METHODS.keys())}")
+
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    indices = DOWNSAMPLING_METHODS[method](x, y, max_points)
+
+    return x[indices], y[indices]
+
+def get_auto_max_points(axs):
+    """
+    Return the number of points that can be told apart on an axes, based on its width in pixels
+    """
+    width = axs.get_window_extent().width
+
+    return max(int(POINTS_PER_PIXEL * width), 4)
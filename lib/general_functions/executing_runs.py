@@ -1,4 +1,6 @@
 import os
+import time
+import signal
 import subprocess
 
 def generate_batch_script(model_folder, exe_path, batch_file_name = "run_model.bat", include_cd = False, batch_file_folder = None):
@@ -63,7 +65,8 @@ def run_batch_script(batch_script_path, flag_print_Blog = False):
 
     Returns
     -------
-    None.
+    returncode : int
+        Exit code of the batch script, 0 if it succeeded
 
     '''
     """
@@ -81,8 +84,198 @@ def run_batch_script(batch_script_path, flag_print_Blog = False):
         if flag_print_Blog:
             print("Output:")
             print(result.stdout)
+
+        return result.returncode
     except subprocess.CalledProcessError as e:
         # Print error message and captured stderr
         print(f"An error occurred while executing the batch file: {e}")
         print("Error output:")
-        print(e.stderr)
\ No newline at end of file
+        print(e.stderr)
+
+        return e.returncode
+
+def get_batch_script_command(batch_script_path):
+    """
+    Return the command that runs a batch script without a shell string
+
+    Windows runs .bat files through cmd /c, everywhere else the script is run with /bin/sh
+    """
+    if os.name == "nt":
+        return ["cmd", "/c", batch_script_path]
+
+    return ["/bin/sh", batch_script_path]
+
+def kill_process_tree(process):
+    """
+    Kill a process and the processes it started, e.g. a batch script and the driver it runs
+
+    Works with subprocess.Popen and asyncio processes. On Windows the tree is killed with
+    taskkill /T. Elsewhere the process group is killed when the process was started with
+    start_new_session = True, otherwise only the process itself.
+    """
+    if process.returncode is not None:
+        return
+
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output = True)
+        return
+
+    try:
+        if os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        # Exited in the meantime
+        pass
+
+def start_batch_script(batch_script_path, log_file_name = None):
+    """
+    Start a batch script without waiting for it to finish
+
+    Parameters
+    ----------
+    batch_script_path : string
+        The path to the batch script that should be started
+
+    log_file_name : string (Optional)
+        Name of the file in the batch script folder that stdout and stderr are written to.
+        Defaults to the name of the batch script with a ".log" extension
+
+    Returns
+    -------
+    process : subprocess.Popen
+        The running process, use process.poll() or process.wait() to check on it
+
+    """
+
+    # Set the working directory to where the batch file is located
+    working_directory = os.path.dirname(batch_script_path)
+
+    if log_file_name is None:
+        log_file_name = os.path.splitext(os.path.basename(batch_script_path))[0] + ".log"
+
+    # Write the output to a file so a chatty driver can't fill up a pipe and stall
+    with open(os.path.join(working_directory, log_file_name), "w") as log_file:
+        # Own process group on POSIX so kill_process_tree also stops the driver the shell started
+        process = subprocess.Popen(batch_script_path, shell=True, cwd=working_directory,
+                                   stdout=log_file, stderr=subprocess.STDOUT,
+                                   start_new_session=os.name != "nt")
+
+    return process
+
+
+class DriverRunResult:
+    """
+    Result of running the incremental driver with launch_driver, or through a batch file or
+    the run cache (see DriverModel.run_model)
+    """
+    def __init__(self, exe_path, model_folder, returncode, wall_time,
+                 stdout_path, stderr_path, timed_out = False, spawn_time = None, from_cache = False):
+        self.exe_path     = exe_path
+        self.model_folder = model_folder
+        self.returncode   = returncode
+        self.wall_time    = wall_time     # Seconds from spawning the process until it exited
+        self.stdout_path  = stdout_path
+        self.stderr_path  = stderr_path
+        self.timed_out    = timed_out
+        self.spawn_time   = spawn_time    # Seconds it took to spawn the process, part of wall_time
+        self.from_cache   = from_cache    # The output was copied from the run cache, the driver didn't run
+
+    def __str__(self):
+        return_string = (f"Driver: {self.exe_path}\n"
+                         f"Model folder: {self.model_folder}\n"
+                         f"Exit code: {self.returncode}\n"
+                         f"Wall time: {self.wall_time:.3f} s\n"
+                         f"Timed out: {self.timed_out}\n"
+                         f"From cache: {self.from_cache}\n"
+                         )
+
+        return return_string
+
+    @property
+    def succeeded(self):
+        return self.returncode == 0 and not self.timed_out
+
+def start_driver(model_folder, exe_path, stdout_file_name = "driver_stdout.log",
+                 stderr_file_name = "driver_stderr.log"):
+    """
+    Start the incremental driver directly, without a batch file or a shell
+
+    Parameters
+    ----------
+    model_folder : string
+        Folder with the input files, used as the working directory of the driver
+
+    exe_path : string
+        Path to the incremental driver executable
+
+    stdout_file_name, stderr_file_name : string (Optional)
+        Names of the files in model_folder that stdout and stderr are written to
+
+    Returns
+    -------
+    process : subprocess.Popen
+        The running driver process
+
+    """
+    stdout_path = os.path.join(model_folder, stdout_file_name)
+    stderr_path = os.path.join(model_folder, stderr_file_name)
+
+    # The child keeps its own handles to the files, they can be closed here
+    with open(stdout_path, "w") as stdout_file, open(stderr_path, "w") as stderr_file:
+        process = subprocess.Popen([exe_path], cwd=model_folder,
+                                   stdout=stdout_file, stderr=stderr_file)
+
+    return process
+
+def launch_driver(model_folder, exe_path, stdout_file_name = "driver_stdout.log",
+                  stderr_file_name = "driver_stderr.log", timeout = None):
+    """
+    Run the incremental driver directly and wait for it to finish
+
+    Unlike run_batch_script no batch file is written and no shell is spawned,
+    the executable is started with model_folder as the working directory.
+
+    Parameters
+    ----------
+    model_folder : string
+        Folder with the input files, used as the working directory of the driver
+
+    exe_path : string
+        Path to the incremental driver executable
+
+    stdout_file_name, stderr_file_name : string (Optional)
+        Names of the files in model_folder that stdout and stderr are written to
+
+    timeout : float (Optional)
+        Seconds to wait before the driver is killed
+
+    Returns
+    -------
+    result : DriverRunResult
+        Exit code, wall time and the paths to the stdout and stderr files
+
+    """
+    start_time = time.perf_counter()
+
+    process = start_driver(model_folder, exe_path, stdout_file_name, stderr_file_name)
+
+    spawn_time = time.perf_counter() - start_time
+
+    timed_out = False
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        timed_out = True
+
+    wall_time = time.perf_counter() - start_time
+
+    result = DriverRunResult(exe_path, model_folder, process.returncode, wall_time,
+                             os.path.join(model_folder, stdout_file_name),
+                             os.path.join(model_folder, stderr_file_name),
+                             timed_out=timed_out, spawn_time=spawn_time)
+
+    return result
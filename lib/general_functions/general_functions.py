@@ -1,6 +1,7 @@
 """
 General functions
 """
+import os
 
 def are_keys_in_list(dictionary, lst):
     print(f"dict keys: {dictionary.keys()}")
@@ -11,6 +12,24 @@ def is_list_in_dict_keys(lst, dictionary):
     # Checks if all the elements of a list in the keys of a dict
     return set(lst).issubset(dictionary.keys())
 
+def format_line_with_inline_comment(data, comment, comment_char = "#", num_spaces = 10,
+                                    newline = True):
+    """
+    Return a line with a comment, see write_line_with_inline_comment
+    """
+    # Store a space character
+    space = " "
+    
+    blank_spaces = space * num_spaces
+
+    # Concatenate the data and the comment with the required spaces
+    if newline:
+        file_line = f"{data}{blank_spaces}{comment_char} {comment}\n"
+    else:
+        file_line = f"{data}{blank_spaces}{comment_char} {comment}"
+
+    return file_line
+
 def write_line_with_inline_comment(file, data, comment, 
                                    comment_char = "#", num_spaces = 10,
                                    newline = True):
@@ -24,15 +43,24 @@ def write_line_with_inline_comment(file, data, comment,
         comment_char: The character that comes before the comment
         spaces: Number of spaces between the line data and the comment
         """
-    # Store a space character
-    space = " "
-    
-    blank_spaces = space * num_spaces
+    file_line = format_line_with_inline_comment(data, comment, comment_char = comment_char,
+                                                num_spaces = num_spaces, newline = newline)
 
-    # Concatenate the data and the comment with the required spaces
-    if newline:
-        file_line = f"{data}{blank_spaces}{comment_char} {comment}\n"
-    else:
-        file_line = f"{data}{blank_spaces}{comment_char} {comment}"
+    file.write(file_line)
+
+def write_file_if_changed(file_path, text):
+    """
+    Write text to a file in a single write, unless the file already holds the same text
+
+    Returns:
+        True if the file was written, False if it was unchanged
+    """
+    if os.path.isfile(file_path):
+        with open(file_path, "r") as file:
+            if file.read() == text:
+                return False
+
+    with open(file_path, "w") as file:
+        file.write(text)
 
-    file.write(file_line)
\ No newline at end of file
+    return True
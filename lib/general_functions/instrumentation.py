@@ -0,0 +1,174 @@
+"""
+Opt-in timing instrumentation of the phases of a driver run.
+
+The phases recorded by DriverModel, DriverModelSetup and DriverModelResults are
+    deck_writing, process_spawn, driver_execution, output_parsing, invariants, plotting
+Each record holds the wall time and the number of bytes written, read or produced.
+
+The phases don't overlap. When a phase runs inside of another one (e.g. the invariants
+computed by a plot) its time is only counted in the inner phase, so the phase totals
+add up to the total time of the run.
+"""
+import csv
+import json
+import time
+import functools
+import contextlib
+
+class RunMetrics:
+    """
+    Wall time and bytes of each phase of a single run
+    """
+    def __init__(self, run_name = None):
+        self.run_name = run_name
+
+        # One dict per timed call, in the order they happened
+        self.records = []
+
+        # Time spent in the inner phases of each phase that is running, innermost last
+        self._inner_times = []
+
+    def __str__(self):
+        return_string = f"Run: {self.run_name}\n"
+
+        for phase, totals in self.get_phase_totals().items():
+            return_string += (f"{phase:<18} {totals['wall_time_s']:10.4f} s "
+                              f"{totals['bytes']:>12} bytes {totals['count']:>6} calls\n")
+
+        return return_string
+
+    def add(self, phase, wall_time, num_bytes = 0):
+        """
+        Add a record for a phase
+        """
+        self.records.append({
+            "run_name": self.run_name,
+            "phase": phase,
+            "wall_time_s": wall_time,
+            "bytes": int(num_bytes),
+        })
+
+    @contextlib.contextmanager
+    def phase(self, phase):
+        """
+        Time the code inside of the with block as a phase
+
+        The yielded dict can be given a "bytes" entry with the number of bytes handled.
+        The time of phases timed inside of the block is left out of this phase.
+        """
+        record = {"bytes": 0}
+        start_time = time.perf_counter()
+        self._inner_times.append(0.0)
+
+        try:
+            yield record
+        finally:
+            wall_time  = time.perf_counter() - start_time
+            inner_time = self._inner_times.pop()
+
+            self.add(phase, wall_time - inner_time, record["bytes"])
+
+            # Leave this phase out of the phase it is running in
+            if self._inner_times:
+                self._inner_times[-1] += wall_time
+
+    def get_phase_totals(self):
+        """
+        Return {phase: {"wall_time_s", "bytes", "count"}} summed over the records
+        """
+        totals = {}
+
+        for record in self.records:
+            phase_totals = totals.setdefault(record["phase"], {"wall_time_s": 0.0, "bytes": 0, "count": 0})
+            phase_totals["wall_time_s"] += record["wall_time_s"]
+            phase_totals["bytes"]       += record["bytes"]
+            phase_totals["count"]       += 1
+
+        return totals
+
+    def to_dict(self):
+        return {"run_name": self.run_name, "phases": self.get_phase_totals()}
+
+    def to_json(self, file_path):
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file, indent = 4)
+
+    def to_csv(self, file_path):
+        _write_records_csv(file_path, self.records)
+
+class MetricsCollection:
+    """
+    Metrics of many runs, e.g. all of the runs of a sweep
+    """
+    def __init__(self):
+        self.run_metrics = []
+
+    def __str__(self):
+        return_string = f"Number of runs: {len(self.run_metrics)}\n"
+
+        for phase, totals in self.get_phase_totals().items():
+            return_string += (f"{phase:<18} {totals['wall_time_s']:10.4f} s "
+                              f"{totals['bytes']:>12} bytes {totals['count']:>6} calls\n")
+
+        return return_string
+
+    def add(self, run_metrics):
+        self.run_metrics.append(run_metrics)
+
+    def get_records(self):
+        """
+        Return the records of every run in a single list
+        """
+        return [record for run_metrics in self.run_metrics for record in run_metrics.records]
+
+    def get_phase_totals(self):
+        """
+        Return {phase: {"wall_time_s", "bytes", "count"}} summed over all of the runs
+        """
+        combined = RunMetrics()
+        combined.records = self.get_records()
+
+        return combined.get_phase_totals()
+
+    def to_dict(self):
+        return {
+            "num_runs": len(self.run_metrics),
+            "phases": self.get_phase_totals(),
+            "runs": [run_metrics.to_dict() for run_metrics in self.run_metrics],
+        }
+
+    def to_json(self, file_path):
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file, indent = 4)
+
+    def to_csv(self, file_path):
+        _write_records_csv(file_path, self.get_records())
+
+def _write_records_csv(file_path, records):
+    with open(file_path, "w", newline = "") as file:
+        writer = csv.DictWriter(file, fieldnames = ["run_name", "phase", "wall_time_s", "bytes"])
+        writer.writeheader()
+        writer.writerows(records)
+
+def timed_phase(metrics, phase):
+    """
+    Time a phase if metrics is a RunMetrics object, do nothing if it is None
+    """
+    if metrics is None:
+        return contextlib.nullcontext({"bytes": 0})
+
+    return metrics.phase(phase)
+
+def timed_method(phase):
+    """
+    Decorator that times a method as a phase using the metrics attribute of its object
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with timed_phase(getattr(self, "metrics", None), phase):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
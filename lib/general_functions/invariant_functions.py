@@ -71,6 +71,247 @@ def calc_volumetric_strain_invariant(strain):
     return eps_p
 
 
+def _as_voigt_block(block):
+    """
+    Return a (N, 6) float array from a (N, 6) DataFrame or array of Voigt components
+    """
+    if isinstance(block, pd.DataFrame):
+        block = block.to_numpy(dtype=float)
+    else:
+        block = np.asarray(block, dtype=float)
+
+    # A single row is treated as a block with one row
+    if block.ndim == 1:
+        block = block[np.newaxis, :]
+
+    if block.ndim != 2 or block.shape[1] != 6:
+        raise ValueError("Input must have shape (N, 6)")
+
+    return block
+
+def calc_mean_stress_array(stress):
+    """
+    Calc the mean stress for every row of a (N, 6) stress block
+    """
+    stress = _as_voigt_block(stress)
+
+    mean_stress = stress[:, 0:3].sum(axis = 1) / 3.0
+
+    return mean_stress
+
+def calc_q_invariant_array(stress):
+    """
+    Calc the q invariant for every row of a (N, 6) stress block
+    """
+    stress = _as_voigt_block(stress)
+
+    # Calc the deviatoric normal stresses
+    dev_normal = stress[:, 0:3] - calc_mean_stress_array(stress)[:, np.newaxis]
+
+    # Sum of the squared deviatoric terms, the shear stress terms are doubled
+    squared_sum = np.einsum("ij,ij->i", dev_normal, dev_normal) + \
+                  2.0 * np.einsum("ij,ij->i", stress[:, 3:6], stress[:, 3:6])
+
+    # Calc the equivlent stress invariant
+    q = np.sqrt(1.5 * squared_sum)
+
+    return q
+
+def calc_dev_strain_invariant_array(strain):
+    """
+    Calc the deviatoric strain invariant for every row of a (N, 6) strain block
+    """
+    strain = _as_voigt_block(strain)
+
+    # Calc (eps_{yy} - eps_{zz})^{2} + (eps_{zz} - eps_{xx})^{2} + (eps_{xx} - eps_{yy})^{2}
+    normal_term = (strain[:, 1] - strain[:, 2])**2 + \
+                  (strain[:, 2] - strain[:, 0])**2 + \
+                  (strain[:, 0] - strain[:, 1])**2
+
+    # Calc the shear terms (eps_{yz}^{2} + eps_{zx}^{2} + eps_{xy}^{2})
+    shear_term = np.einsum("ij,ij->i", strain[:, 3:6], strain[:, 3:6])
+
+    eps_q = 1.0/3.0 * np.sqrt(2.0 * normal_term + 3.0 * shear_term)
+
+    return eps_q
+
+def calc_volumetric_strain_invariant_array(strain):
+    """
+    Calc the volumetric strain invariant for every row of a (N, 6) strain block
+    """
+    strain = _as_voigt_block(strain)
+
+    eps_p = strain[:, 0:3].sum(axis = 1)
+
+    return eps_p
+
+def calc_stress_invariants_array(stress):
+    """
+    Calc the mean stress and q invariant of a (N, 6) stress block in one pass
+
+    Returns:
+        (mean_stress, q) as two arrays of length N
+    """
+    stress = _as_voigt_block(stress)
+
+    # The mean stress and the deviatoric normal stresses are shared by both invariants
+    mean_stress = stress[:, 0:3].sum(axis = 1) / 3.0
+    dev_normal  = stress[:, 0:3] - mean_stress[:, np.newaxis]
+
+    # Sum of the squared deviatoric terms, the shear stress terms are doubled
+    squared_sum = np.einsum("ij,ij->i", dev_normal, dev_normal) + \
+                  2.0 * np.einsum("ij,ij->i", stress[:, 3:6], stress[:, 3:6])
+
+    q = np.sqrt(1.5 * squared_sum)
+
+    return mean_stress, q
+
+def calc_strain_invariants_array(strain):
+    """
+    Calc the volumetric and deviatoric strain invariants of a (N, 6) strain block in one pass
+
+    Returns:
+        (eps_p, eps_q) as two arrays of length N
+    """
+    strain = _as_voigt_block(strain)
+
+    # The volumetric strain and the deviatoric normal strains are shared by both invariants
+    eps_p      = strain[:, 0:3].sum(axis = 1)
+    dev_normal = strain[:, 0:3] - eps_p[:, np.newaxis] / 3.0
+
+    # The sum of the squared differences of the normal strains is 3 times the squared deviator
+    normal_term = 3.0 * np.einsum("ij,ij->i", dev_normal, dev_normal)
+
+    # Calc the shear terms (eps_{yz}^{2} + eps_{zx}^{2} + eps_{xy}^{2})
+    shear_term = np.einsum("ij,ij->i", strain[:, 3:6], strain[:, 3:6])
+
+    eps_q = 1.0/3.0 * np.sqrt(2.0 * normal_term + 3.0 * shear_term)
+
+    return eps_p, eps_q
+
+
+def _as_voigt_stack(block):
+    """
+    Return a (N, 6) float array and the leading shape of a (..., 6) block
+
+    Works for (N, 6) blocks and stacked (num_runs, num_steps, 6) ensembles
+    """
+    if isinstance(block, pd.DataFrame):
+        block = block.to_numpy(dtype=float)
+    else:
+        block = np.asarray(block, dtype=float)
+
+    if block.shape[-1] != 6:
+        raise ValueError("Input must have shape (..., 6)")
+
+    return block.reshape(-1, 6), block.shape[:-1]
+
+def voigt_to_tensor_array(block, is_strain = False):
+    """
+    Assemble (N, 3, 3) symmetric tensors from a (N, 6) block of Voigt components
+
+    The Voigt order is 11, 22, 33, 12, 13, 23. The strain shear components are engineering
+    shear strains, so half of them goes on the off-diagonal of the strain tensor.
+    """
+    block, lead_shape = _as_voigt_stack(block)
+
+    shear_factor = 0.5 if is_strain else 1.0
+
+    tensors = np.empty((len(block), 3, 3))
+    tensors[:, [0, 1, 2], [0, 1, 2]] = block[:, 0:3]
+    tensors[:, [0, 1, 0, 2, 1, 2], [1, 0, 2, 0, 2, 1]] = shear_factor * block[:, [3, 3, 4, 4, 5, 5]]
+
+    return tensors.reshape(lead_shape + (3, 3))
+
+def _get_deviator_components(block, is_strain):
+    """
+    Return the deviatoric normal components and the tensor shear components of a (N, 6) block
+    """
+    shear_factor = 0.5 if is_strain else 1.0
+
+    dev_normal = block[:, 0:3] - block[:, 0:3].mean(axis = 1)[:, np.newaxis]
+    shear      = shear_factor * block[:, 3:6]
+
+    return dev_normal, shear
+
+def calc_j2_array(block, is_strain = False):
+    """
+    Calc the second invariant of the deviator, J2 = s_ij s_ij / 2, for every row of a (..., 6) block
+    """
+    block, lead_shape = _as_voigt_stack(block)
+    dev_normal, shear = _get_deviator_components(block, is_strain)
+
+    j2 = 0.5 * np.einsum("ij,ij->i", dev_normal, dev_normal) + np.einsum("ij,ij->i", shear, shear)
+
+    return j2.reshape(lead_shape)
+
+def calc_j3_array(block, is_strain = False):
+    """
+    Calc the third invariant of the deviator, J3 = det(s), for every row of a (..., 6) block
+    """
+    block, lead_shape = _as_voigt_stack(block)
+    dev_normal, shear = _get_deviator_components(block, is_strain)
+
+    s11, s22, s33 = dev_normal[:, 0], dev_normal[:, 1], dev_normal[:, 2]
+    s12, s13, s23 = shear[:, 0], shear[:, 1], shear[:, 2]
+
+    j3 = (s11 * s22 * s33 + 2.0 * s12 * s23 * s13
+          - s11 * s23**2 - s22 * s13**2 - s33 * s12**2)
+
+    return j3.reshape(lead_shape)
+
+def calc_lode_angle_array(block, is_strain = False):
+    """
+    Calc the Lode angle in radians for every row of a (..., 6) block
+
+    The angle is defined by cos(3 theta) = 3 sqrt(3) / 2 J3 / J2^(3/2) and is in [0, pi/3].
+    With tension positive stresses it is 0 for triaxial extension and pi/3 for triaxial
+    compression. Rows without a deviator (J2 = 0) return NaN.
+    """
+    j2 = calc_j2_array(block, is_strain)
+    j3 = calc_j3_array(block, is_strain)
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        cos_3theta = 1.5 * np.sqrt(3.0) * j3 / j2**1.5
+
+    # Round off can push the value slightly out of [-1, 1]
+    lode_angle = np.arccos(np.clip(cos_3theta, -1.0, 1.0)) / 3.0
+
+    return np.where(j2 > 0, lode_angle, np.nan)
+
+def calc_principal_values_array(block, is_strain = False):
+    """
+    Calc the principal values of every row of a (..., 6) block with one batched eigen-solve
+
+    Returns:
+        (..., 3) array with the principal values from the largest to the smallest. Rows with
+        NaN or inf values return NaN
+    """
+    tensors = voigt_to_tensor_array(block, is_strain)
+    lead_shape = tensors.shape[:-2]
+    tensors = tensors.reshape(-1, 3, 3)
+
+    principal = np.full((len(tensors), 3), np.nan)
+
+    # eigvalsh fails on non-finite values, e.g. the padding of a results collection
+    finite = np.all(np.isfinite(tensors), axis = (1, 2))
+    principal[finite] = np.linalg.eigvalsh(tensors[finite])[:, ::-1]
+
+    return principal.reshape(lead_shape + (3,))
+
+def calc_principal_stresses_array(stress):
+    """
+    Calc the principal stresses (largest first) of every row of a (..., 6) stress block
+    """
+    return calc_principal_values_array(stress, is_strain = False)
+
+def calc_principal_strains_array(strain):
+    """
+    Calc the principal strains (largest first) of every row of a (..., 6) strain block
+    """
+    return calc_principal_values_array(strain, is_strain = True)
+
+
 if __name__ == "__main__":
 
     # Make a stress vector
@@ -83,3 +324,8 @@ if __name__ == "__main__":
     strain = np.array([1,2, 3, 4, 5, 6])
     print(f"Eps_q: {calc_dev_strain_invariant(strain)}")
     print(f"Eps_p: {calc_volumetric_strain_invariant(strain)}")
+
+    # The array versions work on a whole (N, 6) block at once
+    strain_block = np.tile(strain, (3, 1))
+    print(f"Eps_q (array): {calc_dev_strain_invariant_array(strain_block)}")
+    print(f"Eps_p (array): {calc_volumetric_strain_invariant_array(strain_block)}")
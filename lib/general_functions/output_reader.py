@@ -0,0 +1,213 @@
+"""
+Reader for the output file written by incremental driver.
+
+The output file has one header line with the column names followed by whitespace
+delimited numeric rows. The columns are always laid out as
+    time(1) time(2) stran(1..6) stress(1..6) statev(1..nstatev)
+"""
+import io
+import itertools
+import numpy as np
+
+# Prefix of the column names in each group of the output file
+OUTPUT_COLUMN_GROUPS = {
+    "time"  : "time(",
+    "stran" : "stran(",
+    "stress": "stress(",
+    "statev": "statev(",
+}
+
+def read_output_header(file_path):
+    """
+    Return the list of column names in the header of the output file
+    """
+    with open(file_path, "r") as file:
+        header = file.readline()
+
+    return header.split()
+
+def get_group_columns(columns, group):
+    """
+    Return the column names in a group ("time", "stran", "stress" or "statev")
+    """
+    if group not in OUTPUT_COLUMN_GROUPS:
+        raise ValueError(f"{group} is not one of the output column groups. "
+                         f"The groups are: {list(OUTPUT_COLUMN_GROUPS.keys())}")
+
+    prefix = OUTPUT_COLUMN_GROUPS[group]
+
+    return [name for name in columns if name.startswith(prefix)]
+
+def get_column_indices(columns, usecols):
+    """
+    Convert a usecols selection into a sorted list of column indices
+
+    Inputs:
+        columns (list): Column names from the header
+        usecols (list): Column names, column indices or group names ("time", "stran", "stress", "statev")
+    """
+    indices = set()
+
+    for col in usecols:
+        if isinstance(col, (int, np.integer)):
+            indices.add(int(col))
+        elif col in OUTPUT_COLUMN_GROUPS:
+            indices.update(columns.index(name) for name in get_group_columns(columns, col))
+        elif col in columns:
+            indices.add(columns.index(col))
+        else:
+            raise KeyError(f"{col} is not a column in the output file. The columns are: {columns}")
+
+    return sorted(indices)
+
+def _parse_field(field):
+    """
+    Parse one field of the output file, fields that aren't numbers are NaN
+    """
+    try:
+        return float(field)
+    except ValueError:
+        return np.nan
+
+def parse_rows(lines, num_columns, indices = None, dtype = np.float64):
+    """
+    Parse complete rows of the output file into a (num_rows, num_selected_columns) array
+
+    A diverging run makes the Fortran formatting write fields that aren't valid numbers, e.g.
+    "****" or "0.1234567-100" (a three digit exponent without the E). The fast parser fails on
+    those, so the rows are then parsed one field at a time and the fields that aren't numbers,
+    or rows with the wrong number of fields, are read as NaN.
+
+    Inputs:
+        lines (list): Rows of the file, without the header
+        num_columns (int): Number of columns in the file
+        indices (list): Optional indices of the columns to keep
+        dtype: dtype of the returned array
+    """
+    num_selected = num_columns if indices is None else len(indices)
+
+    try:
+        return np.loadtxt(lines, dtype = dtype, usecols = indices, ndmin = 2).reshape(-1, num_selected)
+    except ValueError:
+        pass
+
+    block = np.full((len(lines), num_columns), np.nan)
+
+    for i, line in enumerate(lines):
+        fields = line.split()
+
+        if len(fields) == num_columns:
+            block[i] = [_parse_field(field) for field in fields]
+
+    if indices is not None:
+        block = block[:, indices]
+
+    return np.ascontiguousarray(block, dtype = dtype)
+
+def _open_complete_rows(file_path):
+    """
+    Return a binary file object positioned after the header that only holds complete rows.
+
+    A run that is still going or was killed can leave a partially written last row,
+    in which case the body is read into memory and cut at the last newline.
+    """
+    file = open(file_path, "rb")
+
+    # Check if the file ends with a newline
+    file.seek(0, io.SEEK_END)
+    file_size = file.tell()
+
+    if file_size > 0:
+        file.seek(-1, io.SEEK_END)
+        ends_with_newline = file.read(1) == b"\n"
+    else:
+        ends_with_newline = True
+
+    file.seek(0)
+    file.readline()
+
+    if ends_with_newline:
+        return file
+
+    body = file.read()
+    file.close()
+
+    return io.BytesIO(body[:body.rfind(b"\n") + 1])
+
+def read_output_file(file_path, usecols = None, dtype = np.float64):
+    """
+    Read the output file into a contiguous numeric array
+
+    Inputs:
+        file_path (str): Path to the output file
+        usecols (list): Optional selection of columns, see get_column_indices. Columns that
+                        aren't selected are skipped by the parser
+        dtype: dtype of the returned array
+
+    Returns:
+        (columns, data) where columns is the list of column names and data is a
+        C-contiguous array with shape (num_rows, len(columns))
+    """
+    columns = read_output_header(file_path)
+
+    if usecols is None:
+        indices = None
+    else:
+        indices = get_column_indices(columns, usecols)
+        columns = [columns[i] for i in indices]
+
+    with _open_complete_rows(file_path) as file:
+        start = file.tell()
+
+        try:
+            data = np.loadtxt(file, dtype = dtype, usecols = indices, ndmin = 2)
+        except ValueError:
+            # Fields that aren't numbers, see parse_rows
+            file.seek(start)
+            data = parse_rows(file.readlines(), len(read_output_header(file_path)), indices, dtype)
+
+    # An empty body comes back with zero columns
+    if data.shape[0] == 0:
+        data = np.empty((0, len(columns)), dtype = dtype)
+
+    return columns, np.ascontiguousarray(data)
+
+def iter_output_chunks(file_path, chunk_size = 100_000, usecols = None, dtype = np.float64):
+    """
+    Read the output file in blocks of at most chunk_size rows
+
+    Only one block is held in memory at a time, so files larger than the available
+    memory can be processed. A partially written last row is skipped.
+
+    Inputs:
+        file_path (str): Path to the output file
+        chunk_size (int): Number of rows in each block
+        usecols (list): Optional selection of columns, see get_column_indices
+        dtype: dtype of the returned blocks
+
+    Yields:
+        (num_rows, num_columns) arrays, the column names are given by read_output_header
+        (or the usecols selection)
+    """
+    columns = read_output_header(file_path)
+
+    if usecols is None:
+        indices = None
+    else:
+        indices = get_column_indices(columns, usecols)
+
+    with open(file_path, "rb") as file:
+        # Skip the header
+        file.readline()
+
+        while True:
+            lines = list(itertools.islice(file, chunk_size))
+
+            # Drop a row that hasn't been completely written
+            if lines and not lines[-1].endswith(b"\n"):
+                lines.pop()
+
+            if not lines:
+                break
+
+            yield parse_rows(lines, len(columns), indices, dtype)
@@ -0,0 +1,137 @@
+"""
+Incremental reading of the output file while incremental driver is still writing it.
+"""
+import os
+import numpy as np
+
+from lib.general_functions.output_reader import parse_rows
+
+def get_planned_increments(load_list):
+    """
+    Return the total number of increments (sum of ninc) of the loads
+    """
+    return sum(int(load.input_params_dict["ninc"]) for load in load_list)
+
+def get_completed_increments(load_list, num_rows):
+    """
+    Estimate the number of completed increments from the number of output rows
+
+    The driver writes the initial state and then one row every "every" increments of
+    each load, so the rows are mapped back onto the loads in order.
+    """
+    # The first row is the initial state
+    remaining_rows = max(num_rows - 1, 0)
+    completed = 0
+
+    for load in load_list:
+        ninc  = int(load.input_params_dict["ninc"])
+        every = max(int(load.input_params_dict["every"]), 1)
+
+        load_rows = ninc // every
+
+        if remaining_rows >= load_rows:
+            completed += ninc
+            remaining_rows -= load_rows
+        else:
+            completed += remaining_rows * every
+            break
+
+    return completed
+
+class OutputTailer:
+    """
+    Reads the rows appended to an output file since the last read.
+
+    Only complete rows are returned, a row that is still being written is kept
+    until the rest of it is available.
+    """
+    def __init__(self, file_path, load_list = None):
+        self.file_path = file_path
+
+        # Loads of the run, used to report the progress
+        self.load_list = [] if load_list is None else load_list
+        self.planned_increments = get_planned_increments(self.load_list)
+
+        # Column names, read from the header once it is written
+        self.columns = None
+
+        # Position in the file and the bytes of an incomplete row
+        self._offset  = 0
+        self._partial = b""
+
+        self.num_rows = 0
+
+    def __str__(self):
+        return_string = (f"Output file path: {self.file_path}\n"
+                         f"Rows read: {self.num_rows}\n"
+                         f"Progress: {self.get_completed_increments()}/{self.planned_increments} increments\n"
+                         )
+
+        return return_string
+
+    def get_completed_increments(self):
+        return get_completed_increments(self.load_list, self.num_rows)
+
+    def get_progress(self):
+        """
+        Return a dict with the completed and planned increments of the run
+        """
+        completed = self.get_completed_increments()
+
+        if self.planned_increments > 0:
+            fraction = min(completed / self.planned_increments, 1.0)
+        else:
+            fraction = None
+
+        progress = {
+            "rows": self.num_rows,
+            "completed_increments": completed,
+            "planned_increments": self.planned_increments,
+            "fraction": fraction,
+        }
+
+        return progress
+
+    def read_new_rows(self):
+        """
+        Return the complete rows added to the file since the last call
+
+        Returns:
+            (num_new_rows, num_columns) array. It is empty if there are no new rows
+            or the file hasn't been created yet
+        """
+        if not os.path.isfile(self.file_path):
+            return self._empty_block()
+
+        with open(self.file_path, "rb") as file:
+            file.seek(self._offset)
+            data = file.read()
+
+        self._offset += len(data)
+        data = self._partial + data
+
+        # Keep the incomplete last row for the next read
+        cut = data.rfind(b"\n") + 1
+        data, self._partial = data[:cut], data[cut:]
+
+        lines = data.splitlines(keepends = True)
+
+        if self.columns is None:
+            if not lines:
+                return self._empty_block()
+
+            self.columns = lines.pop(0).decode().split()
+
+        if not lines:
+            return self._empty_block()
+
+        block = parse_rows(lines, len(self.columns))
+
+        self.num_rows += len(block)
+
+        return block
+
+    def _empty_block(self):
+        num_columns = 0 if self.columns is None else len(self.columns)
+
+        return np.empty((0, num_columns), dtype = np.float64)
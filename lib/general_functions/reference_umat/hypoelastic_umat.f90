@@ -0,0 +1,85 @@
+! Reference nonlinear hypoelastic UMAT for testing the in-process UmatEngine.
+!
+! The bulk and shear moduli grow with the mean pressure p = -(s11 + s22 + s33) / 3:
+!     p     = p0 * exp(-depsv / kappa)         (K = p / kappa)
+!     s_dev = s_dev0 + 2 * G * de_dev          (G = ratio * p at the middle of the increment)
+! DDSDDE is the exact tangent of the increment, so Newton iterations converge quadratically.
+!
+! PROPS(1) = kappa, PROPS(2) = ratio of the shear modulus to the mean pressure
+! STATEV(1), if there is one, holds the mean pressure
+!
+! Build with:
+!     gfortran -shared -fPIC -O2 -o hypoelastic_umat.so hypoelastic_umat.f90
+
+subroutine umat(stress, statev, ddsdde, sse, spd, scd, rpl, ddsddt, drplde, drpldt, &
+                stran, dstran, time, dtime, temp, dtemp, predef, dpred, cmname,   &
+                ndi, nshr, ntens, nstatv, props, nprops, coords, drot, pnewdt,    &
+                celent, dfgrd0, dfgrd1, noel, npt, layer, kspt, kstep, kinc)
+    implicit none
+
+    character(len = 80) :: cmname
+    integer :: ndi, nshr, ntens, nstatv, nprops, noel, npt, layer, kspt, kstep, kinc
+    double precision :: stress(ntens), statev(nstatv), ddsdde(ntens, ntens), ddsddt(ntens), &
+                        drplde(ntens), stran(ntens), dstran(ntens), time(2), predef(1),    &
+                        dpred(1), props(nprops), coords(3), drot(3, 3), dfgrd0(3, 3),       &
+                        dfgrd1(3, 3)
+    double precision :: sse, spd, scd, rpl, drpldt, dtime, temp, dtemp, pnewdt, celent
+
+    double precision :: kappa, ratio, p0, p1, depsv, shear, dshear_deps, dp_deps
+    double precision :: s_dev(6), de_dev(6), normal(6)
+    integer :: i, j
+
+    kappa = props(1)
+    ratio = props(2)
+
+    ! 1 for the normal components, 0 for the shear components
+    normal = 0.0d0
+    normal(1:ndi) = 1.0d0
+
+    p0    = -sum(stress(1:ndi)) / 3.0d0
+    depsv = sum(dstran(1:ndi))
+    p1    = p0 * exp(-depsv / kappa)
+
+    shear = ratio * 0.5d0 * (p0 + p1)
+
+    ! Derivatives of p1 and of the shear modulus with respect to the normal strains
+    dp_deps     = -p1 / kappa
+    dshear_deps = ratio * 0.5d0 * dp_deps
+
+    s_dev  = stress + p0 * normal
+    de_dev = dstran - depsv / 3.0d0 * normal
+
+    ! Engineering shear strains, the shear stresses change by G * gamma
+    do i = 1, ntens
+        if (i <= ndi) then
+            s_dev(i) = s_dev(i) + 2.0d0 * shear * de_dev(i)
+        else
+            s_dev(i) = s_dev(i) + shear * dstran(i)
+        end if
+    end do
+
+    stress = s_dev - p1 * normal
+
+    ddsdde = 0.0d0
+    do j = 1, ntens
+        do i = 1, ntens
+            if (i <= ndi) then
+                ddsdde(i, j) = -normal(i) * dp_deps * normal(j) + 2.0d0 * de_dev(i) * dshear_deps * normal(j)
+                if (j <= ndi) then
+                    ddsdde(i, j) = ddsdde(i, j) + 2.0d0 * shear * (merge(1.0d0, 0.0d0, i == j) - 1.0d0 / 3.0d0)
+                end if
+            else
+                ddsdde(i, j) = dstran(i) * dshear_deps * normal(j)
+                if (i == j) then
+                    ddsdde(i, j) = ddsdde(i, j) + shear
+                end if
+            end if
+        end do
+    end do
+
+    if (nstatv >= 1) then
+        statev(1) = p1
+    end if
+
+    sse = sse + 0.5d0 * dot_product(stress, dstran)
+end subroutine umat
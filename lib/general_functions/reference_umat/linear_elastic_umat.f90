@@ -0,0 +1,51 @@
+! Reference linear elastic UMAT for testing the in-process UmatEngine.
+!
+! PROPS(1) = Young's modulus, PROPS(2) = Poisson's ratio
+! STATEV(1), if there is one, holds the accumulated volumetric strain
+!
+! Build with:
+!     gfortran -shared -fPIC -O2 -o linear_elastic_umat.so linear_elastic_umat.f90
+
+subroutine umat(stress, statev, ddsdde, sse, spd, scd, rpl, ddsddt, drplde, drpldt, &
+                stran, dstran, time, dtime, temp, dtemp, predef, dpred, cmname,   &
+                ndi, nshr, ntens, nstatv, props, nprops, coords, drot, pnewdt,    &
+                celent, dfgrd0, dfgrd1, noel, npt, layer, kspt, kstep, kinc)
+    implicit none
+
+    character(len = 80) :: cmname
+    integer :: ndi, nshr, ntens, nstatv, nprops, noel, npt, layer, kspt, kstep, kinc
+    double precision :: stress(ntens), statev(nstatv), ddsdde(ntens, ntens), ddsddt(ntens), &
+                        drplde(ntens), stran(ntens), dstran(ntens), time(2), predef(1),    &
+                        dpred(1), props(nprops), coords(3), drot(3, 3), dfgrd0(3, 3),       &
+                        dfgrd1(3, 3)
+    double precision :: sse, spd, scd, rpl, drpldt, dtime, temp, dtemp, pnewdt, celent
+
+    double precision :: young, poisson, lame, shear
+    integer :: i, j
+
+    young   = props(1)
+    poisson = props(2)
+
+    lame  = young * poisson / ((1.0d0 + poisson) * (1.0d0 - 2.0d0 * poisson))
+    shear = young / (2.0d0 * (1.0d0 + poisson))
+
+    ! Stiffness with engineering shear strains
+    ddsdde = 0.0d0
+    do i = 1, ndi
+        do j = 1, ndi
+            ddsdde(i, j) = lame
+        end do
+        ddsdde(i, i) = lame + 2.0d0 * shear
+    end do
+    do i = ndi + 1, ntens
+        ddsdde(i, i) = shear
+    end do
+
+    stress = stress + matmul(ddsdde, dstran)
+
+    if (nstatv >= 1) then
+        statev(1) = statev(1) + sum(dstran(1:ndi))
+    end if
+
+    sse = sse + 0.5d0 * dot_product(stress, dstran)
+end subroutine umat
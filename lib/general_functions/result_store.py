@@ -0,0 +1,73 @@
+"""
+Binary store for the results of an incremental driver run.
+
+A store is a folder with one .npy file per column group of the output file
+("time", "stran", "stress" and "statev") and a columns.json file holding the column
+names of each group. The .npy files are memory mapped when they are opened, so only
+the groups that are used are read from disk.
+"""
+import os
+import json
+import numpy as np
+
+from lib.general_functions.output_reader import OUTPUT_COLUMN_GROUPS, get_group_columns
+
+COLUMNS_FILE_NAME = "columns.json"
+
+def save_result_store(store_folder, columns, data):
+    """
+    Save the output of a run as a binary store
+
+    Inputs:
+        store_folder (str): Folder that the store is written to, it is created if needed
+        columns (list): Column names of data
+        data (array): (num_rows, len(columns)) array with the output of the run
+    """
+    os.makedirs(store_folder, exist_ok = True)
+
+    data = np.asarray(data)
+    group_columns = {}
+
+    for group in OUTPUT_COLUMN_GROUPS:
+        names = get_group_columns(columns, group)
+        indices = [columns.index(name) for name in names]
+
+        # Each group is stored as its own contiguous block
+        np.save(os.path.join(store_folder, f"{group}.npy"), np.ascontiguousarray(data[:, indices]))
+
+        group_columns[group] = names
+
+    with open(os.path.join(store_folder, COLUMNS_FILE_NAME), "w") as file:
+        json.dump(group_columns, file, indent = 4)
+
+def read_store_columns(store_folder):
+    """
+    Return a dict with the column names of each group in the store
+    """
+    with open(os.path.join(store_folder, COLUMNS_FILE_NAME), "r") as file:
+        group_columns = json.load(file)
+
+    return group_columns
+
+def load_store_group(store_folder, group, mmap = True):
+    """
+    Load a single group from the store
+
+    Inputs:
+        store_folder (str): Folder of the store
+        group (str): "time", "stran", "stress" or "statev"
+        mmap (bool): Memory map the file instead of reading it into memory
+
+    Returns:
+        (columns, data) for the group
+    """
+    if group not in OUTPUT_COLUMN_GROUPS:
+        raise ValueError(f"{group} is not one of the output column groups. "
+                         f"The groups are: {list(OUTPUT_COLUMN_GROUPS.keys())}")
+
+    columns = read_store_columns(store_folder)[group]
+
+    mmap_mode = "r" if mmap else None
+    data = np.load(os.path.join(store_folder, f"{group}.npy"), mmap_mode = mmap_mode)
+
+    return columns, data
@@ -0,0 +1,188 @@
+"""
+Content-addressed cache of incremental driver runs.
+
+A run is identified by the hash of its input files (parameters.inp, initialconditions.inp
+and test.inp) and the hash of the driver executable. If a run with the same key has already
+finished, the stored output file can be copied back instead of running the driver again.
+"""
+import os
+import re
+import shutil
+import hashlib
+import threading
+
+# Input files written by DriverModelSetup that fully define a run
+DEFAULT_INPUT_FILE_NAMES = ("parameters.inp", "initialconditions.inp", "test.inp")
+
+# Keys are sha256 hex digests, anything else in the cache folder isn't an entry
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+def hash_file(file_path, chunk_size = 1024 * 1024):
+    """
+    Return the sha256 hex digest of a file
+    """
+    hasher = hashlib.sha256()
+
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+class RunCache:
+    """
+    Size-bounded LRU cache of driver output files stored on disk.
+
+    Each entry is a folder named after the run key that holds a copy of the output file.
+    The modification time of the cached file is used as the last access time.
+    """
+    # Name of the file stored inside of each entry
+    cached_output_name = "output.txt"
+
+    def __init__(self, cache_folder, max_size_bytes = 1024**3):
+        self.cache_folder   = cache_folder
+        self.max_size_bytes = max_size_bytes
+
+        os.makedirs(cache_folder, exist_ok = True)
+
+        # Hashes of the executables, keyed on (path, size, mtime) so they are only computed once
+        self._exe_hashes = {}
+
+        # Sweeps share the cache between worker threads
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return_string = (f"Cache folder: {self.cache_folder}\n"
+                         f"Number of entries: {len(self.get_keys())}\n"
+                         f"Size: {self.get_size()} / {self.max_size_bytes} bytes\n"
+                         )
+
+        return return_string
+
+    def _get_exe_hash(self, exe_path):
+        """
+        Return the hash of the driver executable, reusing it while the file is unchanged
+        """
+        stat = os.stat(exe_path)
+        exe_id = (os.path.abspath(exe_path), stat.st_size, stat.st_mtime_ns)
+
+        if exe_id not in self._exe_hashes:
+            self._exe_hashes[exe_id] = hash_file(exe_path)
+
+        return self._exe_hashes[exe_id]
+
+    def get_key(self, model_folder, exe_path, input_file_names = DEFAULT_INPUT_FILE_NAMES):
+        """
+        Return the key of a run from its input files and the driver executable
+        """
+        hasher = hashlib.sha256()
+
+        hasher.update(self._get_exe_hash(exe_path).encode())
+
+        for file_name in input_file_names:
+            # Include the name so the content of one file can't shift into the next
+            hasher.update(file_name.encode())
+            hasher.update(hash_file(os.path.join(model_folder, file_name)).encode())
+
+        return hasher.hexdigest()
+
+    @staticmethod
+    def is_key(name):
+        """
+        Check if a name has the format of a run key
+        """
+        return KEY_PATTERN.fullmatch(name) is not None
+
+    def _get_entry_path(self, key):
+        return os.path.join(self.cache_folder, key, self.cached_output_name)
+
+    def contains(self, key):
+        """
+        Check if a finished run is stored for the key
+        """
+        return os.path.isfile(self._get_entry_path(key))
+
+    def fetch(self, key, output_file_path):
+        """
+        Copy the cached output of a run to output_file_path
+
+        Returns:
+            True if the run was in the cache, False otherwise
+        """
+        entry_path = self._get_entry_path(key)
+
+        with self._lock:
+            if not os.path.isfile(entry_path):
+                return False
+
+            shutil.copyfile(entry_path, output_file_path)
+
+            # Mark the entry as recently used
+            os.utime(entry_path)
+
+        return True
+
+    def store(self, key, output_file_path):
+        """
+        Store the output of a finished run and evict old entries if the cache is too large
+        """
+        entry_folder = os.path.join(self.cache_folder, key)
+        entry_path   = self._get_entry_path(key)
+
+        os.makedirs(entry_folder, exist_ok = True)
+
+        # Copy to a temporary file first so a partially copied entry is never served
+        temp_path = entry_path + f".{threading.get_ident()}.tmp"
+        shutil.copyfile(output_file_path, temp_path)
+
+        with self._lock:
+            os.replace(temp_path, entry_path)
+            self._evict()
+
+    def get_keys(self):
+        """
+        Return the keys of all of the stored runs
+        """
+        return [key for key in os.listdir(self.cache_folder) if self.is_key(key) and self.contains(key)]
+
+    def get_size(self):
+        """
+        Return the total size of the stored output files in bytes
+        """
+        return sum(os.path.getsize(self._get_entry_path(key)) for key in self.get_keys())
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the cache fits in max_size_bytes
+        """
+        entries = []
+        for key in self.get_keys():
+            stat = os.stat(self._get_entry_path(key))
+            entries.append((stat.st_mtime_ns, stat.st_size, key))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        # Oldest entries first
+        for _, size, key in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+
+            shutil.rmtree(os.path.join(self.cache_folder, key), ignore_errors = True)
+            total_size -= size
+
+    def invalidate(self, key = None):
+        """
+        Remove a single entry from the cache, or every entry if no key is given
+        """
+        with self._lock:
+            if key is None:
+                # Only remove the entry folders, leave any other files in the folder alone
+                keys = [name for name in os.listdir(self.cache_folder)
+                        if self.is_key(name) and os.path.isdir(os.path.join(self.cache_folder, name))]
+            elif self.is_key(key):
+                keys = [key]
+            else:
+                raise ValueError(f"{key} is not a run key")
+
+            for key in keys:
+                shutil.rmtree(os.path.join(self.cache_folder, key), ignore_errors = True)
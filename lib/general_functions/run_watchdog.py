@@ -0,0 +1,131 @@
+"""
+Stop criteria checked on the output of a running incremental driver.
+
+Each criterion is given the new rows of the output file as they are written (see
+OutputTailer) and returns a reason string once the run should be stopped.
+"""
+from abc import ABC, abstractmethod
+import numpy as np
+
+from lib.general_functions.output_reader import get_group_columns
+from lib.general_functions.invariant_functions import calc_q_invariant_array
+
+class StopCriterion(ABC):
+    """
+    Base class for the stop criteria
+    """
+    @abstractmethod
+    def check(self, columns, block, elapsed_time):
+        """
+        Return a reason string if the run should be stopped, None otherwise
+
+        Inputs:
+            columns (list): Column names of the output file
+            block (array): Rows added since the last check, may be empty
+            elapsed_time (float): Seconds since the driver was started
+        """
+        pass
+
+    def reset(self):
+        """
+        Forget the state kept from a previous run, called before every watched run
+        """
+        pass
+
+class PeakQDrop(StopCriterion):
+    """
+    Stops the run once q has dropped by more than drop_fraction from its peak
+    """
+    def __init__(self, drop_fraction):
+        self.drop_fraction = drop_fraction
+        self.q_peak = 0.0
+
+    def reset(self):
+        self.q_peak = 0.0
+
+    def check(self, columns, block, elapsed_time):
+        if len(block) == 0:
+            return None
+
+        indices = [columns.index(name) for name in get_group_columns(columns, "stress")]
+        q = calc_q_invariant_array(block[:, indices])
+
+        # Compare every row against the peak up to that row
+        running_peak = np.maximum.accumulate(np.append(self.q_peak, q))[1:]
+        self.q_peak = running_peak[-1]
+
+        dropped = (running_peak > 0) & (q < (1.0 - self.drop_fraction) * running_peak)
+        if np.any(dropped):
+            return f"q dropped more than {self.drop_fraction:.0%} below its peak of {self.q_peak:g}"
+
+        return None
+
+class NonFiniteValues(StopCriterion):
+    """
+    Stops the run if a value is NaN or inf, or larger in magnitude than max_abs_value
+    """
+    def __init__(self, max_abs_value = None):
+        self.max_abs_value = max_abs_value
+
+    def check(self, columns, block, elapsed_time):
+        if len(block) == 0:
+            return None
+
+        if not np.all(np.isfinite(block)):
+            return "the output has NaN or inf values"
+
+        if self.max_abs_value is not None and np.max(np.abs(block)) > self.max_abs_value:
+            return f"the output has values larger than {self.max_abs_value:g}, the run is diverging"
+
+        return None
+
+class WallClockBudget(StopCriterion):
+    """
+    Stops the run after max_seconds of wall time
+    """
+    def __init__(self, max_seconds):
+        self.max_seconds = max_seconds
+
+    def check(self, columns, block, elapsed_time):
+        if elapsed_time > self.max_seconds:
+            return f"the wall clock budget of {self.max_seconds:g} s was exceeded"
+
+        return None
+
+class StateVarThreshold(StopCriterion):
+    """
+    Stops the run once an output column (usually a "statev(i)" column) crosses a threshold
+    """
+    def __init__(self, column_name, threshold, above = True):
+        self.column_name = column_name
+        self.threshold   = threshold
+        self.above       = above
+
+    def check(self, columns, block, elapsed_time):
+        if len(block) == 0:
+            return None
+
+        values = block[:, columns.index(self.column_name)]
+
+        if self.above:
+            crossed = np.any(values > self.threshold)
+        else:
+            crossed = np.any(values < self.threshold)
+
+        if crossed:
+            side = "above" if self.above else "below"
+            return f"{self.column_name} went {side} {self.threshold:g}"
+
+        return None
+
+def check_criteria(criteria, columns, block, elapsed_time):
+    """
+    Return the reason of the first criterion that fires, None if none of them do
+    """
+    for criterion in criteria:
+        reason = criterion.check(columns, block, elapsed_time)
+
+        if reason is not None:
+            return reason
+
+    return None
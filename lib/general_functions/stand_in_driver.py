@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the incremental driver executable, for testing and benchmarking pumat on
+machines without incrementalDriver.exe.
+
+Like the real driver it is run inside of the model folder. It reads parameters.inp,
+initialconditions.inp and test.inp and writes the output file named in test.inp with the
+same column layout. The material is always linear elastic with the first two properties
+taken as Young's modulus and Poisson's ratio, whatever the model name is. Predefined
+conditions on the loads are ignored.
+
+The output can be configured with command line options or environment variables:
+    --rows N        / PUMAT_STAND_IN_ROWS     Total number of increments, split evenly over the loads,
+                                              with a row written for every increment
+    --nstatev N     / PUMAT_STAND_IN_NSTATEV  Number of statev columns in the output
+    --latency S     / PUMAT_STAND_IN_LATENCY  Seconds to sleep per increment
+
+The script only uses the standard library so it starts quickly. It can also be imported,
+get_path_controls is shared with the in-process UMAT engine.
+"""
+import os
+import sys
+import time
+import argparse
+
+# Index of the stress and strain components in the Voigt vectors (11, 22, 33, 12, 13, 23)
+NTENS = 6
+
+def get_path_controls(test_name, value):
+    """
+    Return the linear constraints that define one increment of a popular path
+
+    Every constraint is (stress_coeffs, strain_coeffs, rhs) meaning
+        sum(stress_coeffs * dstress) + sum(strain_coeffs * dstrain) = rhs
+    There are always six constraints.
+
+    Inputs:
+        test_name (str): Name of the popular path, e.g. "TriaxialE1"
+        value (float): Stress or strain increment applied in this increment (0 for paths without one)
+    """
+    def unit(i, scale = 1.0):
+        coeffs = [0.0] * NTENS
+        coeffs[i] = scale
+        return coeffs
+
+    zero = [0.0] * NTENS
+
+    def stress(i, rhs = 0.0):
+        return (unit(i), zero, rhs)
+
+    def strain(i, rhs = 0.0):
+        return (zero, unit(i), rhs)
+
+    # Shear stresses stay constant in all of the paths with axial symmetry
+    constant_shear_stress = [stress(3), stress(4), stress(5)]
+    constant_volume = (zero, [1.0, 1.0, 1.0, 0.0, 0.0, 0.0], 0.0)
+    equal_lateral_stress = ([0.0, 1.0, -1.0, 0.0, 0.0, 0.0], zero, 0.0)
+
+    controls = {
+        "OedometricE1": [strain(0, value)] + [strain(i) for i in range(1, NTENS)],
+        "OedometricS1": [stress(0, value)] + [strain(i) for i in range(1, NTENS)],
+        "TriaxialE1"  : [strain(0, value), stress(1), stress(2)] + constant_shear_stress,
+        "TriaxialS1"  : [stress(0, value), stress(1), stress(2)] + constant_shear_stress,
+        # Roscoe's eps_q = 2/3 (eps_1 - eps_3)
+        "TriaxialUEq" : [(zero, [2.0 / 3.0, 0.0, -2.0 / 3.0, 0.0, 0.0, 0.0], value),
+                         constant_volume, equal_lateral_stress] + constant_shear_stress,
+        # q = sigma_1 - sigma_3
+        "TriaxialUq"  : [([1.0, 0.0, -1.0, 0.0, 0.0, 0.0], zero, value),
+                         constant_volume, equal_lateral_stress] + constant_shear_stress,
+        "PureRelaxation": [strain(i) for i in range(NTENS)],
+        "PureCreep"     : [stress(i) for i in range(NTENS)],
+        "UndrainedCreep": [([1.0, 0.0, -1.0, 0.0, 0.0, 0.0], zero, 0.0),
+                           constant_volume, equal_lateral_stress] + constant_shear_stress,
+    }
+
+    if test_name not in controls:
+        raise ValueError(f"{test_name} is not one of the supported tests. "
+                         f"The supported tests are: {list(controls.keys())}")
+
+    return controls[test_name]
+
+def get_elastic_stiffness(young_modulus, poisson_ratio):
+    """
+    Return the 6x6 linear elastic stiffness with engineering shear strains
+    """
+    lame = young_modulus * poisson_ratio / ((1.0 + poisson_ratio) * (1.0 - 2.0 * poisson_ratio))
+    shear_modulus = young_modulus / (2.0 * (1.0 + poisson_ratio))
+
+    stiffness = [[0.0] * NTENS for _ in range(NTENS)]
+    for i in range(3):
+        for j in range(3):
+            stiffness[i][j] = lame
+        stiffness[i][i] = lame + 2.0 * shear_modulus
+        stiffness[i + 3][i + 3] = shear_modulus
+
+    return stiffness
+
+def solve_linear_system(matrix, rhs):
+    """
+    Solve a small dense linear system with Gaussian elimination and partial pivoting
+    """
+    size = len(rhs)
+    augmented = [list(row) + [rhs[i]] for i, row in enumerate(matrix)]
+
+    for col in range(size):
+        pivot = max(range(col, size), key = lambda row: abs(augmented[row][col]))
+        if abs(augmented[pivot][col]) < 1e-300:
+            raise ValueError("The load path constraints are singular")
+
+        augmented[col], augmented[pivot] = augmented[pivot], augmented[col]
+
+        for row in range(col + 1, size):
+            factor = augmented[row][col] / augmented[col][col]
+            for k in range(col, size + 1):
+                augmented[row][k] -= factor * augmented[col][k]
+
+    solution = [0.0] * size
+    for row in reversed(range(size)):
+        total = augmented[row][size] - sum(augmented[row][k] * solution[k] for k in range(row + 1, size))
+        solution[row] = total / augmented[row][row]
+
+    return solution
+
+def get_elastic_increment(stiffness, controls):
+    """
+    Return (dstress, dstrain) of an elastic increment that satisfies the controls
+    """
+    # With dstress = D dstrain every constraint becomes (stress_coeffs D + strain_coeffs) dstrain = rhs
+    matrix, rhs = [], []
+    for stress_coeffs, strain_coeffs, value in controls:
+        row = [sum(stress_coeffs[k] * stiffness[k][j] for k in range(NTENS)) + strain_coeffs[j]
+               for j in range(NTENS)]
+        matrix.append(row)
+        rhs.append(value)
+
+    dstrain = solve_linear_system(matrix, rhs)
+    dstress = [sum(stiffness[i][j] * dstrain[j] for j in range(NTENS)) for i in range(NTENS)]
+
+    return dstress, dstrain
+
+def read_values(file_path):
+    """
+    Return the non-empty lines of an input file with the comments removed
+    """
+    values = []
+    with open(file_path, "r") as file:
+        for line in file:
+            value = line.split("#")[0].strip()
+            if value:
+                values.append(value)
+
+    return values
+
+def read_parameters(file_path = "parameters.inp"):
+    values = read_values(file_path)
+    num_props = int(values[1])
+
+    return values[0], [float(value) for value in values[2:2 + num_props]]
+
+def read_initial_conditions(file_path = "initialconditions.inp"):
+    values = read_values(file_path)
+
+    num_stress = int(values[0])
+    stress = [float(value) for value in values[1:1 + num_stress]]
+    stress = stress + [0.0] * (NTENS - len(stress))
+
+    num_statev = int(values[1 + num_stress])
+    statev = [float(value) for value in values[2 + num_stress:2 + num_stress + num_statev]]
+
+    return stress, statev
+
+def read_test(file_path = "test.inp"):
+    """
+    Return the output file name and a list of dicts with the loads
+    """
+    with open(file_path, "r") as file:
+        lines = [line.split("#")[0].strip() for line in file]
+
+    lines = [line for line in lines if line]
+    output_file_name = lines[0]
+
+    loads = []
+    i = 1
+    while i < len(lines) and lines[i].upper() != "*END":
+        # The name is the first word of the header, a predefined condition can follow it
+        test_name = lines[i][1:].split("?")[0].split()[0]
+
+        general_info, every = lines[i + 1].split(":")
+        ninc, maxiter, dtime = general_info.split()
+        i += 2
+
+        # Paths with a stress or strain increment have one more line
+        value = 0.0
+        if i < len(lines) and not lines[i].startswith("*"):
+            value = float(lines[i])
+            i += 1
+
+        loads.append({
+            "test_name": test_name,
+            "ninc": int(ninc),
+            "dtime": float(dtime),
+            "every": max(int(every), 1),
+            "value": value,
+        })
+
+    return output_file_name, loads
+
+def format_row(values):
+    return " ".join(f"{value:16.8E}" for value in values) + "\n"
+
+def run(num_rows = None, num_statev = None, latency = 0.0):
+    """
+    Run the stand-in driver in the current working directory
+    """
+    model_name, props = read_parameters()
+    stress, statev = read_initial_conditions()
+    output_file_name, loads = read_test()
+
+    stiffness = get_elastic_stiffness(props[0], props[1])
+
+    if num_statev is None:
+        # The driver always writes at least one state variable
+        num_statev = max(len(statev), 1)
+
+    statev = (statev + [0.0] * num_statev)[:num_statev]
+
+    if num_rows is not None and loads:
+        # Spread the increments over the loads and write every increment
+        for load in loads:
+            load["ninc"] = max(num_rows // len(loads), 1)
+            load["every"] = 1
+
+    columns = (["time(1)", "time(2)"] + [f"stran({i})" for i in range(1, NTENS + 1)] +
+               [f"stress({i})" for i in range(1, NTENS + 1)] +
+               [f"statev({i})" for i in range(1, num_statev + 1)])
+
+    strain = [0.0] * NTENS
+    total_time = 0.0
+
+    with open(output_file_name, "w") as file:
+        file.write(" ".join(f"{name:>16}" for name in columns) + "\n")
+        file.write(format_row([0.0, 0.0] + strain + stress + statev))
+
+        for load in loads:
+            step_time = 0.0
+            time_increment = load["dtime"] / load["ninc"]
+
+            controls = get_path_controls(load["test_name"], load["value"] / load["ninc"])
+            dstress, dstrain = get_elastic_increment(stiffness, controls)
+
+            for inc in range(1, load["ninc"] + 1):
+                stress = [s + ds for s, ds in zip(stress, dstress)]
+                strain = [e + de for e, de in zip(strain, dstrain)]
+                step_time  += time_increment
+                total_time += time_increment
+
+                if latency > 0:
+                    time.sleep(latency)
+
+                if inc % load["every"] == 0:
+                    file.write(format_row([step_time, total_time] + strain + stress + statev))
+
+                    # Make the rows visible to readers tailing the file
+                    if latency > 0:
+                        file.flush()
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Stand-in for the incremental driver")
+    parser.add_argument("--rows", type = int, default = os.environ.get("PUMAT_STAND_IN_ROWS"))
+    parser.add_argument("--nstatev", type = int, default = os.environ.get("PUMAT_STAND_IN_NSTATEV"))
+    parser.add_argument("--latency", type = float, default = float(os.environ.get("PUMAT_STAND_IN_LATENCY", 0.0)))
+    args = parser.parse_args(argv)
+
+    run(num_rows = args.rows, num_statev = args.nstatev, latency = args.latency)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
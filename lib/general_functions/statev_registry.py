@@ -0,0 +1,116 @@
+"""
+Registry of the state variables of each constitutive model.
+
+The output file only names the state variables statev(1..nstatev). A schema registered for
+a constitutive_model_name maps those indices to names, units and dtypes, so the results can
+be loaded and used by name:
+
+    register_statev_schema("MyModel", [
+        {"name": "void_ratio", "units": "-"},
+        {"name": "p_c", "units": "kPa"},
+        {"name": "plastic_flag", "index": 5, "dtype": "int64"},
+    ])
+
+    results.store_all(state_vars = ["void_ratio", "p_c"])
+
+Entries without an index take the one after the previous entry, starting at 1.
+"""
+import numpy as np
+
+class StateVariable:
+    """
+    Name, units and dtype of one state variable
+    """
+    def __init__(self, name, index, units = "-", dtype = np.float64, description = ""):
+        self.name        = name
+        self.index       = index          # 1 based, like the statev(i) columns
+        self.units       = units
+        self.dtype       = np.dtype(dtype)
+        self.description = description
+
+    def __repr__(self):
+        return f"StateVariable({self.name!r}, index = {self.index}, units = {self.units!r}, dtype = {self.dtype})"
+
+    @property
+    def column(self):
+        """
+        Name of the column in the output file
+        """
+        return f"statev({self.index})"
+
+# Schemas keyed on the constitutive model name
+_STATEV_SCHEMAS = {}
+
+def register_statev_schema(constitutive_model_name, state_vars, overwrite = False):
+    """
+    Register the state variables of a constitutive model
+
+    Inputs:
+        constitutive_model_name (str): Name of the model, as given to DriverModel
+        state_vars (list): Names, dicts with a "name" and optional "index", "units", "dtype" and
+                           "description", or StateVariable objects
+        overwrite (bool): Replace a schema that is already registered
+
+    Returns:
+        The list of StateVariable objects
+    """
+    if constitutive_model_name in _STATEV_SCHEMAS and not overwrite:
+        raise ValueError(f"A statev schema is already registered for {constitutive_model_name}, "
+                         f"pass overwrite = True to replace it")
+
+    schema = []
+    next_index = 1
+
+    for state_var in state_vars:
+        if isinstance(state_var, str):
+            state_var = StateVariable(state_var, next_index)
+        elif isinstance(state_var, dict):
+            state_var = StateVariable(**{"index": next_index, **state_var})
+
+        schema.append(state_var)
+        next_index = state_var.index + 1
+
+    names   = [state_var.name for state_var in schema]
+    indices = [state_var.index for state_var in schema]
+
+    if len(set(names)) != len(names) or len(set(indices)) != len(indices):
+        raise ValueError(f"The state variable names and indices of {constitutive_model_name} must be unique")
+
+    _STATEV_SCHEMAS[constitutive_model_name] = schema
+
+    return schema
+
+def unregister_statev_schema(constitutive_model_name):
+    _STATEV_SCHEMAS.pop(constitutive_model_name, None)
+
+def get_registered_models():
+    return list(_STATEV_SCHEMAS.keys())
+
+def get_statev_schema(constitutive_model_name):
+    """
+    Return the StateVariable objects of a model
+    """
+    if constitutive_model_name not in _STATEV_SCHEMAS:
+        raise KeyError(f"No statev schema is registered for {constitutive_model_name}. "
+                       f"The registered models are: {get_registered_models()}")
+
+    return _STATEV_SCHEMAS[constitutive_model_name]
+
+def get_state_variables(constitutive_model_name, names):
+    """
+    Return the StateVariable objects of some of the state variables of a model, in the order of names
+    """
+    schema = {state_var.name: state_var for state_var in get_statev_schema(constitutive_model_name)}
+
+    missing = [name for name in names if name not in schema]
+    if missing:
+        raise KeyError(f"{missing} are not state variables of {constitutive_model_name}. "
+                       f"The state variables are: {list(schema.keys())}")
+
+    return [schema[name] for name in names]
+
+def get_statev_columns(constitutive_model_name, names):
+    """
+    Return the output file columns ("statev(i)") of named state variables
+    """
+    return [state_var.column for state_var in get_state_variables(constitutive_model_name, names)]
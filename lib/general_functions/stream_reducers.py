@@ -0,0 +1,196 @@
+"""
+Streaming reducers that summarize an output file one block of rows at a time.
+
+Each reducer is updated with (columns, block) pairs from iter_output_chunks and keeps
+a bounded amount of memory no matter how many rows the run has.
+"""
+import numpy as np
+
+from lib.general_functions.output_reader import (
+    read_output_header, get_group_columns, get_column_indices, iter_output_chunks
+)
+from lib.general_functions.invariant_functions import calc_stress_invariants_array
+
+class StreamReducer:
+    """
+    Base class for the streaming reducers
+    """
+    # Key used for the reducer in the reduce_output_file results
+    name = "reducer"
+
+    def update(self, columns, block):
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+class RunningExtrema(StreamReducer):
+    """
+    Running minimum and maximum of each column
+    """
+    name = "extrema"
+
+    def __init__(self):
+        self.columns = None
+        self.min = None
+        self.max = None
+
+    def update(self, columns, block):
+        if len(block) == 0:
+            return
+
+        # A diverged run writes NaN columns, np.nanmin/np.nanmax warn on those while
+        # fmin/fmax skip the NaN values and give NaN for an all-NaN column
+        block_min = np.fmin.reduce(block, axis = 0)
+        block_max = np.fmax.reduce(block, axis = 0)
+
+        if self.min is None:
+            self.columns = list(columns)
+            self.min, self.max = block_min, block_max
+        else:
+            self.min = np.fmin(self.min, block_min)
+            self.max = np.fmax(self.max, block_max)
+
+    def result(self):
+        if self.columns is None:
+            return {}
+
+        return {name: (self.min[i], self.max[i]) for i, name in enumerate(self.columns)}
+
+class StressInvariantExtrema(StreamReducer):
+    """
+    Running min/max of the mean stress and q, and the row where q peaks
+    """
+    name = "stress_invariants"
+
+    def __init__(self):
+        self.p_min = np.inf
+        self.p_max = -np.inf
+        self.q_min = np.inf
+        self.q_max = -np.inf
+        self.q_peak_row = None
+
+        # Number of rows seen so far, used to give the peak row in the whole file
+        self.num_rows = 0
+
+    def update(self, columns, block):
+        indices = [columns.index(name) for name in get_group_columns(columns, "stress")]
+
+        if len(block) > 0:
+            mean_stress, q = calc_stress_invariants_array(block[:, indices])
+
+            # A diverged run writes blocks of NaN, the nan functions raise or warn on those
+            if not np.isnan(mean_stress).all():
+                self.p_min = min(self.p_min, np.nanmin(mean_stress))
+                self.p_max = max(self.p_max, np.nanmax(mean_stress))
+
+            if not np.isnan(q).all():
+                self.q_min = min(self.q_min, np.nanmin(q))
+
+                block_peak = np.nanargmax(q)
+                if q[block_peak] > self.q_max:
+                    self.q_max = q[block_peak]
+                    self.q_peak_row = self.num_rows + block_peak
+
+        self.num_rows += len(block)
+
+    def result(self):
+        return {
+            "p_min": self.p_min,
+            "p_max": self.p_max,
+            "q_min": self.q_min,
+            "q_peak": self.q_max,
+            "q_peak_row": self.q_peak_row,
+        }
+
+class FinalState(StreamReducer):
+    """
+    Keeps the last row of the file
+    """
+    name = "final_state"
+
+    def __init__(self):
+        self.columns = None
+        self.last_row = None
+
+    def update(self, columns, block):
+        if len(block) > 0:
+            self.columns = list(columns)
+            self.last_row = block[-1].copy()
+
+    def result(self):
+        if self.columns is None:
+            return {}
+
+        return dict(zip(self.columns, self.last_row))
+
+class DecimatedTrace(StreamReducer):
+    """
+    Keeps every n-th row of the file, plus the last row
+
+    At most max_rows rows are kept. Once the trace is full every is doubled and every
+    other kept row is dropped, so long runs end up with a coarser trace instead of a larger one.
+    """
+    name = "trace"
+
+    def __init__(self, every = 100, max_rows = 10_000):
+        self.every = every
+        self.max_rows = max(max_rows, 2)
+        self.columns = None
+        self.trace = None
+        self.last_row = None
+        self.num_rows = 0
+
+    def update(self, columns, block):
+        if len(block) == 0:
+            return
+
+        self.columns = list(columns)
+
+        # Offset of the first kept row in this block so the spacing carries over between blocks
+        first = (-self.num_rows) % self.every
+        kept = block[first::self.every]
+
+        if self.trace is None:
+            self.trace = kept.copy()
+        else:
+            self.trace = np.concatenate([self.trace, kept])
+
+        # The kept rows are at the multiples of every, every other one is at the multiples of 2 * every
+        while len(self.trace) > self.max_rows:
+            self.trace = self.trace[::2].copy()
+            self.every *= 2
+
+        self.last_row = block[-1].copy()
+        self.num_rows += len(block)
+
+    def result(self):
+        if self.columns is None:
+            return np.empty((0, 0)), []
+
+        trace = self.trace
+
+        # Make sure the trace ends at the last row
+        if (self.num_rows - 1) % self.every != 0:
+            trace = np.vstack([trace, self.last_row])
+
+        return trace, self.columns
+
+def reduce_output_file(file_path, reducers, chunk_size = 100_000, usecols = None):
+    """
+    Run a list of reducers over the output file in a single pass
+
+    Returns:
+        dict with the result of each reducer keyed on its name
+    """
+    columns = read_output_header(file_path)
+
+    if usecols is not None:
+        # Keep the names of the selected columns in file order
+        columns = [columns[i] for i in get_column_indices(columns, usecols)]
+
+    for block in iter_output_chunks(file_path, chunk_size = chunk_size, usecols = usecols):
+        for reducer in reducers:
+            reducer.update(columns, block)
+
+    return {reducer.name: reducer.result() for reducer in reducers}
@@ -0,0 +1,365 @@
+"""
+Runs a compiled UMAT in-process, without the incremental driver or any input and output files.
+
+The UMAT shared library is loaded with ctypes and called with the standard Abaqus
+argument list. Every increment is solved for the strain increment that satisfies the
+mixed stress/strain control of the popular path, with Newton iterations on the
+tangent stiffness (DDSDDE) returned by the UMAT. Many material points can be driven
+through the same load list at once, the control equations of all of them are solved
+together with NumPy.
+
+The rows produced have the same columns as the output file of the incremental driver.
+
+Reference UMATs to test with are in reference_umat/: linear_elastic_umat.f90 and the
+nonlinear hypoelastic_umat.f90.
+"""
+import ctypes
+import numpy as np
+
+from lib.general_functions.stand_in_driver import get_path_controls
+
+NDI   = 3
+NSHR  = 3
+NTENS = NDI + NSHR
+
+# Load parameters that hold the applied stress or strain, the other paths have none
+CONTROL_PARAMS = ["ddstran_1", "ddstress_1", "ddstran_2", "ddstress_2"]
+
+c_double_p = ctypes.POINTER(ctypes.c_double)
+c_int_p    = ctypes.POINTER(ctypes.c_int)
+
+def get_control_matrices(test_name, value):
+    """
+    Return (stress_matrix, strain_matrix, rhs) of one increment of a popular path
+
+    The increment has to satisfy stress_matrix @ dstress + strain_matrix @ dstrain = rhs
+    """
+    controls = get_path_controls(test_name, value)
+
+    stress_matrix = np.array([control[0] for control in controls], dtype = float)
+    strain_matrix = np.array([control[1] for control in controls], dtype = float)
+    rhs           = np.array([control[2] for control in controls], dtype = float)
+
+    return stress_matrix, strain_matrix, rhs
+
+def get_output_columns(num_statev):
+    return (["time(1)", "time(2)"] + [f"stran({i})" for i in range(1, NTENS + 1)] +
+            [f"stress({i})" for i in range(1, NTENS + 1)] +
+            [f"statev({i})" for i in range(1, num_statev + 1)])
+
+def _as_point_array(values, num_points = None):
+    """
+    Convert a dict, a 1d array or a 2d array of point values into a 2d float array
+    """
+    if isinstance(values, dict):
+        values = list(values.values())
+
+    if len(values) > 0 and isinstance(values[0], dict):
+        values = [list(point.values()) for point in values]
+
+    array = np.atleast_2d(np.asarray(values, dtype = np.float64))
+
+    if num_points is not None and array.shape[0] == 1 and num_points > 1:
+        array = np.repeat(array, num_points, axis = 0)
+
+    return array
+
+class UmatEngine:
+    """
+    Drives a UMAT shared library in-process
+    """
+    def __init__(self, library_path, symbol_name = None, model_name = "UMAT",
+                 max_iter = 25, tol = 1e-10, atol = 1e-12):
+        """
+        Inputs:
+            library_path (str): Path to the compiled UMAT (.so or .dll)
+            symbol_name (str): Name of the UMAT symbol. Defaults to the first of "umat_",
+                               "umat" and "UMAT" found in the library
+            model_name (str): Passed to the UMAT as CMNAME
+            max_iter (int): Max number of Newton iterations per increment
+            tol (float): Relative tolerance of the control equations. The strain part of a control
+                         equation is scaled by the strain increment, the stress part by the
+                         larger of the stress and the stress increment
+            atol (float): Absolute tolerance of the control equations, used when everything is zero
+        """
+        # Store the library and the settings of the solver
+        self.library_path = library_path
+        self.model_name   = model_name
+        self.max_iter     = max_iter
+        self.tol          = tol
+        self.atol         = atol
+
+        self.library = ctypes.CDLL(library_path)
+
+        if symbol_name is None:
+            for name in ["umat_", "umat", "UMAT"]:
+                if hasattr(self.library, name):
+                    symbol_name = name
+                    break
+            else:
+                raise ValueError(f"No UMAT symbol found in {library_path}, pass the symbol_name")
+
+        self.symbol_name = symbol_name
+        self.umat = getattr(self.library, symbol_name)
+        self.umat.restype = None
+
+        # CMNAME is a fixed length Fortran string, its length is passed as a hidden argument at the end
+        self.cmname = ctypes.create_string_buffer(model_name.encode().ljust(80), 80)
+
+    def __str__(self):
+        return_string = (f"UMAT library: {self.library_path}\n"
+                         f"Symbol name: {self.symbol_name}\n"
+                         f"Model name: {self.model_name}\n"
+                         )
+
+        return return_string
+
+    def _make_call(self, num_props, num_statev):
+        """
+        Return (buffers, call) where call() runs the UMAT on the arrays in buffers
+
+        All of the arguments are allocated once and reused by every call
+        """
+        buffers = {
+            "stress" : np.zeros(NTENS),
+            "statev" : np.zeros(max(num_statev, 1)),
+            # Fortran reads DDSDDE(NTENS, NTENS) column by column
+            "ddsdde" : np.zeros((NTENS, NTENS), order = "F"),
+            "stran"  : np.zeros(NTENS),
+            "dstran" : np.zeros(NTENS),
+            "time"   : np.zeros(2),
+            "props"  : np.zeros(max(num_props, 1)),
+        }
+
+        scalars = {name: ctypes.c_double(0.0) for name in
+                   ["sse", "spd", "scd", "rpl", "drpldt", "dtime", "temp", "dtemp", "pnewdt", "celent"]}
+        integers = {name: ctypes.c_int(value) for name, value in
+                    [("ndi", NDI), ("nshr", NSHR), ("ntens", NTENS), ("nstatv", num_statev),
+                     ("nprops", num_props), ("noel", 1), ("npt", 1), ("layer", 1), ("kspt", 1),
+                     ("kstep", 1), ("kinc", 1)]}
+
+        # Arguments the driver doesn't use
+        unused = {
+            "ddsddt": np.zeros(NTENS), "drplde": np.zeros(NTENS), "predef": np.zeros(1),
+            "dpred" : np.zeros(1), "coords": np.zeros(3), "drot": np.eye(3, order = "F"),
+            "dfgrd0": np.eye(3, order = "F"), "dfgrd1": np.eye(3, order = "F"),
+        }
+
+        def ptr(array):
+            return array.ctypes.data_as(c_double_p)
+
+        def ref(scalar):
+            return ctypes.byref(scalar)
+
+        args = (
+            ptr(buffers["stress"]), ptr(buffers["statev"]), ptr(buffers["ddsdde"]),
+            ref(scalars["sse"]), ref(scalars["spd"]), ref(scalars["scd"]), ref(scalars["rpl"]),
+            ptr(unused["ddsddt"]), ptr(unused["drplde"]), ref(scalars["drpldt"]),
+            ptr(buffers["stran"]), ptr(buffers["dstran"]), ptr(buffers["time"]), ref(scalars["dtime"]),
+            ref(scalars["temp"]), ref(scalars["dtemp"]), ptr(unused["predef"]), ptr(unused["dpred"]),
+            self.cmname,
+            ref(integers["ndi"]), ref(integers["nshr"]), ref(integers["ntens"]), ref(integers["nstatv"]),
+            ptr(buffers["props"]), ref(integers["nprops"]), ptr(unused["coords"]), ptr(unused["drot"]),
+            ref(scalars["pnewdt"]), ref(scalars["celent"]), ptr(unused["dfgrd0"]), ptr(unused["dfgrd1"]),
+            ref(integers["noel"]), ref(integers["npt"]), ref(integers["layer"]), ref(integers["kspt"]),
+            ref(integers["kstep"]), ref(integers["kinc"]),
+            ctypes.c_size_t(80),
+        )
+
+        # Keep the unused arrays alive as long as the pointers to them
+        buffers["_unused"] = unused
+
+        def call(point_sse, dtime, kstep, kinc):
+            scalars["sse"].value    = point_sse
+            scalars["dtime"].value  = dtime
+            scalars["pnewdt"].value = 1.0
+            integers["kstep"].value = kstep
+            integers["kinc"].value  = kinc
+
+            self.umat(*args)
+
+            return scalars["sse"].value
+
+        return buffers, call
+
+    def run_batch(self, props, init_stress, init_statev, load_list):
+        """
+        Drive a batch of material points through the same load list
+
+        Inputs:
+            props: Properties of each point, a dict (like write_parameters_file), a list of dicts or a
+                   (num_points, num_props) array. A single set of properties is shared by every point
+            init_stress: Initial stress, a list of six values or a (num_points, 6) array
+            init_statev: Initial state variables, a dict (like write_initial_conditions_file), a list of dicts
+                         or a (num_points, num_statev) array
+            load_list: PopularPath or list of PopularPath objects
+
+        Returns:
+            (columns, data) with the output file columns and a (num_points, num_rows, num_columns) array
+        """
+        if not isinstance(load_list, list):
+            load_list = [load_list]
+
+        props       = _as_point_array(props)
+        init_stress = _as_point_array(init_stress)
+        init_statev = _as_point_array(init_statev)
+
+        num_points = max(len(props), len(init_stress), len(init_statev))
+        props       = _as_point_array(props, num_points)
+        init_stress = _as_point_array(init_stress, num_points)
+        init_statev = _as_point_array(init_statev, num_points)
+
+        num_props  = props.shape[1]
+        num_statev = init_statev.shape[1]
+
+        # The driver always writes at least one state variable
+        num_statev_columns = max(num_statev, 1)
+        columns = get_output_columns(num_statev_columns)
+
+        # First row is the initial state, then one row every "every" increments
+        num_rows = 1 + sum(load.input_params_dict["ninc"] // max(load.input_params_dict["every"], 1)
+                           for load in load_list)
+        data = np.zeros((num_points, num_rows, len(columns)))
+
+        time_slice   = slice(0, 2)
+        stran_slice  = slice(2, 2 + NTENS)
+        stress_slice = slice(2 + NTENS, 2 + 2 * NTENS)
+        statev_slice = slice(2 + 2 * NTENS, 2 + 2 * NTENS + num_statev)
+
+        # Current state of every point
+        stress = init_stress[:, :NTENS].copy()
+        if stress.shape[1] < NTENS:
+            stress = np.hstack([stress, np.zeros((num_points, NTENS - stress.shape[1]))])
+        strain = np.zeros((num_points, NTENS))
+        statev = init_statev.copy()
+        sse    = np.zeros(num_points)
+
+        data[:, 0, stress_slice] = stress
+        data[:, 0, statev_slice] = statev
+
+        buffers, call = self._make_call(num_props, num_statev)
+
+        def evaluate(point, dstran, step_time, total_time, dtime, kstep, kinc):
+            """
+            Return (new stress, new statev, new sse, ddsdde) of one point for a trial strain increment
+            """
+            buffers["stress"][:] = stress[point]
+            buffers["statev"][:num_statev] = statev[point]
+            buffers["stran"][:]  = strain[point]
+            buffers["dstran"][:] = dstran
+            buffers["props"][:num_props] = props[point]
+            buffers["time"][:]   = (step_time, total_time)
+
+            new_sse = call(sse[point], dtime, kstep, kinc)
+
+            return (buffers["stress"].copy(), buffers["statev"][:num_statev].copy(),
+                    new_sse, np.array(buffers["ddsdde"]))
+
+        # Tangent of each point at the initial state, used to predict the first increment.
+        # Rate dependent UMATs divide by dtime, so use the time increment of the first load
+        first_dtime = 0.0
+        if load_list:
+            first_dtime = load_list[0].input_params_dict["dtime"] / load_list[0].input_params_dict["ninc"]
+
+        tangents = np.zeros((num_points, NTENS, NTENS))
+        for point in range(num_points):
+            tangents[point] = evaluate(point, np.zeros(NTENS), 0.0, 0.0, first_dtime, 1, 1)[3]
+
+        row = 1
+        total_time = 0.0
+
+        for kstep, load in enumerate(load_list, start = 1):
+            params = load.input_params_dict
+
+            if load.predifined_cond is not None:
+                raise ValueError("Predefined conditions are not supported by the UmatEngine")
+
+            ninc  = params["ninc"]
+            every = max(params["every"], 1)
+            dtime = params["dtime"] / ninc
+
+            value = sum(params.get(name, 0.0) for name in CONTROL_PARAMS) / ninc
+            stress_matrix, strain_matrix, rhs = get_control_matrices(load.test_name, value)
+
+            # Size of the stress and strain parts of each control equation, used to scale its tolerance
+            stress_weights = np.sum(np.abs(stress_matrix), axis = 1)
+            strain_weights = np.sum(np.abs(strain_matrix), axis = 1)
+
+            step_time = 0.0
+
+            for kinc in range(1, ninc + 1):
+                # Predict the strain increment with the last tangent of each point
+                jacobians = stress_matrix @ tangents + strain_matrix
+                dstran = np.linalg.solve(jacobians, np.broadcast_to(rhs, (num_points, NTENS))[..., None])[..., 0]
+
+                new_stress = np.zeros((num_points, NTENS))
+                new_statev = np.zeros((num_points, num_statev))
+                new_sse    = np.zeros(num_points)
+
+                active = np.arange(num_points)
+
+                for _ in range(self.max_iter):
+                    for point in active:
+                        (new_stress[point], new_statev[point],
+                         new_sse[point], tangents[point]) = evaluate(point, dstran[point], step_time,
+                                                                     total_time, dtime, kstep, kinc)
+
+                    # Residual of the control equations of the points that are still iterating
+                    residuals = ((new_stress[active] - stress[active]) @ stress_matrix.T +
+                                 dstran[active] @ strain_matrix.T - rhs)
+
+                    # Tolerance of each control equation of each point, a stress equation can't
+                    # be solved more precisely than the round off of the stress itself
+                    stress_scale = np.maximum(np.max(np.abs(stress[active]), axis = 1),
+                                              np.max(np.abs(new_stress[active] - stress[active]), axis = 1))
+                    strain_scale = np.max(np.abs(dstran[active]), axis = 1)
+
+                    tol = self.tol * (stress_scale[:, None] * stress_weights +
+                                      strain_scale[:, None] * strain_weights) + self.atol
+
+                    # A NaN residual would never compare as larger than the tolerance
+                    diverged = ~np.all(np.isfinite(residuals), axis = 1)
+                    if np.any(diverged):
+                        raise RuntimeError(f"The UMAT returned NaN or inf stresses at the points {active[diverged].tolist()} "
+                                           f"in increment {kinc} of load {kstep} ({load.test_name})")
+
+                    unconverged = ~np.all(np.abs(residuals) <= tol, axis = 1)
+                    if not np.any(unconverged):
+                        break
+
+                    active, residuals = active[unconverged], residuals[unconverged]
+
+                    # Newton step on the points that haven't converged
+                    jacobians = stress_matrix @ tangents[active] + strain_matrix
+                    dstran[active] -= np.linalg.solve(jacobians, residuals[..., None])[..., 0]
+                else:
+                    raise RuntimeError(f"The UMAT did not converge in {self.max_iter} iterations "
+                                       f"in increment {kinc} of load {kstep} ({load.test_name})")
+
+                stress = new_stress
+                statev = new_statev
+                sse    = new_sse
+                strain = strain + dstran
+
+                step_time  += dtime
+                total_time += dtime
+
+                if kinc % every == 0:
+                    data[:, row, time_slice]   = (step_time, total_time)
+                    data[:, row, stran_slice]  = strain
+                    data[:, row, stress_slice] = stress
+                    data[:, row, statev_slice] = statev
+                    row += 1
+
+        return columns, data
+
+    def run(self, props, init_stress, init_statev, load_list):
+        """
+        Drive a single material point through the load list
+
+        Returns:
+            (columns, data) with the output file columns and a (num_rows, num_columns) array
+        """
+        columns, data = self.run_batch(props, init_stress, init_statev, load_list)
+
+        return columns, data[0]
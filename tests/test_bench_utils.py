@@ -0,0 +1,29 @@
+from benchmarks.bench_utils import BenchmarkReport
+
+
+def make_report(wall_times):
+    report = BenchmarkReport()
+    for name, wall_time in wall_times.items():
+        report.add("parsing", name, 1000, wall_time)
+
+    return report
+
+def test_compare_flags_only_regressions_over_the_threshold():
+    baseline = make_report({"fast": 1.0, "slow": 1.0, "new": 1.0}).records
+    baseline = [record for record in baseline if record["name"] != "new"]
+
+    report = make_report({"fast": 1.2, "slow": 2.0, "new": 100.0})
+
+    regressions = report.compare(baseline, threshold = 0.5)
+
+    # Benchmarks without a baseline are skipped
+    assert len(regressions) == 1
+    assert regressions[0].startswith("parsing slow")
+
+def test_compare_ignores_noise_below_the_min_slow_down():
+    baseline = make_report({"tiny": 1e-5}).records
+
+    report = make_report({"tiny": 1e-4})
+
+    assert report.compare(baseline, threshold = 0.5, min_slow_down = 0.005) == []
+    assert len(report.compare(baseline, threshold = 0.5, min_slow_down = 0.0)) == 1
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Setup import DriverModelSetup, make_run_id
+from lib.Driver_Classes.Mod_Driver_Sweep import DriverModelSweep
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+PROPERTIES = {"E": 1000.0, "nu": 0.3}
+INITIAL_CONDITIONS = ([-10.0] * 3 + [0.0] * 3, {})
+
+def make_load(ddstran_1 = -0.01):
+    return PopularPath("TriaxialE1", {"ninc": 10, "maxiter": 99, "dtime": 1.0, "every": 1, "ddstran_1": ddstran_1})
+
+@pytest.fixture
+def setup(tmp_path):
+    return DriverModelSetup(str(tmp_path), "LE", "output.txt")
+
+def test_make_run_id_is_stable():
+    run_id = make_run_id("params", "ics", "test")
+
+    assert run_id == make_run_id("params", "ics", "test")
+    assert len(run_id) == 12
+
+    # The text can't shift from one file into the next
+    assert run_id != make_run_id("param", "sics", "test")
+    assert run_id != make_run_id("params", "ics", "test2")
+
+def test_run_ids_depend_on_every_deck(setup):
+    run_id = setup.get_run_id(PROPERTIES, INITIAL_CONDITIONS, [make_load()])
+
+    # Equal loads that are different objects give the same ID
+    assert run_id == setup.get_run_id(dict(PROPERTIES), INITIAL_CONDITIONS, [make_load()])
+
+    assert run_id != setup.get_run_id({"E": 2000.0, "nu": 0.3}, INITIAL_CONDITIONS, [make_load()])
+    assert run_id != setup.get_run_id(PROPERTIES, ([-20.0] * 3 + [0.0] * 3, {}), [make_load()])
+    assert run_id != setup.get_run_id(PROPERTIES, INITIAL_CONDITIONS, [make_load(-0.02)])
+
+def test_grid_sweep(setup):
+    sweep_df = setup.build_sweep(PROPERTIES, grid = {"E": [1000.0, 2000.0], "nu": [0.2, 0.3, 0.4]})
+
+    assert len(sweep_df) == 6
+    assert sweep_df.index.name == "run_id" and sweep_df.index.is_unique
+    assert set(map(tuple, sweep_df.to_numpy())) == {(E, nu) for E in (1000.0, 2000.0) for nu in (0.2, 0.3, 0.4)}
+
+def test_lhs_sweep_is_inside_of_the_bounds_and_stratified(setup):
+    bounds = {"E": (500.0, 3000.0), "nu": (0.1, 0.45)}
+
+    sweep_df = setup.build_sweep(PROPERTIES, lhs = bounds, num_samples = 20, seed = 1)
+
+    assert len(sweep_df) == 20
+    for name, (low, high) in bounds.items():
+        values = sweep_df[name].to_numpy()
+        assert np.all((values >= low) & (values <= high))
+
+        # One sample in each of the 20 strata
+        strata = np.floor((values - low) / (high - low) * 20).astype(int)
+        assert sorted(strata) == list(range(20))
+
+    # The seed makes the sweep repeatable, run IDs included
+    pd.testing.assert_frame_equal(sweep_df, setup.build_sweep(PROPERTIES, lhs = bounds, num_samples = 20, seed = 1))
+
+    with pytest.raises(ValueError):
+        setup.build_sweep(PROPERTIES, lhs = bounds)
+
+def test_duplicate_samples_are_dropped(setup, capsys):
+    sweep_df = setup.build_sweep(PROPERTIES, samples = {"E": [1000.0, 2000.0, 1000.0], "nu": [0.3, 0.3, 0.3]},
+                                 initial_conditions = INITIAL_CONDITIONS, load_list = [make_load()])
+
+    assert sweep_df["E"].tolist() == [1000.0, 2000.0]
+    assert "Dropped 1 duplicate samples" in capsys.readouterr().out
+
+    with pytest.raises(ValueError):
+        setup.build_sweep(PROPERTIES, samples = {"E": [1000.0], "nu": [0.3, 0.2]})
+
+    with pytest.raises(ValueError):
+        setup.build_sweep(PROPERTIES, grid = {"G": [1.0]})
+
+def test_run_sweep(tmp_path, setup):
+    sweep = DriverModelSweep(str(tmp_path / "sweep"), "LE", STAND_IN_DRIVER_PATH, max_workers = 1)
+
+    sweep_df = setup.build_sweep(PROPERTIES, grid = {"E": [1000.0, 2000.0], "nu": [0.3]},
+                                 initial_conditions = INITIAL_CONDITIONS, load_list = [make_load()])
+
+    results_df = sweep.run_sweep(PROPERTIES, sweep_df, INITIAL_CONDITIONS, [make_load()])
+
+    # Indexed by the swept values, the run IDs match the ones of build_sweep
+    assert isinstance(results_df.index, pd.MultiIndex)
+    assert list(results_df.index.names) == ["E", "nu"]
+    assert results_df["run_id"].tolist() == sweep_df.index.tolist()
+
+    for run_id in results_df["run_id"]:
+        assert os.path.isdir(sweep.get_run_folder(run_id))
+
+    # q = E * axial strain in a drained triaxial test of the linear elastic stand-in
+    stiff = results_df.loc[(2000.0, 0.3), "results"]
+    soft  = results_df.loc[(1000.0, 0.3), "results"]
+    assert stiff.get_q_invariant().iloc[-1] == pytest.approx(2.0 * soft.get_q_invariant().iloc[-1])
+
+    with pytest.raises(ValueError):
+        sweep.run_sweep(PROPERTIES, pd.concat([sweep_df, sweep_df]), INITIAL_CONDITIONS, [make_load()])
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Calibration import DriverModelCalibration
+from lib.Driver_Classes.Mod_Driver_Sweep import DriverModelSweep
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+
+TARGET = {"E": 1500.0, "nu": 0.32}
+BOUNDS = {"E": (500.0, 3000.0), "nu": (0.1, 0.45)}
+
+class QuadraticCalibration(DriverModelCalibration):
+    """
+    Replaces the driver runs with a quadratic misfit that has its minimum at TARGET
+    """
+    def evaluate_batch(self, param_sets):
+        misfits = []
+        for params in param_sets:
+            params = np.clip(np.asarray(params, dtype = float), self.lower, self.upper)
+            scaled = (params - np.array(list(TARGET.values()))) / (self.upper - self.lower)
+
+            misfit = float(np.sum(scaled**2 * [1.0, 4.0]))
+            self.evaluations[self._get_key(params)] = misfit
+            misfits.append(misfit)
+
+        return np.array(misfits)
+
+def make_calibration(tmp_path, cls = QuadraticCalibration, **kwargs):
+    sweep = DriverModelSweep(str(tmp_path), "LE", "driver", max_workers = 1)
+    lab_data = pd.DataFrame({"axial_strain": [0.0, 0.01], "q": [0.0, 15.0]})
+
+    return cls(sweep, {"E": 1000.0, "nu": 0.3}, BOUNDS, ([0.0] * 6, {}), [], lab_data, **kwargs)
+
+def test_nelder_mead_converges_on_a_quadratic(tmp_path):
+    calibration = make_calibration(tmp_path)
+
+    best = calibration.nelder_mead(max_iter = 200, tol = 1e-12)
+
+    assert best["params"]["E"] == pytest.approx(TARGET["E"], rel = 1e-3)
+    assert best["params"]["nu"] == pytest.approx(TARGET["nu"], rel = 1e-3)
+    assert best["misfit"] < 1e-8
+    assert best["num_evaluations"] == len(calibration.evaluations)
+
+def test_nelder_mead_from_a_corner(tmp_path):
+    calibration = make_calibration(tmp_path)
+
+    best = calibration.nelder_mead(x0 = {"E": 3000.0, "nu": 0.1}, max_iter = 200, tol = 1e-12)
+
+    assert best["params"]["E"] == pytest.approx(TARGET["E"], rel = 1e-3)
+    assert best["params"]["nu"] == pytest.approx(TARGET["nu"], rel = 1e-3)
+
+def test_evolution_strategy_approaches_the_minimum(tmp_path):
+    calibration = make_calibration(tmp_path)
+
+    best = calibration.evolution_strategy(population_size = 8, max_iter = 60, seed = 0)
+
+    assert best["params"]["E"] == pytest.approx(TARGET["E"], rel = 1e-2)
+    assert best["params"]["nu"] == pytest.approx(TARGET["nu"], rel = 1e-2)
+
+def test_default_weights_are_not_shared(tmp_path):
+    first = make_calibration(tmp_path, cls = DriverModelCalibration)
+    first.weights["q"] = 10.0
+
+    second = make_calibration(tmp_path, cls = DriverModelCalibration)
+
+    assert second.weights == {"q": 1.0, "vol_strain": 1.0}
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+def test_calibrates_young_modulus_through_the_sweep(tmp_path):
+    initial_conditions = ([-100.0] * 3 + [0.0] * 3, {})
+    load_list = [PopularPath("TriaxialE1", {"ninc": 20, "maxiter": 99, "dtime": 1.0, "every": 1,
+                                            "ddstran_1": -0.01})]
+
+    # Lab data from a run with the target properties, compression positive
+    sweep = DriverModelSweep(str(tmp_path / "lab"), "LE", STAND_IN_DRIVER_PATH, max_workers = 1)
+    lab_results = sweep.run([(TARGET, initial_conditions, load_list)])[0]
+
+    lab_data = pd.DataFrame({
+        "axial_strain": -lab_results.strain_df["stran(1)"].to_numpy(),
+        "q"           : lab_results.get_q_invariant().to_numpy(),
+        "vol_strain"  : lab_results.get_volumetric_strain(sign = -1.0).to_numpy(),
+    })
+
+    sweep = DriverModelSweep(str(tmp_path / "calibration"), "LE", STAND_IN_DRIVER_PATH, max_workers = 1)
+    calibration = DriverModelCalibration(sweep, {"E": 1000.0, "nu": TARGET["nu"]}, {"E": BOUNDS["E"]},
+                                         initial_conditions, load_list, lab_data)
+
+    # The misfit of the real runs, failed runs are inf
+    assert calibration.get_misfit(lab_results) == pytest.approx(0.0, abs = 1e-6)
+    assert calibration.get_misfit(None) == np.inf
+    assert calibration.evaluate_batch([[1000.0]])[0] > 0.1
+
+    best = calibration.nelder_mead(max_iter = 30, tol = 1e-6)
+
+    assert best["params"]["E"] == pytest.approx(TARGET["E"], rel = 1e-2)
+    assert best["misfit"] < 1e-2
+
+    # Every evaluated point ran in the sweep folder
+    assert len(os.listdir(tmp_path / "calibration")) == best["num_evaluations"]
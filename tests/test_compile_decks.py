@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Setup import DriverModelSetup
+from lib.Driver_Classes.Mod_Driver_Sweep import DriverModelSweep
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+INPUT_FILE_NAMES = ["parameters.inp", "initialconditions.inp", "test.inp"]
+
+def make_load(ddstran_1 = -0.01):
+    return PopularPath("TriaxialE1", {"ninc": 10, "maxiter": 99, "dtime": 1.0, "every": 1, "ddstran_1": ddstran_1})
+
+def make_variants(num_variants):
+    load_list = [make_load()]
+
+    return [({"E": 1000.0 + i, "nu": 0.3}, ([-10.0] * 3 + [0.0] * 3, {"a": float(i)}), load_list)
+            for i in range(num_variants)]
+
+def read_files(folder_path):
+    files = {}
+    for file_name in INPUT_FILE_NAMES:
+        with open(os.path.join(folder_path, file_name)) as file:
+            files[file_name] = file.read()
+
+    return files
+
+def test_decks_match_the_single_file_writers(tmp_path):
+    setup = DriverModelSetup(str(tmp_path), "LE", "output.txt")
+    variants = make_variants(2)
+
+    setup.compile_decks(variants, [str(tmp_path / "bulk_0"), str(tmp_path / "bulk_1")])
+
+    for i, (properties, (init_stress, init_state_vars), load_list) in enumerate(variants):
+        single = DriverModelSetup(str(tmp_path / f"single_{i}"), "LE", "output.txt")
+        os.makedirs(single.folder_path, exist_ok = True)
+
+        single.write_parameters_file(properties)
+        single.write_initial_conditions_file(init_stress, init_state_vars)
+        single.store_loads(load_list)
+        single.write_loads()
+
+        assert read_files(tmp_path / f"bulk_{i}") == read_files(tmp_path / f"single_{i}")
+
+def test_unchanged_files_are_skipped(tmp_path):
+    setup = DriverModelSetup(str(tmp_path), "LE", "output.txt")
+    variants = make_variants(3)
+    folder_paths = [str(tmp_path / f"run_{i}") for i in range(3)]
+
+    assert setup.compile_decks(variants, folder_paths) == (9, 0)
+
+    params_path = os.path.join(folder_paths[0], "parameters.inp")
+    mtime = os.stat(params_path).st_mtime_ns
+
+    assert setup.compile_decks(variants, folder_paths) == (0, 9)
+    assert os.stat(params_path).st_mtime_ns == mtime
+
+    # Only the changed file of the changed variant is rewritten
+    variants[1] = ({"E": 5000.0, "nu": 0.3},) + variants[1][1:]
+    assert setup.compile_decks(variants, folder_paths) == (1, 8)
+
+def test_failed_variants_are_listed(tmp_path, capsys):
+    setup = DriverModelSetup(str(tmp_path), "LE", "output.txt")
+    variants = make_variants(3)
+
+    # No loads, and a folder that can't be made because a file is in the way
+    variants[0] = variants[0][:2] + ([],)
+    (tmp_path / "blocked").write_text("")
+    folder_paths = [str(tmp_path / "run_0"), str(tmp_path / "blocked"), str(tmp_path / "run_2")]
+
+    with pytest.raises(Warning):
+        setup.compile_decks(variants, folder_paths)
+
+    failed = []
+    assert setup.compile_decks(variants, folder_paths, failed = failed) == (3, 0)
+
+    assert failed == [0, 1]
+    assert read_files(tmp_path / "run_2")
+    assert "failed" in capsys.readouterr().out
+
+def test_sweep_skips_variants_whose_decks_fail(tmp_path):
+    sweep = DriverModelSweep(str(tmp_path), "LE", STAND_IN_DRIVER_PATH, max_workers = 1)
+    variants = make_variants(3)
+    variants[1] = variants[1][:2] + ([],)
+
+    results = sweep.run(variants)
+
+    assert results[1] is None
+    assert not os.path.isdir(sweep.get_run_folder(1))
+    assert len(results[0].output_df) == 11 and len(results[2].output_df) == 11
@@ -0,0 +1,81 @@
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Results import DriverModelResults
+from lib.general_functions.downsampling import downsample, lttb_indices, minmax_indices
+
+COLUMNS = (["time(1)", "time(2)"] + [f"stran({i})" for i in range(1, 7)]
+           + [f"stress({i})" for i in range(1, 7)] + ["statev(1)"])
+
+@pytest.fixture
+def curve():
+    rng = np.random.default_rng(0)
+
+    x = np.cumsum(rng.normal(size = 10_000))
+    y = np.sin(np.linspace(0, 20, 10_000)) + 0.1 * rng.normal(size = 10_000)
+
+    # A sharp spike that a downsampled plot must not lose
+    y[4321] = 5.0
+
+    return x, y
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("max_points", [3, 5, 6, 7, 100, 400, 1001])
+def test_output_size_is_at_most_max_points(curve, method, max_points):
+    x, y = curve
+
+    x_kept, y_kept = downsample(x, y, max_points, method = method)
+
+    assert len(x_kept) <= max_points
+    assert len(x_kept) == len(y_kept)
+
+@pytest.mark.parametrize("indices_function", [lttb_indices, minmax_indices])
+def test_endpoints_and_spike_are_kept(curve, indices_function):
+    x, y = curve
+
+    indices = indices_function(x, y, 400)
+
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert 4321 in indices
+    assert np.all(np.diff(indices) > 0)
+
+def test_minmax_keeps_the_extrema(curve):
+    x, y = curve
+
+    indices = minmax_indices(x, y, 400)
+
+    for values in (x, y):
+        assert np.argmin(values) in indices
+        assert np.argmax(values) in indices
+
+def test_short_curves_are_not_downsampled(curve):
+    x, y = curve
+
+    np.testing.assert_array_equal(downsample(x[:50], y[:50], 400)[0], x[:50])
+    np.testing.assert_array_equal(downsample(x, y, None, method = "minmax")[1], y)
+
+    with pytest.raises(ValueError):
+        downsample(x, y, 400, method = "every_other")
+
+def test_quick_plot_overlay():
+    import matplotlib.pyplot as plt
+
+    results_list = []
+    for scale in (1.0, 2.0):
+        data = np.zeros((5000, len(COLUMNS)))
+        data[:, COLUMNS.index("stran(1)")] = -scale * np.linspace(0, 0.01, 5000)
+        data[:, COLUMNS.index("stress(1)")] = -scale * np.linspace(0, 100.0, 5000)
+        results_list.append(DriverModelResults.from_array(COLUMNS, data))
+
+    fig, axs = plt.subplots()
+    lines = DriverModelResults.quick_plot_overlay(results_list, kind = "q_axial", axs = axs, max_points = 200)
+
+    segments = lines.get_segments()
+    assert len(segments) == 2
+    assert all(len(segment) <= 200 for segment in segments)
+    assert axs.get_xlabel() == r"$\epsilon_{a}$"
+
+    plt.close(fig)
@@ -0,0 +1,49 @@
+import os
+import stat
+import time
+
+import pytest
+
+from lib.general_functions.executing_runs import launch_driver
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason = "the test drivers are shell scripts")
+
+def make_driver(folder, script):
+    exe_path = folder / "driver.sh"
+    exe_path.write_text("#!/bin/sh\n" + script)
+    exe_path.chmod(exe_path.stat().st_mode | stat.S_IXUSR)
+
+    return str(exe_path)
+
+def test_exit_code_and_output_files(tmp_path):
+    exe_path = make_driver(tmp_path, "pwd\necho 'bad input' >&2\nexit 4\n")
+
+    result = launch_driver(str(tmp_path), exe_path)
+
+    assert result.returncode == 4
+    assert not result.succeeded and not result.timed_out
+    assert 0.0 < result.spawn_time <= result.wall_time
+
+    # The driver runs in the model folder, stdout and stderr go to their own files
+    with open(result.stdout_path) as file:
+        assert os.path.samefile(file.read().strip(), tmp_path)
+
+    with open(result.stderr_path) as file:
+        assert file.read() == "bad input\n"
+
+def test_successful_run(tmp_path):
+    result = launch_driver(str(tmp_path), make_driver(tmp_path, "exit 0\n"))
+
+    assert result.returncode == 0
+    assert result.succeeded
+
+def test_timeout_kills_the_driver(tmp_path):
+    exe_path = make_driver(tmp_path, "exec sleep 30\n")
+
+    start_time = time.perf_counter()
+    result = launch_driver(str(tmp_path), exe_path, timeout = 0.5)
+
+    assert time.perf_counter() - start_time < 10.0
+    assert result.timed_out
+    assert not result.succeeded
+    assert result.returncode != 0
@@ -0,0 +1,20 @@
+import time
+from lib.general_functions.instrumentation import RunMetrics
+
+
+def test_nested_phases_dont_overlap():
+    metrics = RunMetrics(run_name = "nested")
+
+    start_time = time.perf_counter()
+    with metrics.phase("plotting"):
+        time.sleep(0.02)
+        with metrics.phase("invariants"):
+            time.sleep(0.05)
+    total_time = time.perf_counter() - start_time
+
+    totals = metrics.get_phase_totals()
+
+    # The invariants are only counted once, so the phases add up to the total time
+    assert totals["invariants"]["wall_time_s"] >= 0.05
+    assert totals["plotting"]["wall_time_s"] < 0.05
+    assert sum(phase["wall_time_s"] for phase in totals.values()) <= total_time
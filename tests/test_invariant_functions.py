@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.general_functions.invariant_functions import (
+    calc_mean_stress, calc_q_invariant, calc_dev_strain_invariant, calc_volumetric_strain_invariant,
+    calc_mean_stress_array, calc_q_invariant_array, calc_dev_strain_invariant_array,
+    calc_volumetric_strain_invariant_array, calc_stress_invariants_array, calc_strain_invariants_array,
+    voigt_to_tensor_array, calc_j2_array, calc_j3_array, calc_lode_angle_array, calc_principal_values_array,
+    calc_principal_stresses_array, calc_principal_strains_array
+)
+
+@pytest.fixture
+def block():
+    rng = np.random.default_rng(0)
+
+    return rng.normal(scale = 100.0, size = (50, 6))
+
+@pytest.mark.parametrize("row_function, array_function", [
+    (calc_mean_stress, calc_mean_stress_array),
+    (calc_q_invariant, calc_q_invariant_array),
+    (calc_dev_strain_invariant, calc_dev_strain_invariant_array),
+    (calc_volumetric_strain_invariant, calc_volumetric_strain_invariant_array),
+])
+def test_array_functions_match_the_row_functions(block, row_function, array_function):
+    expected = np.array([row_function(row) for row in block])
+
+    np.testing.assert_allclose(array_function(block), expected)
+    np.testing.assert_allclose(array_function(pd.DataFrame(block)), expected)
+
+def test_stress_invariants_in_one_pass(block):
+    mean_stress, q = calc_stress_invariants_array(block)
+
+    np.testing.assert_allclose(mean_stress, [calc_mean_stress(row) for row in block])
+    np.testing.assert_allclose(q, [calc_q_invariant(row) for row in block])
+
+def test_strain_invariants_in_one_pass(block):
+    eps_p, eps_q = calc_strain_invariants_array(block)
+
+    np.testing.assert_allclose(eps_p, [calc_volumetric_strain_invariant(row) for row in block])
+    np.testing.assert_allclose(eps_q, [calc_dev_strain_invariant(row) for row in block])
+
+def test_single_row_is_a_block_with_one_row(block):
+    np.testing.assert_allclose(calc_q_invariant_array(block[0]), [calc_q_invariant(block[0])])
+
+    with pytest.raises(ValueError):
+        calc_q_invariant_array(block[:, :5])
+
+@pytest.fixture
+def eigenvalues(block):
+    # Reference principal values of the symmetric tensors, largest first
+    return np.linalg.eigvalsh(voigt_to_tensor_array(block))[:, ::-1]
+
+def test_voigt_to_tensor_array(block):
+    tensors = voigt_to_tensor_array(block)
+
+    assert tensors.shape == (50, 3, 3)
+    np.testing.assert_array_equal(tensors, np.swapaxes(tensors, 1, 2))
+    np.testing.assert_array_equal(tensors[:, [0, 1, 2], [0, 1, 2]], block[:, 0:3])
+    np.testing.assert_array_equal(tensors[:, [0, 0, 1], [1, 2, 2]], block[:, 3:6])
+
+    # Engineering shear strains are halved on the off-diagonal
+    np.testing.assert_array_equal(voigt_to_tensor_array(block, is_strain = True)[:, 0, 1], 0.5 * block[:, 3])
+
+    # Stacked ensembles keep their leading shape
+    assert voigt_to_tensor_array(block.reshape(5, 10, 6)).shape == (5, 10, 3, 3)
+
+def test_principal_values_match_eigvalsh(block, eigenvalues):
+    np.testing.assert_allclose(calc_principal_values_array(block), eigenvalues)
+    np.testing.assert_allclose(calc_principal_stresses_array(block), eigenvalues)
+    np.testing.assert_allclose(calc_principal_values_array(block.reshape(5, 10, 6)), eigenvalues.reshape(5, 10, 3))
+
+    strain_eigenvalues = np.linalg.eigvalsh(voigt_to_tensor_array(block, is_strain = True))[:, ::-1]
+    np.testing.assert_allclose(calc_principal_strains_array(block), strain_eigenvalues)
+
+def test_principal_values_of_non_finite_rows_are_nan(block):
+    block = block.copy()
+    block[3, 4] = np.nan
+
+    principal = calc_principal_values_array(block)
+
+    assert np.all(np.isnan(principal[3]))
+    assert np.all(np.isfinite(np.delete(principal, 3, axis = 0)))
+
+def test_j2_and_j3_match_the_principal_deviators(block, eigenvalues):
+    deviators = eigenvalues - eigenvalues.mean(axis = 1)[:, np.newaxis]
+
+    np.testing.assert_allclose(calc_j2_array(block), 0.5 * np.sum(deviators**2, axis = 1))
+    np.testing.assert_allclose(calc_j3_array(block), np.prod(deviators, axis = 1), rtol = 1e-7, atol = 1e-6)
+
+    # q = sqrt(3 J2)
+    np.testing.assert_allclose(np.sqrt(3.0 * calc_j2_array(block)), calc_q_invariant_array(block))
+
+def test_lode_angle_matches_the_principal_deviators(block, eigenvalues):
+    deviators = eigenvalues - eigenvalues.mean(axis = 1)[:, np.newaxis]
+    j2 = 0.5 * np.sum(deviators**2, axis = 1)
+
+    cos_3theta = np.clip(1.5 * np.sqrt(3.0) * np.prod(deviators, axis = 1) / j2**1.5, -1.0, 1.0)
+
+    lode_angle = calc_lode_angle_array(block)
+
+    np.testing.assert_allclose(lode_angle, np.arccos(cos_3theta) / 3.0, atol = 1e-9)
+    assert np.all((lode_angle >= 0.0) & (lode_angle <= np.pi / 3.0))
+
+@pytest.mark.parametrize("stress, expected", [
+    # Tension positive, triaxial compression has the axial stress most compressive
+    ([-200.0, -100.0, -100.0, 0.0, 0.0, 0.0], np.pi / 3.0),
+    ([-100.0, -200.0, -200.0, 0.0, 0.0, 0.0], 0.0),
+    # Pure shear sits in the middle
+    ([100.0, 0.0, -100.0, 0.0, 0.0, 0.0], np.pi / 6.0),
+])
+def test_lode_angle_of_triaxial_tests(stress, expected):
+    np.testing.assert_allclose(calc_lode_angle_array(np.array([stress])), [expected], atol = 1e-7)
+
+def test_lode_angle_without_deviator_is_nan():
+    assert np.isnan(calc_lode_angle_array(np.array([[-100.0] * 3 + [0.0] * 3]))[0])
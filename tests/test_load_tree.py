@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Load_Tree import DriverModelLoadTree
+from lib.Driver_Classes.Mod_Driver_Sweep import DriverModelSweep
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+PROPERTIES = {"E": 1000.0, "nu": 0.3}
+
+def make_load(test_name, **params):
+    return PopularPath(test_name, {"ninc": 10, "maxiter": 99, "dtime": 1.0, "every": 1, **params})
+
+@pytest.fixture
+def load_paths():
+    consolidation = make_load("OedometricS1", ddstress_1 = -100.0)
+    unloading     = make_load("OedometricS1", ddstress_1 = 40.0)
+
+    return {
+        "drained"    : [consolidation, unloading, make_load("TriaxialE1", ddstran_1 = -0.01)],
+        # Equal loads that are different objects are still shared
+        "undrained"  : [make_load("OedometricS1", ddstress_1 = -100.0), unloading,
+                        make_load("TriaxialUEq", ddstran_2 = 0.01)],
+        "prefix_only": [consolidation, unloading],
+        "other"      : [make_load("TriaxialS1", ddstress_1 = -20.0)],
+    }
+
+@pytest.mark.parametrize("init_state_vars", [{}, {"a": 1.0, "b": 2.0}])
+def test_stitched_load_paths_match_flat_runs(tmp_path, load_paths, init_state_vars):
+    initial_conditions = ([-10.0, -10.0, -10.0, 0.0, 0.0, 0.0], init_state_vars)
+
+    tree = DriverModelLoadTree(str(tmp_path / "tree"), "LE", STAND_IN_DRIVER_PATH, max_workers = 1)
+    stitched = tree.run(PROPERTIES, initial_conditions, load_paths)
+
+    sweep = DriverModelSweep(str(tmp_path / "flat"), "LE", STAND_IN_DRIVER_PATH, max_workers = 1)
+    flat = sweep.run([(PROPERTIES, initial_conditions, load_list) for load_list in load_paths.values()])
+
+    # The shared prefix runs once, the shearing stages once each
+    assert len(tree.get_nodes()) == 4
+    assert tree.count_increments() == (50, 90)
+
+    for (name, results), flat_results in zip(stitched.items(), flat):
+        assert list(results.output_df.columns) == list(flat_results.output_df.columns), name
+
+        # The restart state is read from the output file, so it carries its precision
+        np.testing.assert_allclose(results.output_df.to_numpy(), flat_results.output_df.to_numpy(),
+                                   rtol = 1e-7, atol = 1e-6, err_msg = name)
+
+def test_children_keep_the_number_of_state_variables(tmp_path, load_paths):
+    tree = DriverModelLoadTree(str(tmp_path), "LE", STAND_IN_DRIVER_PATH, max_workers = 1)
+    tree.run(PROPERTIES, ([-10.0] * 3 + [0.0] * 3, {}), load_paths)
+
+    child = next(node for node in tree.get_nodes() if node.parent is not None and node.parent.loads)
+
+    with open(os.path.join(tree.sweep.get_run_folder(child.node_id), "initialconditions.inp")) as file:
+        lines = file.read().splitlines()
+
+    assert lines[7].split()[0] == "0"
+
+def test_prefix_must_write_its_last_increment(tmp_path):
+    prefix = PopularPath("OedometricS1", {"ninc": 10, "maxiter": 99, "dtime": 1.0, "every": 3,
+                                          "ddstress_1": -100.0})
+
+    tree = DriverModelLoadTree(str(tmp_path), "LE", STAND_IN_DRIVER_PATH)
+
+    with pytest.raises(ValueError):
+        tree.run(PROPERTIES, ([-10.0] * 3 + [0.0] * 3, {}),
+                 {"a": [prefix, make_load("TriaxialE1", ddstran_1 = 0.01)],
+                  "b": [prefix, make_load("TriaxialE1", ddstran_1 = -0.01)]})
@@ -0,0 +1,83 @@
+import numpy as np
+
+from lib.general_functions.output_reader import read_output_file, iter_output_chunks, parse_rows
+from lib.general_functions.output_tailer import OutputTailer
+
+COLUMNS = (["time(1)", "time(2)"] + [f"stran({i})" for i in range(1, 7)] +
+           [f"stress({i})" for i in range(1, 7)] + ["statev(1)"])
+
+def format_row(values):
+    return " ".join(f"{value:16.8E}" for value in values) + "\n"
+
+def write_output_file(file_path, rows, partial = ""):
+    with open(file_path, "w") as file:
+        file.write(" ".join(f"{name:>16}" for name in COLUMNS) + "\n")
+        file.writelines(format_row(row) for row in rows)
+        file.write(partial)
+
+def make_rows(num_rows):
+    return np.arange(num_rows * len(COLUMNS), dtype = float).reshape(num_rows, len(COLUMNS))
+
+def test_read_output_file_skips_a_partial_last_row(tmp_path):
+    file_path = str(tmp_path / "output.txt")
+    rows = make_rows(5)
+    write_output_file(file_path, rows, partial = "   1.00000000E+00   2.0000")
+
+    columns, data = read_output_file(file_path)
+
+    assert columns == COLUMNS
+    assert data.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(data, rows)
+
+def test_read_output_file_usecols(tmp_path):
+    file_path = str(tmp_path / "output.txt")
+    rows = make_rows(3)
+    write_output_file(file_path, rows)
+
+    columns, data = read_output_file(file_path, usecols = ["stress", "statev(1)"], dtype = np.float32)
+
+    assert columns == [f"stress({i})" for i in range(1, 7)] + ["statev(1)"]
+    assert data.dtype == np.float32
+    np.testing.assert_allclose(data, rows[:, 8:])
+
+def test_iter_output_chunks_matches_read_output_file(tmp_path):
+    file_path = str(tmp_path / "output.txt")
+    write_output_file(file_path, make_rows(10), partial = "1.0 2.0")
+
+    blocks = list(iter_output_chunks(file_path, chunk_size = 3))
+
+    assert [len(block) for block in blocks] == [3, 3, 3, 1]
+    np.testing.assert_allclose(np.concatenate(blocks), read_output_file(file_path)[1])
+
+def test_fortran_overflow_fields_are_nan(tmp_path):
+    file_path = str(tmp_path / "output.txt")
+    bad_row = " ".join(["0.1234567-100", "****"] + ["1.0"] * (len(COLUMNS) - 2)) + "\n"
+    write_output_file(file_path, make_rows(2), partial = bad_row)
+
+    _, data = read_output_file(file_path)
+
+    assert data.shape == (3, len(COLUMNS))
+    assert np.isnan(data[2, :2]).all()
+    np.testing.assert_allclose(data[2, 2:], 1.0)
+
+    assert np.isnan(parse_rows(["1.0 2.0\n"], len(COLUMNS))).all()
+
+def test_tailer_reads_only_complete_rows(tmp_path):
+    file_path = str(tmp_path / "output.txt")
+    rows = make_rows(4)
+    tailer = OutputTailer(file_path)
+
+    assert tailer.read_new_rows().shape == (0, 0)
+
+    row_text = format_row(rows[3])
+    write_output_file(file_path, rows[:3], partial = row_text[:20])
+    np.testing.assert_allclose(tailer.read_new_rows(), rows[:3])
+
+    with open(file_path, "a") as file:
+        file.write(row_text[20:] + "****" + " 1.0" * (len(COLUMNS) - 1) + "\n")
+
+    block = tailer.read_new_rows()
+
+    np.testing.assert_allclose(block[0], rows[3])
+    assert np.isnan(block[1, 0])
+    assert tailer.num_rows == 5
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Model import DriverModel
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+from lib.general_functions.output_tailer import OutputTailer
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+def make_load(ninc, every):
+    return PopularPath("TriaxialE1", {"ninc": ninc, "maxiter": 99, "dtime": 1.0, "every": every, "ddstran_1": -0.01})
+
+def test_partial_trailing_row_is_kept_for_the_next_read(tmp_path):
+    file_path = tmp_path / "output.txt"
+    tailer = OutputTailer(str(file_path), [make_load(10, 5)])
+
+    # No file yet
+    assert tailer.read_new_rows().shape == (0, 0)
+
+    with open(file_path, "w") as file:
+        file.write("time(1) time(2) stress(1)\n")
+        file.write("0.0 0.0 -100.0\n")
+        file.write("0.5 0.5 -1")
+
+    block = tailer.read_new_rows()
+    assert tailer.columns == ["time(1)", "time(2)", "stress(1)"]
+    np.testing.assert_array_equal(block, [[0.0, 0.0, -100.0]])
+
+    # The rest of the row and a new partial one
+    with open(file_path, "a") as file:
+        file.write("10.0\n1.0 1.0")
+
+    np.testing.assert_array_equal(tailer.read_new_rows(), [[0.5, 0.5, -110.0]])
+
+    with open(file_path, "a") as file:
+        file.write(" -120.0\n")
+
+    np.testing.assert_array_equal(tailer.read_new_rows(), [[1.0, 1.0, -120.0]])
+    assert tailer.read_new_rows().shape == (0, 3)
+    assert tailer.num_rows == 3
+
+@pytest.mark.parametrize("num_rows, completed, fraction", [
+    (0, 0, 0.0),
+    # The first row is the initial state
+    (1, 0, 0.0),
+    # The first load writes every 5 increments, the second every 2
+    (2, 5, 0.25),
+    (3, 10, 0.5),
+    (4, 12, 0.6),
+    (8, 20, 1.0),
+])
+def test_progress_from_ninc_and_every(num_rows, completed, fraction):
+    tailer = OutputTailer("output.txt", [make_load(10, 5), make_load(10, 2)])
+    tailer.num_rows = num_rows
+
+    progress = tailer.get_progress()
+
+    assert progress["planned_increments"] == 20
+    assert progress["completed_increments"] == completed
+    assert progress["fraction"] == pytest.approx(fraction)
+
+def test_progress_without_loads():
+    assert OutputTailer("output.txt").get_progress()["fraction"] is None
+
+def test_run_model_live_yields_every_row(tmp_path, monkeypatch):
+    monkeypatch.setenv("PUMAT_STAND_IN_LATENCY", "0.01")
+
+    model = DriverModel(str(tmp_path), "LE", STAND_IN_DRIVER_PATH, use_batch_file = False)
+    model.setup.write_parameters_file({"E": 1000.0, "nu": 0.3})
+    model.setup.write_initial_conditions_file([0.0] * 6, {})
+    model.setup.store_loads([make_load(40, 2)])
+    model.setup.write_loads()
+
+    blocks = list(model.run_model_live(poll_interval = 0.05))
+
+    assert len(blocks) > 1
+    assert sum(len(new_rows_df) for new_rows_df, _ in blocks) == 21
+
+    last_progress = blocks[-1][1]
+    assert last_progress["completed_increments"] == 40
+    assert last_progress["fraction"] == 1.0
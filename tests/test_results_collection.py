@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Results import DriverModelResults
+from lib.Driver_Classes.Mod_Driver_Results_Collection import DriverModelResultsCollection
+
+COLUMNS = (["time(1)", "time(2)"] + [f"stran({i})" for i in range(1, 7)]
+           + [f"stress({i})" for i in range(1, 7)] + ["statev(1)"])
+
+
+def make_results(num_rows, scale):
+    data = scale * np.arange(1, num_rows * len(COLUMNS) + 1, dtype = float).reshape(num_rows, len(COLUMNS))
+
+    return DriverModelResults.from_array(COLUMNS, data)
+
+def make_collection(run_ids = None):
+    results_list = [make_results(3, 1.0), make_results(0, 1.0), make_results(5, 2.0)]
+
+    return DriverModelResultsCollection(results_list, run_ids = run_ids)
+
+def test_get_final_is_nan_for_empty_runs():
+    collection = make_collection()
+
+    final = collection.get_final("stress(1)")
+
+    assert final[0] == collection.stress[0, 2, 0]
+    assert np.isnan(final[1])
+    assert final[2] == collection.stress[2, 4, 0]
+
+    np.testing.assert_array_equal(collection.get_run_stats("stress(1)")["final"].to_numpy(), final)
+
+def test_select_ids_and_positions():
+    # Integer run IDs that are also valid positions
+    collection = make_collection(run_ids = [2, 0, 1])
+
+    by_id = collection.select_ids([2])
+    by_position = collection.select_positions([2])
+
+    assert by_id.run_ids == [2]
+    assert by_position.run_ids == [1]
+    np.testing.assert_array_equal(by_id.stress[0], collection.stress[0, :3])
+
+    assert collection.select_positions([True, False, True]).run_ids == [2, 1]
+
+    with pytest.raises(KeyError):
+        collection.select_ids([5])
+
+@pytest.mark.filterwarnings("error")
+def test_get_peak_is_nan_for_empty_runs():
+    collection = make_collection()
+
+    peaks, steps = collection.get_peak("stress(1)")
+
+    assert steps[0] == 2 and steps[2] == 4
+    assert peaks[2] == collection.stress[2, 4, 0]
+    assert np.isnan(peaks[1]) and np.isnan(steps[1])
+
+    # Only empty runs
+    peaks, steps = collection.select_positions([1]).get_peak("stress(1)")
+    assert np.isnan(peaks[0]) and np.isnan(steps[0])
+
+@pytest.mark.filterwarnings("error")
+def test_step_stats_of_all_nan_steps():
+    # Both runs have a NaN stress at step 1
+    results_list = []
+    for scale in (1.0, 2.0):
+        data = make_results(3, scale).output_df.to_numpy().copy()
+        data[1, COLUMNS.index("stress(1)")] = np.nan
+        results_list.append(DriverModelResults.from_array(COLUMNS, data))
+
+    stats = DriverModelResultsCollection(results_list).get_step_stats("stress(1)")
+
+    assert stats.loc[1, "count"] == 0
+    assert stats.loc[1, ["mean", "std", "min", "max", "p50"]].isna().all()
+    assert stats.loc[2, "count"] == 2
@@ -0,0 +1,87 @@
+import os
+import stat
+
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Model import DriverModel
+from lib.general_functions.run_cache import RunCache
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+def make_model(folder_path, exe_path, run_cache, young_modulus = 1000.0):
+    os.makedirs(folder_path, exist_ok = True)
+
+    model = DriverModel(str(folder_path), "LE", exe_path, run_cache = run_cache, use_batch_file = False)
+
+    model.setup.write_parameters_file({"E": young_modulus, "nu": 0.3})
+    model.setup.write_initial_conditions_file([-10.0] * 3 + [0.0] * 3, {})
+    model.setup.store_loads(PopularPath("TriaxialE1", {"ninc": 10, "maxiter": 99, "dtime": 1.0,
+                                                       "every": 1, "ddstran_1": -0.01}))
+    model.setup.write_loads()
+
+    return model
+
+def read_output(model):
+    with open(os.path.join(model.folder_path, model.output_file_name)) as file:
+        return file.read()
+
+def test_hit_copies_the_cached_output(tmp_path, capsys):
+    run_cache = RunCache(str(tmp_path / "cache"))
+
+    first = make_model(tmp_path / "first", STAND_IN_DRIVER_PATH, run_cache)
+    first_result = first.run_model()
+    assert first_result.succeeded and not first_result.from_cache
+    assert len(run_cache.get_keys()) == 1
+
+    # Same input files and executable in another folder
+    second = make_model(tmp_path / "second", STAND_IN_DRIVER_PATH, run_cache)
+    second_result = second.run_model()
+    assert second_result.succeeded and second_result.from_cache
+    assert "Loaded cached output" in capsys.readouterr().out
+
+    assert read_output(second) == read_output(first)
+
+def test_miss_runs_the_driver(tmp_path):
+    run_cache = RunCache(str(tmp_path / "cache"))
+
+    first = make_model(tmp_path / "first", STAND_IN_DRIVER_PATH, run_cache)
+    first.run_model()
+
+    # Changed properties give another key
+    second = make_model(tmp_path / "second", STAND_IN_DRIVER_PATH, run_cache, young_modulus = 2000.0)
+    assert not second.run_model().from_cache
+
+    assert len(run_cache.get_keys()) == 2
+    assert read_output(second) != read_output(first)
+
+@pytest.mark.skipif(os.name == "nt", reason = "the failing driver is a shell script")
+def test_failed_run_is_not_cached(tmp_path):
+    run_cache = RunCache(str(tmp_path / "cache"))
+
+    # Driver that writes a partial output file and fails
+    exe_path = tmp_path / "failing_driver.sh"
+    exe_path.write_text("#!/bin/sh\necho 'time(1) time(2)' > output.txt\nexit 3\n")
+    exe_path.chmod(exe_path.stat().st_mode | stat.S_IXUSR)
+
+    model = make_model(tmp_path / "run", str(exe_path), run_cache)
+    run_result = model.run_model()
+
+    assert run_result.returncode == 3
+    assert not run_result.succeeded
+    assert run_cache.get_keys() == []
+
+def test_invalidate(tmp_path):
+    run_cache = RunCache(str(tmp_path / "cache"))
+
+    make_model(tmp_path / "run", STAND_IN_DRIVER_PATH, run_cache).run_model()
+    (tmp_path / "cache" / "notes.txt").write_text("not an entry")
+
+    with pytest.raises(ValueError):
+        run_cache.invalidate("../run")
+
+    run_cache.invalidate()
+
+    assert run_cache.get_keys() == []
+    assert (tmp_path / "cache" / "notes.txt").is_file()
@@ -0,0 +1,120 @@
+import os
+import stat
+import subprocess
+
+import numpy as np
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Model import DriverModel
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+from lib.general_functions.run_watchdog import (
+    StopCriterion, PeakQDrop, NonFiniteValues, WallClockBudget, StateVarThreshold, check_criteria
+)
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+COLUMNS = (["time(1)", "time(2)"] + [f"stran({i})" for i in range(1, 7)]
+           + [f"stress({i})" for i in range(1, 7)] + ["statev(1)"])
+
+def make_load(ddstran_1, ninc = 20):
+    return PopularPath("TriaxialE1", {"ninc": ninc, "maxiter": 99, "dtime": 1.0, "every": 1, "ddstran_1": ddstran_1})
+
+def make_model(folder_path, load_list, young_modulus = 1000.0, exe_path = STAND_IN_DRIVER_PATH):
+    os.makedirs(folder_path, exist_ok = True)
+
+    model = DriverModel(str(folder_path), "LE", exe_path, use_batch_file = False)
+
+    model.setup.write_parameters_file({"E": young_modulus, "nu": 0.3})
+    model.setup.write_initial_conditions_file([0.0] * 6, {})
+    model.setup.store_loads(load_list)
+    model.setup.write_loads()
+
+    return model
+
+def make_block(stress_1):
+    block = np.zeros((len(stress_1), len(COLUMNS)))
+    block[:, COLUMNS.index("stress(1)")] = stress_1
+
+    return block
+
+def test_stop_criterion_is_abstract():
+    with pytest.raises(TypeError):
+        StopCriterion()
+
+def test_criteria_on_blocks():
+    empty = np.zeros((0, len(COLUMNS)))
+
+    peak_q_drop = PeakQDrop(0.2)
+    assert peak_q_drop.check(COLUMNS, make_block([0.0, -10.0, -20.0]), 0.0) is None
+    assert peak_q_drop.check(COLUMNS, empty, 0.0) is None
+
+    # The peak is carried over between blocks of the same run
+    assert "peak of 20" in peak_q_drop.check(COLUMNS, make_block([-15.0]), 0.0)
+
+    peak_q_drop.reset()
+    assert peak_q_drop.check(COLUMNS, make_block([-15.0]), 0.0) is None
+
+    assert NonFiniteValues().check(COLUMNS, make_block([1.0, np.nan]), 0.0) is not None
+    assert NonFiniteValues(max_abs_value = 100.0).check(COLUMNS, make_block([1e3]), 0.0) is not None
+    assert NonFiniteValues(max_abs_value = 100.0).check(COLUMNS, make_block([10.0]), 0.0) is None
+
+    assert WallClockBudget(1.0).check(COLUMNS, empty, 0.5) is None
+    assert WallClockBudget(1.0).check(COLUMNS, empty, 1.5) is not None
+
+    assert StateVarThreshold("stress(1)", -5.0, above = False).check(COLUMNS, make_block([-10.0]), 0.0) is not None
+    assert StateVarThreshold("stress(1)", 5.0).check(COLUMNS, make_block([-10.0]), 0.0) is None
+
+    # The first criterion that fires gives the reason
+    criteria = [WallClockBudget(10.0), NonFiniteValues(), WallClockBudget(1.0)]
+    assert check_criteria(criteria, COLUMNS, make_block([np.inf]), 2.0) == "the output has NaN or inf values"
+    assert check_criteria(criteria[:1], COLUMNS, make_block([0.0]), 2.0) is None
+
+def test_early_stop_keeps_the_truncated_results(tmp_path, monkeypatch):
+    monkeypatch.setenv("PUMAT_STAND_IN_LATENCY", "0.02")
+
+    model = make_model(tmp_path, [make_load(-0.01, ninc = 100)])
+
+    stop_reason = model.run_model_watched([StateVarThreshold("stran(1)", -0.002, above = False)],
+                                          poll_interval = 0.05)
+
+    assert stop_reason == "stran(1) went below -0.002"
+
+    # The rows written before the stop are loaded
+    num_rows = len(model.results.output_df)
+    assert 1 < num_rows < 101
+    assert model.results.output_df["stran(1)"].min() < -0.002
+
+def test_run_that_finishes(tmp_path):
+    model = make_model(tmp_path, [make_load(-0.01), make_load(0.01)])
+
+    # q drops back to zero on the unloading
+    assert model.run_model_watched([NonFiniteValues()]) is None
+    assert len(model.results.output_df) == 41
+
+    assert "q dropped" in model.run_model_watched([PeakQDrop(0.2)])
+
+def test_reused_criterion_is_reset(tmp_path):
+    criteria = [PeakQDrop(0.2)]
+
+    stiff = make_model(tmp_path / "stiff", [make_load(-0.01)], young_modulus = 1000.0)
+    assert stiff.run_model_watched(criteria) is None
+
+    # The peak of the stiff run must not stop the soft run
+    soft = make_model(tmp_path / "soft", [make_load(-0.01)], young_modulus = 500.0)
+    assert soft.run_model_watched(criteria) is None
+
+@pytest.mark.skipif(os.name == "nt", reason = "the failing driver is a shell script")
+def test_failed_run_raises_after_storing_the_results(tmp_path):
+    exe_path = tmp_path / "failing_driver.sh"
+    header = " ".join(COLUMNS)
+    row = " ".join(["0.0"] * len(COLUMNS))
+    exe_path.write_text(f"#!/bin/sh\necho '{header}' > output.txt\necho '{row}' >> output.txt\nexit 2\n")
+    exe_path.chmod(exe_path.stat().st_mode | stat.S_IXUSR)
+
+    model = make_model(tmp_path / "run", [make_load(-0.01)], exe_path = str(exe_path))
+
+    with pytest.raises(subprocess.CalledProcessError):
+        model.run_model_watched([NonFiniteValues()])
+
+    assert len(model.results.output_df) == 1
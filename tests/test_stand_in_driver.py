@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Setup import DriverModelSetup
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+from lib.general_functions.output_reader import read_output_file
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+def make_load(ninc = 10, every = 1):
+    return PopularPath("TriaxialE1", {"ninc": ninc, "maxiter": 99, "dtime": 1.0, "every": every, "ddstran_1": -0.01})
+
+@pytest.fixture
+def model_folder(tmp_path):
+    setup = DriverModelSetup(str(tmp_path), "LE", "output.txt")
+
+    setup.write_parameters_file({"E": 1000.0, "nu": 0.25})
+    setup.write_initial_conditions_file([-100.0] * 3 + [0.0] * 3, {"a": 1.0, "b": 2.0})
+    setup.store_loads([make_load(10, 2), make_load(10, 5)])
+    setup.write_loads()
+
+    return tmp_path
+
+def run_stand_in(model_folder, *args, env = None):
+    subprocess.run([sys.executable, STAND_IN_DRIVER_PATH, *args], cwd = model_folder, check = True,
+                   env = None if env is None else {**os.environ, **env})
+
+    return read_output_file(os.path.join(model_folder, "output.txt"))
+
+def test_default_output(model_folder):
+    columns, data = run_stand_in(model_folder)
+
+    assert columns == (["time(1)", "time(2)"] + [f"stran({i})" for i in range(1, 7)] +
+                       [f"stress({i})" for i in range(1, 7)] + ["statev(1)", "statev(2)"])
+
+    # Initial state, then a row every "every" increments of each load
+    assert data.shape == (1 + 5 + 2, len(columns))
+    np.testing.assert_allclose(data[0, 8:14], [-100.0] * 3 + [0.0] * 3)
+    np.testing.assert_allclose(data[:, -2:], [[1.0, 2.0]] * len(data))
+
+    # The step time restarts with every load, the total time doesn't
+    np.testing.assert_allclose(data[-1, 0:2], [1.0, 2.0])
+
+    # Drained triaxial compression of a linear elastic material
+    np.testing.assert_allclose(data[-1, 2], -0.02)
+    np.testing.assert_allclose(data[-1, 8], -100.0 - 1000.0 * 0.02)
+    np.testing.assert_allclose(data[-1, 9:11], -100.0)
+
+def test_rows_option_writes_every_increment(model_folder):
+    _, data = run_stand_in(model_folder, "--rows", "100")
+
+    # The rows are split evenly over the two loads
+    assert len(data) == 101
+    np.testing.assert_allclose(data[-1, 2], -0.02)
+
+def test_nstatev_option(model_folder):
+    columns, data = run_stand_in(model_folder, "--nstatev", "4")
+
+    assert columns[-4:] == [f"statev({i})" for i in range(1, 5)]
+    np.testing.assert_allclose(data[:, -4:], [[1.0, 2.0, 0.0, 0.0]] * len(data))
+
+    # Fewer columns than initial state variables cuts them off
+    columns, _ = run_stand_in(model_folder, "--nstatev", "1")
+    assert columns[-1] == "statev(1)" and "statev(2)" not in columns
+
+def test_options_from_the_environment(model_folder):
+    columns, data = run_stand_in(model_folder, env = {"PUMAT_STAND_IN_ROWS": "40", "PUMAT_STAND_IN_NSTATEV": "3"})
+
+    assert len(data) == 41
+    assert columns[-1] == "statev(3)"
+
+    # The command line wins over the environment
+    _, data = run_stand_in(model_folder, "--rows", "20", env = {"PUMAT_STAND_IN_ROWS": "40"})
+    assert len(data) == 21
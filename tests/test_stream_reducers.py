@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from lib.general_functions.stream_reducers import RunningExtrema, StressInvariantExtrema, DecimatedTrace, FinalState
+
+COLUMNS = (["time(1)", "time(2)"] + [f"stran({i})" for i in range(1, 7)] +
+           [f"stress({i})" for i in range(1, 7)])
+
+def make_block(num_rows, start = 0):
+    block = np.zeros((num_rows, len(COLUMNS)))
+    block[:, 1] = np.arange(start, start + num_rows)
+
+    # Triaxial compression, q is the deviator stress
+    block[:, 8:11] = -100.0
+    block[:, 8] -= np.arange(start, start + num_rows)
+
+    return block
+
+@pytest.mark.filterwarnings("error")
+def test_running_extrema_skips_nan_values():
+    reducer = RunningExtrema()
+
+    reducer.update(COLUMNS, np.zeros((0, len(COLUMNS))))
+    assert reducer.result() == {}
+
+    first = make_block(10)
+    first[:, 0] = np.nan
+    first[3, 8] = np.nan
+
+    reducer.update(COLUMNS, first)
+    reducer.update(COLUMNS, np.full((5, len(COLUMNS)), np.nan))
+    last = make_block(5, start = 10)
+    last[:, 0] = np.nan
+    reducer.update(COLUMNS, last)
+
+    result = reducer.result()
+
+    # An all-NaN column stays NaN, the NaN values of the other columns are skipped
+    assert np.isnan(result["time(1)"][0]) and np.isnan(result["time(1)"][1])
+    assert result["time(2)"] == (0.0, 14.0)
+    assert result["stress(1)"] == (-114.0, -100.0)
+
+def test_stress_invariant_extrema_skips_all_nan_blocks():
+    reducer = StressInvariantExtrema()
+
+    reducer.update(COLUMNS, make_block(10))
+    reducer.update(COLUMNS, np.full((5, len(COLUMNS)), np.nan))
+
+    result = reducer.result()
+
+    assert reducer.num_rows == 15
+    assert result["q_peak"] == 9.0
+    assert result["q_peak_row"] == 9
+    assert result["p_min"] == -103.0
+
+def test_stress_invariant_extrema_all_nan_run():
+    reducer = StressInvariantExtrema()
+
+    reducer.update(COLUMNS, np.full((5, len(COLUMNS)), np.nan))
+
+    result = reducer.result()
+
+    assert result["q_peak_row"] is None
+    assert result["q_peak"] == -np.inf
+
+def test_decimated_trace_keeps_every_nth_row():
+    reducer = DecimatedTrace(every = 10)
+
+    for start in range(0, 95, 19):
+        reducer.update(COLUMNS, make_block(19, start))
+
+    trace, columns = reducer.result()
+
+    assert columns == COLUMNS
+    np.testing.assert_array_equal(trace[:, 1], list(range(0, 95, 10)) + [94])
+
+def test_decimated_trace_has_a_fixed_capacity():
+    reducer = DecimatedTrace(every = 1, max_rows = 64)
+
+    for start in range(0, 10_000, 1000):
+        reducer.update(COLUMNS, make_block(1000, start))
+
+    trace, _ = reducer.result()
+
+    assert len(trace) <= 65
+    assert trace[0, 1] == 0
+    assert trace[-1, 1] == 9999
+
+    # The kept rows stay evenly spaced
+    assert np.all(np.diff(trace[:-1, 1]) == reducer.every)
+
+def test_final_state_keeps_the_last_row():
+    reducer = FinalState()
+
+    reducer.update(COLUMNS, make_block(3))
+    reducer.update(COLUMNS, make_block(0))
+
+    assert reducer.result()["time(2)"] == 2
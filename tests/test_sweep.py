@@ -0,0 +1,52 @@
+import os
+import stat
+
+import pytest
+
+from lib.Driver_Classes.Mod_Driver_Sweep import DriverModelSweep
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+
+STAND_IN_DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "lib", "general_functions", "stand_in_driver.py")
+
+INITIAL_CONDITIONS = ([-10.0] * 3 + [0.0] * 3, {})
+
+def make_load(ddstran_1 = -0.01):
+    return PopularPath("TriaxialE1", {"ninc": 10, "maxiter": 99, "dtime": 1.0, "every": 1, "ddstran_1": ddstran_1})
+
+def test_results_are_in_the_order_of_the_variants(tmp_path):
+    sweep = DriverModelSweep(str(tmp_path), "LE", STAND_IN_DRIVER_PATH, max_workers = 2)
+    variants = [({"E": E, "nu": 0.3}, INITIAL_CONDITIONS, [make_load()]) for E in (3000.0, 1000.0, 2000.0)]
+
+    results = sweep.run(variants)
+
+    # q = E * axial strain in a drained triaxial test of the linear elastic stand-in
+    q_final = [run_results.get_q_invariant().iloc[-1] for run_results in results]
+    assert q_final == pytest.approx([30.0, 10.0, 20.0], rel = 1e-6)
+
+    # Every variant ran in its own folder
+    assert sorted(os.listdir(tmp_path)) == ["run_00000", "run_00001", "run_00002"]
+
+def test_run_variant_in_a_named_folder(tmp_path):
+    sweep = DriverModelSweep(str(tmp_path), "LE", STAND_IN_DRIVER_PATH, run_folder_prefix = "case_")
+
+    results = sweep.run_variant("stiff", {"E": 5000.0, "nu": 0.3}, INITIAL_CONDITIONS, make_load())
+
+    assert len(results.output_df) == 11
+    assert os.path.isfile(tmp_path / "case_stiff" / "output.txt")
+
+@pytest.mark.skipif(os.name == "nt", reason = "the failing driver is a shell script")
+def test_failed_runs_return_none(tmp_path, capsys):
+    # Driver that fails for the variants with E = 666 and runs the stand-in otherwise
+    exe_path = tmp_path / "driver.sh"
+    exe_path.write_text(f"#!/bin/sh\ngrep -q '^666' parameters.inp && exit 1\nexec {STAND_IN_DRIVER_PATH}\n")
+    exe_path.chmod(exe_path.stat().st_mode | stat.S_IXUSR)
+
+    sweep = DriverModelSweep(str(tmp_path / "sweep"), "LE", str(exe_path), max_workers = 2)
+    variants = [({"E": E, "nu": 0.3}, INITIAL_CONDITIONS, [make_load()]) for E in (1000.0, 666.0, 2000.0)]
+
+    results = sweep.run(variants)
+
+    assert results[1] is None
+    assert results[0] is not None and results[2] is not None
+    assert "failed" in capsys.readouterr().out
@@ -0,0 +1,61 @@
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from lib.general_functions.umat_engine import UmatEngine
+from lib.Load_Classes.Popular_Load_Class import PopularPath
+
+REFERENCE_UMAT_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     "lib", "general_functions", "reference_umat")
+
+def build_umat(folder, name):
+    if shutil.which("gfortran") is None:
+        pytest.skip("gfortran is needed to build the reference UMATs")
+
+    library_path = os.path.join(folder, f"{name}.so")
+    subprocess.run(["gfortran", "-shared", "-fPIC", "-O2", "-o", library_path,
+                    os.path.join(REFERENCE_UMAT_FOLDER, f"{name}.f90")], check = True)
+
+    return library_path
+
+@pytest.fixture(scope = "module")
+def umat_folder(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("umat"))
+
+def triaxial_load(ddstran_1, ninc = 100):
+    return PopularPath("TriaxialE1", {"ninc": ninc, "maxiter": 99, "dtime": 1.0, "every": 10,
+                                      "ddstran_1": ddstran_1})
+
+def test_linear_elastic_triaxial(umat_folder):
+    engine = UmatEngine(build_umat(umat_folder, "linear_elastic_umat"))
+
+    _, data = engine.run({"E": 1000.0, "nu": 0.25}, [-100.0] * 3 + [0.0] * 3, {}, triaxial_load(-0.01))
+
+    # The lateral stress stays constant and q = E * axial strain
+    np.testing.assert_allclose(data[-1, 9:11], -100.0)
+    np.testing.assert_allclose(data[-1, 8], -110.0)
+    assert data.shape[0] == 11
+
+@pytest.mark.parametrize("mean_stress", [-100.0, -1e5])
+@pytest.mark.parametrize("ddstran_1", [-0.01, -1e-4])
+def test_hypoelastic_triaxial_converges(umat_folder, mean_stress, ddstran_1):
+    engine = UmatEngine(build_umat(umat_folder, "hypoelastic_umat"))
+
+    _, data = engine.run([0.01, 50.0], [mean_stress] * 3 + [0.0] * 3, {"p": 0.0}, triaxial_load(ddstran_1))
+
+    # Lateral stresses are held by the control equations
+    np.testing.assert_allclose(data[:, 9:11], mean_stress, rtol = 1e-9)
+    np.testing.assert_allclose(data[-1, 2], ddstran_1)
+
+    # The moduli scale with the pressure, so the response scales with the initial stress
+    assert data[-1, 8] < mean_stress
+
+def test_nan_stresses_raise(umat_folder):
+    engine = UmatEngine(build_umat(umat_folder, "hypoelastic_umat"))
+
+    # A NaN kappa makes the UMAT return NaN stresses
+    with pytest.raises(RuntimeError, match = "NaN"):
+        engine.run([np.nan, 50.0], [-100.0] * 3 + [0.0] * 3, {"p": 0.0}, triaxial_load(-0.01))